@@ -0,0 +1,100 @@
+"""
+Checkpointer cost: MemorySaver vs the SQLite write-behind checkpointer.
+
+    python benchmarks/bench_checkpointer.py --threads 400 --turns 6
+
+Each mode runs in a fresh process (so RSS numbers don't bleed into each
+other) and drives real graph turns against an instant fake LLM. Users
+arrive one after another: each thread has its conversation, then goes idle,
+which is what lets the SQLite saver evict it from RAM.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run(mode: str, threads: int, turns: int, idle_ttl: float) -> dict:
+    os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+    import logging
+    logging.disable(logging.INFO)
+    from langchain_core.messages import HumanMessage
+    from agent import get_vera_graph
+    from checkpointer import SQLiteCheckpointer
+    from langgraph.checkpoint.memory import MemorySaver
+    from fakes import FakeChatModel
+
+    tmp = tempfile.mkdtemp()
+    saver = MemorySaver() if mode == "memory" else SQLiteCheckpointer(
+        path=os.path.join(tmp, "bench.sqlite"), idle_ttl=idle_ttl)
+    graph = get_vera_graph(memory=saver, llm=FakeChatModel(reply="word " * 80))
+    # Warm imports and lazy caches outside the measurement
+    graph.invoke({"messages": [HumanMessage(content="warmup")]}, {"configurable": {"thread_id": "warmup"}})
+
+    base = rss_mb()
+    latencies = []
+    for t in range(threads):
+        config = {"configurable": {"thread_id": f"user-{t}"}}
+        for turn in range(turns):
+            text = f"Question {turn} about robotics, GPUs and the news from CES 2026 " * 4
+            start = time.perf_counter()
+            graph.invoke({"messages": [HumanMessage(content=text)]}, config)
+            latencies.append(time.perf_counter() - start)
+    if hasattr(saver, "flush"):
+        saver.flush()
+    result = {
+        "mode": mode,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": sorted(latencies)[int(len(latencies) * 0.99) - 1] * 1000,
+        "rss_growth_mb": rss_mb() - base,
+        "resident_threads": saver.stats()["resident_threads"] if hasattr(saver, "stats") else threads,
+    }
+    if hasattr(saver, "close"):
+        result["db_mb"] = saver.stats()["db_bytes"] / 2**20
+        saver.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=400)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--idle-ttl", type=float, default=1.0, help="SQLite saver RAM eviction TTL (s)")
+    parser.add_argument("--mode", choices=["memory", "sqlite"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run(args.mode, args.threads, args.turns, args.idle_ttl)))
+        return
+
+    print(f"💬 {args.threads} threads x {args.turns} turns\n")
+    print(f"{'checkpointer':<14} {'p50/turn':>10} {'p99/turn':>10} {'RSS growth':>12} {'in RAM':>8} {'on disk':>9}")
+    for mode in ("memory", "sqlite"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--threads", str(args.threads),
+             "--turns", str(args.turns), "--idle-ttl", str(args.idle_ttl)],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        r = json.loads(out)
+        disk = f"{r['db_mb']:.1f} MB" if "db_mb" in r else "-"
+        print(f"{mode:<14} {r['p50_ms']:8.2f}ms {r['p99_ms']:8.2f}ms {r['rss_growth_mb']:9.1f} MB "
+              f"{r['resident_threads']:8d} {disk:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Prompt tokens per document answer: raw joined chunks (the old
+lookup_document output) vs the chunk compressor (merge overlapping
+neighbours, drop near-duplicates, pack into the token budget).
+
+    python benchmarks/bench_compression.py --pages 30 --queries 200
+
+By default the same synthetic PDF is uploaded twice under different ids (a
+re-exported copy), which is what near-duplicate removal targets; use
+--copies 1 to measure merging and packing alone.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from document_index import DocumentIndex
+from embedding_service import EmbeddingService, set_embedding_service, get_embedding_service
+from rag_engine import build_vectorstore, retrieve
+from chunk_compressor import ChunkCompressor
+from context_window import count_tokens
+from synthetic_pdf import write_pdf
+from fakes import EMBED_DIM, KeywordEmbeddings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=6, help="chunks retrieved per question")
+    parser.add_argument("--copies", type=int, default=2, help="times the same PDF is uploaded")
+    parser.add_argument("--budget", type=int, default=None, help="token budget (default VERA_RAG_CONTEXT_TOKENS)")
+    args = parser.parse_args()
+
+    set_embedding_service(EmbeddingService(model=KeywordEmbeddings(size=EMBED_DIM), max_wait_ms=0).warm())
+    index = DocumentIndex(get_embedding_service())
+    with tempfile.TemporaryDirectory() as tmp:
+        store = build_vectorstore(write_pdf(os.path.join(tmp, "cv.pdf"), pages=args.pages), mode="serial")
+    for copy in range(args.copies):
+        index.add_document(f"cv-{copy}", store)
+    texts = [store.docstore.search(i).page_content for i in store.index_to_docstore_id.values()]
+
+    rng = random.Random(7)
+    compressor = ChunkCompressor() if args.budget is None else ChunkCompressor(budget=args.budget)
+    raw_tokens, packed_tokens, times = [], [], []
+    for _ in range(args.queries):
+        words = rng.choice(texts).split()
+        start = rng.randrange(max(1, len(words) - 12))
+        docs = retrieve(" ".join(words[start:start + 12]), [index], mode="vector", k=args.k)
+        raw_tokens.append(count_tokens("\n\n".join(d.page_content for d in docs)))
+        began = time.perf_counter()
+        packed_tokens.append(count_tokens(compressor.compress(docs)))
+        times.append(time.perf_counter() - began)
+
+    stats = compressor.stats()
+    print(f"📄 {args.pages} pages x{args.copies} uploads, {len(texts)} chunks each, top-{args.k}, "
+          f"budget {compressor.budget} tokens\n")
+    print(f"{'':<14} {'avg tokens':>11} {'p95 tokens':>11}")
+    for label, values in (("raw join", raw_tokens), ("compressed", packed_tokens)):
+        p95 = sorted(values)[int(len(values) * 0.95) - 1]
+        print(f"{label:<14} {statistics.mean(values):11.0f} {p95:11d}")
+    print(f"\nsaved {1 - sum(packed_tokens) / sum(raw_tokens):.0%} of prompt tokens; "
+          f"merged {stats['merged']}, duplicates dropped {stats['duplicates']}, truncated {stats['truncated']}; "
+          f"compress p50 {statistics.median(times) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Embedding backends on CPU: PyTorch (HuggingFaceEmbeddings) vs ONNX fp32 vs
+ONNX int8. Reports load time, ingestion throughput (chunks/s, embedded in
+EmbeddingService-sized slices), single-query p50 and cosine agreement with
+the PyTorch vectors.
+
+    python benchmarks/bench_embeddings.py                    # real MiniLM
+    python benchmarks/bench_embeddings.py --random-weights   # offline
+
+--random-weights builds a randomly initialised model with MiniLM-L6's
+exact shape (6 layers, 384 hidden, 30k vocab), so timings are
+representative without a download; cosine numbers are only meaningful
+with the real weights.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from embedding_service import EMBED_MODEL_NAME, EMBED_BATCH_SIZE
+from onnx_embedder import OnnxEmbeddings, check_parity, model_dir
+from bench_retrieval import build_corpus
+
+
+def minilm_shaped(path, texts):
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+    os.makedirs(path, exist_ok=True)
+    words = sorted({w for t in texts for w in t.lower().replace(".", " ").replace(",", " ").split()})
+    filler = [f"tok{i}" for i in range(30522 - 5 - len(words))]
+    vocab = os.path.join(path, "vocab.txt")
+    with open(vocab, "w") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words + filler))
+    BertTokenizerFast(vocab).save_pretrained(path)
+    config = BertConfig(vocab_size=30522, hidden_size=384, num_hidden_layers=6, num_attention_heads=12,
+                        intermediate_size=1536, max_position_embeddings=512)
+    BertModel(config).save_pretrained(path)
+    return path
+
+
+def measure(name, embedder, chunks, queries):
+    start = time.perf_counter()
+    embedder.embed_query("warm-up")
+    load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, len(chunks), EMBED_BATCH_SIZE):
+        embedder.embed_documents(chunks[i:i + EMBED_BATCH_SIZE])
+    ingest = len(chunks) / (time.perf_counter() - start)
+
+    times = []
+    for query in queries:
+        began = time.perf_counter()
+        embedder.embed_query(query)
+        times.append(time.perf_counter() - began)
+    return load, ingest, statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=EMBED_MODEL_NAME)
+    parser.add_argument("--random-weights", action="store_true", help="MiniLM-shaped random model (no download)")
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    rng = random.Random(7)
+    chunks, _ = build_corpus(args.chunks, rng)
+    queries = [f"Which candidate knows {rng.choice(['Python', 'Kafka', 'Rust', 'Spark'])}?" for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model, root = args.model, None
+        if args.random_weights:
+            model, root = minilm_shaped(os.path.join(tmp, "minilm-shaped"), chunks + queries), tmp
+        reference = HuggingFaceEmbeddings(model_name=model)
+        backends = [
+            ("pytorch fp32", reference),
+            ("onnx fp32", OnnxEmbeddings(model, precision="fp32", path=model_dir(model, "fp32", root))),
+            ("onnx int8", OnnxEmbeddings(model, precision="int8", path=model_dir(model, "int8", root))),
+        ]
+        print(f"🧮 {model if not args.random_weights else 'MiniLM-shaped (random weights)'}: "
+              f"{len(chunks)} chunks (~{sum(map(len, chunks)) // len(chunks)} chars), {len(queries)} queries, "
+              f"{os.cpu_count()} CPUs\n")
+        print(f"{'backend':<14} {'load':>7} {'chunks/s':>9} {'query p50':>10} {'min cos':>8} {'mean cos':>9}")
+        for name, embedder in backends:
+            load, ingest, p50 = measure(name, embedder, chunks, queries)
+            parity = check_parity(embedder, reference, chunks[:128] + queries[:32])
+            print(f"{name:<14} {load:6.1f}s {ingest:9.1f} {p50:8.2f}ms "
+                  f"{parity['min_cosine']:8.4f} {parity['mean_cosine']:9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+FAISS index types: memory per million chunks, single-query latency and
+recall@k against exact search, for every structure/storage combination
+index_factory can pick.
+
+    python benchmarks/bench_index_types.py --chunks 20000 --dim 384
+
+Vectors are synthetic but clustered (topics), like real chunk embeddings;
+queries are perturbed copies of stored chunks, so each has a true nearest
+neighbour set. Memory is the serialized index size, scaled to 1M chunks.
+
+PQ needs PQ_MIN_CHUNKS (9984) chunks to train and a dim divisible by
+VERA_PQ_BYTES; below that index_factory stores fp16 instead, so the PQ
+rows are skipped rather than printed as fp16 twice. Each row shows the
+requested kind/storage next to the index actually built. Everything runs
+on one thread: the default 20k chunks takes ~6 minutes on one core, almost
+all of it the two PQ trainings (~3 minutes each); --no-pq leaves them out.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+import faiss
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from index_factory import build_index, describe, PQ_MIN_CHUNKS
+
+
+def clustered(n, dim, clusters, rng):
+    centers = rng.standard_normal((clusters, dim)).astype("float32")
+    vectors = centers[rng.integers(0, clusters, n)] + 0.35 * rng.standard_normal((n, dim)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--no-pq", action="store_true", help="skip the PQ rows (their training dominates the run)")
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(1)  # one query at a time, like lookup_document
+    rng = np.random.default_rng(7)
+    vectors = clustered(args.chunks, args.dim, max(16, args.chunks // 500), rng)
+    picks = rng.choice(args.chunks, args.queries, replace=False)
+    queries = vectors[picks] + 0.05 * rng.standard_normal((args.queries, args.dim)).astype("float32")
+
+    exact = faiss.IndexFlatL2(args.dim)
+    exact.add(vectors)
+    _, truth = exact.search(queries, args.k)
+
+    n = args.chunks
+    modes = [("flat", "float32"), ("flat", "fp16"), ("flat", "pq"), ("hnsw", "float32"), ("hnsw", "fp16"),
+             ("ivf", "float32"), ("ivf", "fp16"), ("ivf", "pq")]
+    print(f"📐 {n} chunks x {args.dim} dims, {args.queries} queries, 1 thread "
+          f"(auto picks {describe(n, args.dim, index_type='auto')!r} at this size)\n")
+    print(f"{'requested':<14} {'built':<18} {'build':>8} {'MB / 1M chunks':>15} {'p50 query':>10} "
+          f"{'recall@%d' % args.k:>9}")
+    skipped = []
+    for kind, storage in modes:
+        description = describe(n, args.dim, index_type=kind, storage=storage)
+        if storage == "pq" and args.no_pq:
+            continue
+        if storage == "pq" and "PQ" not in description:
+            skipped.append(f"{kind}/{storage}")  # would silently be the fp16 row again
+            continue
+        start = time.perf_counter()
+        index = build_index(vectors, description)
+        index.add(vectors)
+        build = time.perf_counter() - start
+        mb_per_million = len(faiss.serialize_index(index)) / n  # bytes per chunk == MB per 1M chunks
+
+        times, hits = [], 0
+        for i in range(args.queries):
+            began = time.perf_counter()
+            _, found = index.search(queries[i:i + 1], args.k)
+            times.append(time.perf_counter() - began)
+            hits += len(set(found[0]) & set(truth[i]))
+        recall = hits / (args.queries * args.k)
+        print(f"{kind + '/' + storage:<14} {description:<18} {build:7.1f}s {mb_per_million:15.0f} "
+              f"{statistics.median(times) * 1000:8.3f}ms {recall:9.3f}")
+        del index
+    if skipped:
+        print(f"\n⏭️  skipped {', '.join(skipped)}: PQ needs {PQ_MIN_CHUNKS} chunks and dim divisible by "
+              f"VERA_PQ_BYTES, so index_factory would build fp16 here (rerun with --chunks {PQ_MIN_CHUNKS} or more)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Ingestion throughput: serial PyPDFLoader path vs the page-parallel streaming
+pipeline, as parse workers scale.
+
+    python benchmarks/bench_ingestion.py --pages 300
+    python benchmarks/bench_ingestion.py --pages 300 --real   # real MiniLM
+
+By default embeddings are faked at --embed-ms per chunk (roughly MiniLM on a
+laptop core) so the numbers isolate the pipeline, not the model. Each row is
+the best of --repeat runs, after one untimed serial ingest of a small PDF
+that pays the one-off imports (pypdf, langchain_community, the splitter);
+otherwise the first (serial) row is billed ~2s of import time and any
+streaming "speedup" on a single core is really just that.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import parallel_ingest
+from embedding_service import EmbeddingService, set_embedding_service
+from rag_engine import build_vectorstore
+from synthetic_pdf import write_pdf
+from fakes import EMBED_DIM, KeywordEmbeddings
+
+
+def warm_pool(workers):
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    # Start every worker up front so spawn cost isn't billed to the first run
+    list(pool.map(parallel_ingest.count_pages, [""] * workers))
+    return pool
+
+
+def timed(label, pages, fn, repeat=1):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        store = fn()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    print(f"{label:<24} {elapsed:8.2f}s {pages / elapsed:10.1f} pages/s {store.index.ntotal:8d} chunks")
+    return {"mode": label, "seconds": elapsed, "pages_per_sec": pages / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--embed-ms", type=float, default=2.0, help="fake model cost per chunk")
+    parser.add_argument("--real", action="store_true", help="use the real MiniLM embedder")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per row; the best is reported")
+    args = parser.parse_args()
+
+    model = None if args.real else KeywordEmbeddings(size=EMBED_DIM, ms_per_text=args.embed_ms)
+    set_embedding_service(EmbeddingService(model=model).warm())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_pdf(os.path.join(tmp, "bench.pdf"), pages=args.pages)
+        # Untimed: loads the parser/splitter modules in this process
+        build_vectorstore(write_pdf(os.path.join(tmp, "warmup.pdf"), pages=2), mode="serial")
+        print(f"📄 {args.pages}-page synthetic PDF, {os.cpu_count()} cores, best of {args.repeat}\n")
+        print(f"{'mode':<24} {'time':>9} {'throughput':>16} {'chunks':>15}")
+
+        timed("serial", args.pages, lambda: build_vectorstore(path, mode="serial"), args.repeat)
+
+        workers = 1
+        while workers <= args.max_workers:
+            parallel_ingest._POOL = warm_pool(workers)
+            timed(f"streaming x{workers}", args.pages, lambda: build_vectorstore(path, mode="streaming"), args.repeat)
+            parallel_ingest.shutdown_parse_pool()
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Load test: concurrent chats through the real graph + ChatNVIDIA client
+against a local fake OpenAI-compatible server.
+
+    python benchmarks/bench_llm_concurrency.py --levels 50 200 1000 --latency-ms 500
+
+For each concurrency level, N chat loops send turns back to back for
+--duration seconds. "async" is the FastAPI path (async reasoning node,
+pooled keep-alive session). "sync-in-executor" is how /chat behaved before:
+the sync node runs on the default executor, so concurrency is capped by its
+thread count rather than by the endpoint.
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+import statistics
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("fake LLM server did not start")
+
+
+async def drive(graph, concurrency: int, duration: float, sync: bool):
+    from langchain_core.messages import HumanMessage
+    from llm_client import llm_pool
+
+    latencies, errors = [], 0
+    stop_at = time.perf_counter() + duration
+
+    async def chat(i):
+        nonlocal errors
+        config = {"configurable": {"thread_id": f"load-{sync}-{concurrency}-{i}"}}
+        while time.perf_counter() < stop_at:
+            inputs = {"messages": [HumanMessage(content="What are the latest trends in GPU inference?")]}
+            start = time.perf_counter()
+            if sync:
+                result = await asyncio.to_thread(graph.invoke, inputs, config)
+            else:
+                result = await graph.ainvoke(inputs, config)
+            if result["messages"][-1].content.startswith("⚠️"):
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(chat(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await llm_pool.aclose()
+    return len(latencies) / elapsed, statistics.median(latencies), errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="fake endpoint time per answer")
+    parser.add_argument("--skip-sync", action="store_true")
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), "fake_openai_server.py"),
+                               "--port", str(port), "--latency-ms", str(args.latency_ms)])
+    try:
+        wait_for_port(port)
+        os.environ.update({
+            "VERA_LLM_BASE_URL": f"http://127.0.0.1:{port}/v1",
+            "VERA_LLM_MAX_IN_FLIGHT": str(max(args.levels)),
+            "VERA_BUDGET_DAILY": "0",
+            "NVIDIA_API_KEY": os.environ.get("NVIDIA_API_KEY", "nvapi-bench"),
+            "TAVILY_API_KEY": os.environ.get("TAVILY_API_KEY", "tvly-bench"),
+        })
+        import logging
+        logging.disable(logging.WARNING)
+        from langgraph.checkpoint.memory import MemorySaver
+        from agent import get_vera_graph
+
+        graph = get_vera_graph(memory=MemorySaver())
+        ideal = 1000 / args.latency_ms
+        print(f"🔥 fake endpoint latency {args.latency_ms:.0f} ms "
+              f"(ideal: {ideal:.1f} req/s per concurrent chat), {os.cpu_count()} cores\n")
+        print(f"{'mode':<18} {'chats':>6} {'req/s':>9} {'p50 turn':>10} {'errors':>7}")
+        for level in args.levels:
+            modes = [("async", False)] + ([] if args.skip_sync else [("sync-in-executor", True)])
+            for label, sync in modes:
+                rps, p50, errors = asyncio.run(drive(graph, level, args.duration, sync))
+                print(f"{label:<18} {level:6d} {rps:9.1f} {p50 * 1000:8.0f}ms {errors:7d}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
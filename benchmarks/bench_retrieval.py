@@ -0,0 +1,102 @@
+"""
+Retrieval latency and recall: vector-only (embed + FAISS) vs hybrid
+(BM25 for keyword queries, fused BM25 + FAISS for the rest).
+
+    python benchmarks/bench_retrieval.py --chunks 5000
+    python benchmarks/bench_retrieval.py --chunks 5000 --real   # real MiniLM
+
+The corpus is synthetic resume chunks; every query has exactly one chunk
+that answers it (the one holding that name / skill / phrase), so recall@k
+is whether that chunk is in the top k. By default the embedder is faked
+(hashed bag-of-words, --embed-ms per query) - it is lexical by nature, so
+real recall differences only show with --real.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from langchain_community.vectorstores import FAISS
+
+from document_index import DocumentIndex
+from embedding_service import EmbeddingService, set_embedding_service, get_embedding_service
+from rag_engine import retrieve, query_vector_cache, TOP_K
+from fakes import EMBED_DIM, KeywordEmbeddings
+
+FIRST = ["Alice", "Bao", "Carlos", "Dmitri", "Esi", "Farah", "Goran", "Hana", "Ines", "Jun", "Kofi", "Lena"]
+LAST = ["Zhang", "Okafor", "Silva", "Petrov", "Mensah", "Haddad", "Novak", "Sato", "Ruiz", "Tanaka", "Boateng"]
+SKILLS = ["Python", "Go", "Rust", "Kubernetes", "Terraform", "Kafka", "Spark", "PyTorch", "TensorRT", "CUDA",
+          "PostgreSQL", "Redis", "Airflow", "Snowflake", "React", "GraphQL", "Ansible", "Triton", "Ray", "Flink"]
+FILLER = ("worked closely with stakeholders to deliver reliable systems on time and improved team processes "
+          "across several projects while mentoring junior engineers and writing documentation").split()
+
+
+def build_corpus(n, rng):
+    chunks, queries = [], []
+    for i in range(n):
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)}-{i}"
+        skills = rng.sample(SKILLS, 3)
+        project = f"project-{i:05d}"
+        filler = " ".join(rng.choice(FILLER) for _ in range(60))
+        chunks.append(f"Candidate {name}. Skills: {', '.join(skills)}. Shipped {project}. {filler}")
+        if i % max(1, n // 200) == 0:
+            queries += [
+                ("keyword", name, i),
+                ("keyword", project, i),
+                ("phrase", f'"Shipped {project}"', i),
+                ("question", f"Which candidate shipped {project} using {skills[0]} and {skills[1]}?", i),
+            ]
+    return chunks, queries
+
+
+def run(index, chunks, queries, mode):
+    results = {}
+    for kind, query, target in queries:
+        query_vector_cache.invalidate()  # every lookup pays its first-time cost
+        start = time.perf_counter()
+        docs = retrieve(query, [index], mode=mode, k=TOP_K)
+        elapsed = time.perf_counter() - start
+        hit = any(d.page_content == chunks[target] for d in docs)
+        entry = results.setdefault(kind, {"times": [], "hits": 0, "n": 0})
+        entry["times"].append(elapsed)
+        entry["hits"] += hit
+        entry["n"] += 1
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--embed-ms", type=float, default=8.0, help="fake model cost per query")
+    parser.add_argument("--real", action="store_true", help="use the real MiniLM embedder")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    chunks, queries = build_corpus(args.chunks, rng)
+    model = None if args.real else KeywordEmbeddings(size=EMBED_DIM)
+    set_embedding_service(EmbeddingService(model=model, max_wait_ms=0).warm())
+    embeddings = get_embedding_service()
+
+    start = time.perf_counter()
+    store = FAISS.from_texts(chunks, embeddings)
+    index = DocumentIndex(embeddings)
+    index.add_document("corpus", store)
+    print(f"📚 {len(chunks)} chunks indexed in {time.perf_counter() - start:.1f}s "
+          f"(BM25 adds ~{index.lexical.nbytes() / 1e6:.1f} MB), {len(queries)} queries\n")
+    if model is not None:
+        model.ms_per_text = args.embed_ms  # charge query embeddings only
+
+    print(f"{'mode':<8} {'query':<10} {'p50':>9} {'recall@%d' % TOP_K:>10}")
+    for mode in ("vector", "hybrid"):
+        for kind, entry in run(index, chunks, queries, mode).items():
+            p50 = statistics.median(entry["times"]) * 1000
+            print(f"{mode:<8} {kind:<10} {p50:7.2f}ms {entry['hits'] / entry['n']:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Routing overhead: the old per-turn filters (trigger lists rebuilt, five
+re.search calls, startswith scan, keyword scan, bind_tools on every turn)
+vs the precompiled IntentRouter with prebuilt tool-bound models.
+
+    python benchmarks/bench_router.py --turns 20000
+
+Also runs full graph turns against an instant fake LLM to show what share
+of the non-LLM per-turn overhead routing accounts for.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+
+from langchain_core.messages import HumanMessage
+from langchain_tavily import TavilySearch
+
+from agent import get_vera_graph
+from rag_engine import lookup_document
+from router import IntentRouter
+from web_search import CachedSearchTool
+from fakes import FakeChatModel
+
+TURNS = [
+    "hello",
+    "My name is Tien",
+    "What did Jensen Huang announce at CES 2026?",
+    "Summarize the candidate's skills from the resume",
+    "i'm looking for the latest robotics papers",
+    "Compare vLLM and TensorRT-LLM throughput on H100",
+    "who are you",
+    "Does the document mention Kubernetes experience?",
+]
+
+
+def legacy_route(text, has_doc, llm, tools_all, tools_web_only):
+    """The pre-router logic from route_start + reasoning_node, verbatim in spirit."""
+    last_msg = text.lower()
+    fast_keywords = ["pdf", "resume", "cv", "document", "file", "candidate", "skills"]
+    if has_doc and any(k in last_msg for k in fast_keywords):
+        return "fast_doc_trigger"
+
+    last_msg_text = text.lower().strip()
+    chitchat_triggers = ["hello", "hi", "hey", "hola", "greetings", "good morning", "who are you"]
+    is_chitchat = any(last_msg_text.startswith(t) for t in chitchat_triggers) and len(last_msg_text) < 20
+    personal_patterns = [r"my name is", r"i am", r"call me", r"i'm", r"my email is"]
+    is_personal = any(re.search(p, last_msg_text) for p in personal_patterns)
+    if is_chitchat or is_personal:
+        return llm
+    if has_doc:
+        return llm.bind_tools(tools_all)
+    return llm.bind_tools(tools_web_only)
+
+
+def compiled_route(router, text, has_doc, llm, llm_doc, llm_web):
+    intent = router.classify(text)
+    if has_doc and intent.doc_keyword:
+        return "fast_doc_trigger"
+    if intent.chitchat or intent.personal:
+        return llm
+    return llm_doc if has_doc else llm_web
+
+
+def rate(label, turns, fn):
+    start = time.perf_counter()
+    for i in range(turns):
+        fn(TURNS[i % len(TURNS)], i % 2 == 0)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {turns / elapsed:12,.0f} decisions/s {elapsed / turns * 1e6:9.1f} µs/turn")
+    return elapsed / turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=20000)
+    parser.add_argument("--graph-turns", type=int, default=300)
+    args = parser.parse_args()
+
+    llm = FakeChatModel()
+    tavily = CachedSearchTool(TavilySearch(max_results=1, topic="general"))
+    tools_all, tools_web_only = [tavily, lookup_document], [tavily]
+    llm_doc, llm_web = llm.bind_tools(tools_all), llm.bind_tools(tools_web_only)
+
+    print(f"{'router':<28} {'throughput':>24} {'latency':>16}")
+    legacy = rate("legacy (per-turn bind)", args.turns,
+                  lambda t, d: legacy_route(t, d, llm, tools_all, tools_web_only))
+    cold = IntentRouter(cache_size=0)
+    compiled = rate("compiled, no memo", args.turns,
+                    lambda t, d: compiled_route(cold, t, d, llm, llm_doc, llm_web))
+    warm = IntentRouter()
+    rate("compiled + memo", args.turns,
+         lambda t, d: compiled_route(warm, t, d, llm, llm_doc, llm_web))
+
+    # Full turns with an instant LLM: everything left is graph overhead
+    graph = get_vera_graph(llm=llm)
+    start = time.perf_counter()
+    for i in range(args.graph_turns):
+        config = {"configurable": {"thread_id": f"bench-{i}"}}
+        graph.invoke({"messages": [HumanMessage(content=TURNS[2 + i % 4])]}, config=config)
+    per_turn = (time.perf_counter() - start) / args.graph_turns
+
+    print(f"\n⏱️  graph turn overhead (fake LLM): {per_turn * 1e3:.2f} ms")
+    print(f"   legacy routing share:   {legacy / (per_turn - compiled + legacy):6.1%}")
+    print(f"   compiled routing share: {compiled / per_turn:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
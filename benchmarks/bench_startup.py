@@ -0,0 +1,115 @@
+"""
+Cold start: how long a fresh API process takes to import, answer /health,
+serve its first chat turn and report /ready.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 5 --warmup blocking
+
+"import api" is timed in fresh interpreters, both as shipped (heavy
+dependencies load on first use) and with the formerly eager imports
+forced, for comparison. The server runs under uvicorn against the local
+fake OpenAI-compatible endpoint (no network), with an in-memory
+checkpointer. Time-to-first-chat is measured from process launch to the
+first 200 from POST /chat; /ready may report "failed" offline, when the
+embedder model isn't in the Hugging Face cache.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+import httpx
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from bench_llm_concurrency import free_port, wait_for_port
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+# What importing api.py used to load up front
+EAGER = ("langgraph.prebuilt", "langchain_tavily", "langchain_nvidia_ai_endpoints",
+         "langchain_community.document_loaders", "langchain_text_splitters",
+         "faiss", "langchain_community.vectorstores")
+
+
+def import_seconds(env, extra=()) -> float:
+    probe = ("import time; t = time.perf_counter(); import api; "
+             + "".join(f"import {m}; " for m in extra)
+             + "print(time.perf_counter() - t)")
+    out = subprocess.run([sys.executable, "-c", probe], cwd=SRC, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def cold_start(env, port: int, message: str, timeout: float):
+    began = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--log-level", "warning"],
+                              cwd=SRC, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    marks = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            deadline = began + timeout
+            while "health" not in marks and time.perf_counter() < deadline:
+                try:
+                    if client.get("/health").status_code == 200:
+                        marks["health"] = time.perf_counter() - began
+                except httpx.TransportError:
+                    time.sleep(0.02)
+            chat = client.post("/chat", json={"message": message, "thread_id": "cold-start"})
+            if chat.status_code == 200:
+                marks["chat"] = time.perf_counter() - began
+            while time.perf_counter() < deadline:
+                report = client.get("/ready")
+                if report.status_code == 200 or report.json()["status"] == "failed":
+                    marks["ready"] = time.perf_counter() - began
+                    marks["status"] = report.json()["status"]
+                    break
+                time.sleep(0.05)
+    finally:
+        server.terminate()
+        server.wait()
+    return marks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--warmup", choices=["background", "blocking"], default="background")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="fake endpoint time per answer")
+    parser.add_argument("--timeout", type=float, default=180.0)
+    args = parser.parse_args()
+
+    llm_port = free_port()
+    llm = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), "fake_openai_server.py"),
+                            "--port", str(llm_port), "--latency-ms", str(args.latency_ms)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    env = {
+        **os.environ,
+        "VERA_LLM_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "VERA_CHECKPOINTER": "memory",
+        "VERA_BUDGET_DAILY": "0",
+        "VERA_WARMUP": args.warmup,
+        "NVIDIA_API_KEY": os.environ.get("NVIDIA_API_KEY", "nvapi-bench"),
+        "TAVILY_API_KEY": os.environ.get("TAVILY_API_KEY", "tvly-bench"),
+    }
+    try:
+        wait_for_port(llm_port)
+        lazy = [import_seconds(env) for _ in range(args.runs)]
+        eager = [import_seconds(env, EAGER) for _ in range(args.runs)]
+        print(f"🚀 {args.runs} fresh interpreters, {os.cpu_count()} CPUs\n")
+        print(f"import api (lazy, as shipped)      {statistics.median(lazy):6.2f}s")
+        print(f"import api + formerly eager deps   {statistics.median(eager):6.2f}s\n")
+
+        print(f"uvicorn cold start (VERA_WARMUP={args.warmup}, fake LLM {args.latency_ms:.0f} ms)")
+        print(f"{'run':>4} {'/health':>9} {'1st chat':>9} {'/ready':>9}  status")
+        for run in range(args.runs):
+            marks = cold_start(env, free_port(), "Summarize the benefits of unit testing.", args.timeout)
+            cells = [f"{marks[k]:8.2f}s" if k in marks else f"{'-':>9}" for k in ("health", "chat", "ready")]
+            print(f"{run + 1:4d} {' '.join(cells)}  {marks.get('status', 'timeout')}")
+    finally:
+        llm.terminate()
+        llm.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Streaming overhead: /chat/stream's old astream_events(version="v1") loop vs
+stream_turn (graph.astream with stream_mode=["messages", "updates"]).
+
+    python benchmarks/bench_streaming.py --turns 200 --words 200
+
+A fake model streams `--words` chunks per answer with no latency, so the
+numbers are pure per-turn streaming overhead: wall time, events the server
+materializes, and events actually sent to the client.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+os.environ.setdefault("VERA_BUDGET_DAILY", "0")
+
+import logging
+logging.disable(logging.WARNING)
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from agent import get_vera_graph
+from streaming import stream_turn, StreamStats
+from fakes import FakeChatModel
+
+
+async def legacy(graph, inputs, config):
+    produced, sent = 0, 0
+    async for event in graph.astream_events(inputs, config=config, version="v1"):
+        produced += 1
+        if event["event"] == "on_chat_model_stream" and event["data"]["chunk"].content:
+            sent += 1
+    return produced, sent
+
+
+async def lean(graph, inputs, config):
+    produced, sent = 0, 0
+    async for _ in stream_turn(graph, inputs, config, stats=StreamStats()):
+        produced += 1
+        sent += 1
+    return produced, sent
+
+
+async def run(graph, fn, turns):
+    times, produced, sent = [], 0, 0
+    for i in range(turns):
+        config = {"configurable": {"thread_id": f"stream-{fn.__name__}-{i}"}}
+        inputs = {"messages": [HumanMessage(content="Explain the latest trends in GPU inference")]}
+        start = time.perf_counter()
+        p, s = await fn(graph, inputs, config)
+        times.append(time.perf_counter() - start)
+        produced += p
+        sent += s
+    return statistics.median(times), produced / turns, sent / turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--words", type=int, default=200, help="chunks streamed per answer")
+    args = parser.parse_args()
+
+    llm = FakeChatModel(reply=" ".join(["token"] * args.words))
+    graph = get_vera_graph(memory=MemorySaver(), llm=llm)
+
+    print(f"{'mode':<22} {'p50 turn':>10} {'events/turn':>12} {'sent/turn':>10}")
+    for label, fn in [("astream_events v1", legacy), ("stream_turn", lean)]:
+        asyncio.run(run(graph, fn, 5))  # warm-up
+        p50, produced, sent = asyncio.run(run(graph, fn, args.turns))
+        print(f"{label:<22} {p50 * 1000:8.2f}ms {produced:12.0f} {sent:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
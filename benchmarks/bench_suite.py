@@ -0,0 +1,280 @@
+"""
+Offline, deterministic benchmark suite: the real graph and FastAPI app
+against fake LLM / search / embedding backends with fixed latencies, so
+runs are comparable on a laptop, in CI or on an air-gapped box.
+
+    python benchmarks/bench_suite.py --out bench_results.json
+    python benchmarks/bench_suite.py --out new.json --baseline bench_results.json
+
+Sections (all saved to --out as JSON):
+  graph      scripted turn mix (instant reply, direct answer, web search,
+             document lookup) through get_vera_graph: per-node latency
+             distributions and end-to-end p50/p95/p99
+  api        POST /chat in-process (ASGI, no sockets) at each --concurrency
+             level: turns/s, latency percentiles, rejected requests
+  ingestion  synthetic PDF through process_document: pages/s, chunks/s
+
+A node's latency is the time from the previous node's update (or the
+start of the turn) to its own. --baseline prints the change of every
+latency/throughput metric against a saved run and exits 1 when one
+regressed by more than --threshold.
+"""
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+from collections import defaultdict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+# Usage is still reserved and settled per turn; the daily cap would just halt the run
+os.environ.setdefault("VERA_BUDGET_DAILY", "0")
+
+import httpx
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+import api
+import rag_engine
+import parallel_ingest
+from agent import get_vera_graph
+from embedding_service import EmbeddingService, set_embedding_service
+from index_registry import registry
+from index_store import IndexStore
+from synthetic_pdf import write_pdf
+from fakes import EMBED_DIM, FakeChatModel, FakeSearchTool, KeywordEmbeddings
+from bench_ingestion import warm_pool
+
+# (kind, message); kinds exercise instant_reply, agent, agent->tools->agent
+# and fast_doc_trigger->tools->agent respectively
+TURN_MIX = [
+    ("instant", "hello"),
+    ("direct", "I'm planning a talk on GPUs, any tips?"),
+    ("web", "What did Jensen Huang announce at CES 2026?"),
+    ("doc", "Summarize the candidate's skills from the resume"),
+    ("web", "Compare vLLM and TensorRT-LLM throughput on H100"),
+    ("doc", "Which projects in the document used Kubernetes?"),
+    ("instant", "who are you"),
+    ("web", "Latest robotics papers on humanoid locomotion"),
+]
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms", "mean_ms")
+THROUGHPUT_KEYS = ("turns_per_s", "pages_per_s", "chunks_per_s")
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    if not ordered:
+        return {"n": 0}
+
+    def rank(p):
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] * 1000  # nearest rank
+
+    return {"n": len(ordered), "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p50_ms": round(rank(50), 3), "p95_ms": round(rank(95), 3), "p99_ms": round(rank(99), 3)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def upload_document(tmp, thread_id, pages):
+    path = write_pdf(os.path.join(tmp, f"{thread_id}.pdf"), pages=pages)
+    return rag_engine.process_document(path, thread_id=thread_id)
+
+
+# --- SECTIONS ---
+async def bench_graph(graph, tmp, args):
+    thread_id = "bench-graph"
+    upload_document(tmp, thread_id, pages=4)
+    nodes, turns = defaultdict(list), defaultdict(list)
+    for i in range(args.turns):
+        kind, text = TURN_MIX[i % len(TURN_MIX)]
+        config = {"configurable": {"thread_id": thread_id, "user_id": "bench"}}
+        start = last = time.perf_counter()
+        async for update in graph.astream({"messages": [HumanMessage(content=text)]}, config,
+                                          stream_mode="updates"):
+            now = time.perf_counter()
+            for node in update:
+                nodes[node].append(now - last)
+            last = now
+        turns[kind].append(time.perf_counter() - start)
+
+    every = [t for samples in turns.values() for t in samples]
+    return {
+        "turns": args.turns,
+        "end_to_end": percentiles(every),
+        "by_turn_kind": {kind: percentiles(samples) for kind, samples in sorted(turns.items())},
+        "nodes": {node: percentiles(samples) for node, samples in sorted(nodes.items())},
+    }
+
+
+async def bench_api(tmp, args):
+    upload_document(tmp, None, pages=4)  # global document, so doc turns work on every thread
+    transport = httpx.ASGITransport(app=api.app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for level in args.concurrency:
+            latencies, statuses = [], defaultdict(int)
+            per_client = max(1, args.api_turns // level)
+
+            async def chat_loop(worker):
+                thread_id = f"bench-{level}-{worker}-{uuid.uuid4().hex[:6]}"
+                for i in range(per_client):
+                    _, text = TURN_MIX[(worker + i) % len(TURN_MIX)]
+                    began = time.perf_counter()
+                    response = await client.post("/chat", json={"message": text, "thread_id": thread_id})
+                    statuses[response.status_code] += 1
+                    if response.status_code == 200:
+                        latencies.append(time.perf_counter() - began)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(chat_loop(w) for w in range(level)))
+            elapsed = time.perf_counter() - start
+            results[str(level)] = {
+                "turns": level * per_client,
+                "seconds": round(elapsed, 3),
+                "turns_per_s": round(len(latencies) / elapsed, 2),
+                "latency": percentiles(latencies),
+                "status": {str(code): n for code, n in sorted(statuses.items())},
+            }
+    return results
+
+
+def bench_ingestion(tmp, args):
+    path = write_pdf(os.path.join(tmp, "ingest.pdf"), pages=args.pages)
+    results = {}
+    # Parse workers are started before timing, as they are after API startup
+    parallel_ingest._POOL = warm_pool(os.cpu_count() or 1)
+    for mode in ("serial", "streaming"):
+        start = time.perf_counter()
+        store = rag_engine.build_vectorstore(path, mode=mode)
+        elapsed = time.perf_counter() - start
+        results[mode] = {"pages": args.pages, "chunks": store.index.ntotal, "seconds": round(elapsed, 3),
+                         "pages_per_s": round(args.pages / elapsed, 1),
+                         "chunks_per_s": round(store.index.ntotal / elapsed, 1)}
+    parallel_ingest.shutdown_parse_pool()
+    return results
+
+
+# --- COMPARISON ---
+def flatten(node, prefix=""):
+    for key, value in node.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif key in LATENCY_KEYS or key in THROUGHPUT_KEYS:
+            yield path, key, value
+
+
+def compare(current, baseline, threshold):
+    """Prints every shared metric's change; returns the ones that got worse by more than threshold."""
+    old = {path: value for path, _, value in flatten(baseline["results"])}
+    regressions = []
+    print(f"\n📊 vs baseline {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    differs = {k: (v, current["meta"]["config"].get(k)) for k, v in baseline["meta"].get("config", {}).items()
+               if current["meta"]["config"].get(k) != v}
+    if differs:
+        print(f"⚠️  Settings differ (baseline, current): {differs}")
+    print()
+    print(f"{'metric':<52} {'baseline':>10} {'current':>10} {'change':>8}")
+    for path, key, value in flatten(current["results"]):
+        if not old.get(path):
+            continue
+        change = (value - old[path]) / old[path]
+        worse = change > threshold if key in LATENCY_KEYS else change < -threshold
+        flag = " ⚠️" if worse else ""
+        print(f"{path:<52} {old[path]:10.2f} {value:10.2f} {change:+7.1%}{flag}")
+        if worse:
+            regressions.append(path)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="fake LLM latency per call")
+    parser.add_argument("--search-ms", type=float, default=400.0, help="fake web search latency per call")
+    parser.add_argument("--embed-ms", type=float, default=2.0, help="fake embedder cost per text")
+    parser.add_argument("--completion-tokens", type=int, default=120, help="usage reported per LLM answer")
+    parser.add_argument("--turns", type=int, default=80, help="sequential graph turns")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--api-turns", type=int, default=128, help="turns per concurrency level")
+    parser.add_argument("--pages", type=int, default=60, help="synthetic PDF size for ingestion")
+    parser.add_argument("--sections", nargs="+", default=["graph", "api", "ingestion"])
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="saved run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression tolerance (fraction)")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    llm = FakeChatModel(reply=" ".join(["word"] * args.completion_tokens), latency_ms=args.llm_ms,
+                        completion_tokens=args.completion_tokens,
+                        tool_script=("tavily_search",))
+    search = FakeSearchTool(latency_ms=args.search_ms, max_results=3)
+    set_embedding_service(EmbeddingService(model=KeywordEmbeddings(size=EMBED_DIM, ms_per_text=args.embed_ms), max_wait_ms=0).warm())
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        rag_engine.index_store = IndexStore(os.path.join(tmp, "indexes"))
+        graph = get_vera_graph(memory=MemorySaver(), llm=llm, search_tool=search)
+        api.graph, api.memory = graph, None
+
+        if "graph" in args.sections:
+            print(f"⏱️  graph: {args.turns} turns...")
+            results["graph"] = asyncio.run(bench_graph(graph, tmp, args))
+        if "api" in args.sections:
+            print(f"⏱️  api: {args.api_turns} turns at concurrency {args.concurrency}...")
+            results["api"] = asyncio.run(bench_api(tmp, args))
+        if "ingestion" in args.sections:
+            print(f"⏱️  ingestion: {args.pages}-page PDF...")
+            results["ingestion"] = bench_ingestion(tmp, args)
+        registry.clear()
+    set_embedding_service(None)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("out", "baseline", "threshold")},
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if "graph" in results:
+        e2e = results["graph"]["end_to_end"]
+        print(f"\n🧭 graph end-to-end p50 {e2e['p50_ms']:.1f}ms  p95 {e2e['p95_ms']:.1f}ms  p99 {e2e['p99_ms']:.1f}ms")
+        for node, stats in results["graph"]["nodes"].items():
+            print(f"   {node:<18} n={stats['n']:<4} p50 {stats['p50_ms']:8.2f}ms  p95 {stats['p95_ms']:8.2f}ms")
+    for level, stats in results.get("api", {}).items():
+        print(f"🌐 /chat x{level:<4} {stats['turns_per_s']:7.2f} turns/s  p50 {stats['latency'].get('p50_ms', 0):8.1f}ms  "
+              f"p99 {stats['latency'].get('p99_ms', 0):8.1f}ms  status {stats['status']}")
+    for mode, stats in results.get("ingestion", {}).items():
+        print(f"📄 ingest {mode:<10} {stats['pages_per_s']:7.1f} pages/s  {stats['chunks_per_s']:8.1f} chunks/s")
+    print(f"\n💾 Saved {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n🔥 {len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Minimal OpenAI-compatible chat server for load tests (no GPU, no network).
+
+    python benchmarks/fake_openai_server.py --port 8799 --latency-ms 300
+
+Implements GET /v1/models and POST /v1/chat/completions (plain and SSE
+streaming). Each request waits `latency_ms` (an LLM's time-to-answer is
+almost entirely waiting on the server) and then returns a fixed reply with
+token usage, so the client side is what gets measured.
+"""
+import json
+import time
+import asyncio
+import argparse
+
+from aiohttp import web
+
+MODEL = "meta/llama-3.1-8b-instruct"
+
+
+def build_app(latency_ms: float = 300.0, reply: str = "This is a synthetic answer from the fake endpoint.") -> web.Application:
+    stats = {"requests": 0, "in_flight": 0, "peak_in_flight": 0}
+    words = reply.split()
+
+    def usage(body):
+        prompt = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        return {"prompt_tokens": prompt, "completion_tokens": len(words), "total_tokens": prompt + len(words)}
+
+    async def models(request):
+        return web.json_response({"object": "list", "data": [
+            {"id": MODEL, "object": "model", "owned_by": "fake", "created": 0}]})
+
+    async def completions(request):
+        body = await request.json()
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency_ms / 1000)
+            base = {"id": f"chatcmpl-{stats['requests']}", "created": int(time.time()), "model": body.get("model", MODEL)}
+            if not body.get("stream"):
+                return web.json_response({**base, "object": "chat.completion", "usage": usage(body), "choices": [
+                    {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": reply}}]})
+
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+            for i, word in enumerate(words):
+                delta = {"role": "assistant", "content": word if i == 0 else " " + word}
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            final = {**base, "object": "chat.completion.chunk", "usage": usage(body),
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            await response.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+            await response.write_eof()
+            return response
+        finally:
+            stats["in_flight"] -= 1
+
+    async def get_stats(request):
+        return web.json_response(stats)
+
+    app = web.Application()
+    app.router.add_get("/v1/models", models)
+    app.router.add_post("/v1/chat/completions", completions)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    args = parser.parse_args()
+    web.run_app(build_app(args.latency_ms), host="127.0.0.1", port=args.port, access_log=None, print=None,
+                backlog=4096)
+
+
+if __name__ == "__main__":
+    main()
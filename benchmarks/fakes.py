@@ -0,0 +1,149 @@
+"""
+Offline stand-ins for the heavy backends, with configurable latency.
+Embeddings are the test suite's KeywordEmbeddings (tests/fakes.py), at
+MiniLM's dimension.
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import asyncio
+
+from pydantic import BaseModel, Field
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tests.fakes import KeywordEmbeddings
+
+# all-MiniLM-L6-v2's output size, so index and search costs match production
+EMBED_DIM = 384
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers instantly (or after `latency_ms`) with a fixed
+    reply and reports token usage, so graph overhead can be measured alone.
+
+    `tool_script` lists tool names in order of preference: on a user turn the
+    first one that is bound gets called with the user's text as the query,
+    and the turn after the tool result gets the reply. Usage is prompt
+    chars/4 plus `completion_tokens` (default: words in the reply).
+    """
+
+    reply: str = "ok"
+    latency_ms: float = 0.0
+    tool_script: tuple = ()
+    completion_tokens: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        # Same work a real provider does: convert every tool to its schema
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _usage(self, messages):
+        prompt = sum(len(str(m.content)) for m in messages) // 4
+        completion = self.completion_tokens or len(self.reply.split())
+        return {"token_usage": {"prompt_tokens": prompt, "completion_tokens": completion,
+                                "total_tokens": prompt + completion}}
+
+    def _tool_call(self, messages, tools):
+        if not isinstance(messages[-1], HumanMessage):
+            return None
+        bound = {t["function"]["name"] for t in tools or ()}
+        name = next((n for n in self.tool_script if n in bound), None)
+        if name is None:
+            return None
+        return {"name": name, "args": {"query": messages[-1].content}, "id": f"call-{len(messages)}"}
+
+    def _result(self, messages, tools):
+        call = self._tool_call(messages, tools)
+        if call:
+            message = AIMessage(content="", tool_calls=[call], response_metadata=self._usage(messages))
+        else:
+            message = AIMessage(content=self.reply, response_metadata=self._usage(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self._result(messages, tools)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        # Awaits like a network call; the default would park a thread per request
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self._result(messages, tools)
+
+    def _chunks(self, messages=(), tools=None):
+        call = self._tool_call(messages, tools) if messages else None
+        if call:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}]))
+        else:
+            words = self.reply.split(" ")
+            for i, word in enumerate(words):
+                yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+        if messages:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata=self._usage(messages)))
+
+    def _stream(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        for chunk in self._chunks(messages, tools):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        for chunk in self._chunks(messages, tools):
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class _SearchInput(BaseModel):
+    query: str = Field(description="Search query")
+
+
+class FakeSearchTool(BaseTool):
+    """
+    Offline Tavily: same tool name and result shape, deterministic content
+    per query, `latency_ms` per call (sleeping, like waiting on the network).
+    """
+
+    name: str = "tavily_search"
+    description: str = "Search the web for current information."
+    args_schema: type = _SearchInput
+    latency_ms: float = 0.0
+    max_results: int = 1
+    calls: int = 0
+
+    def _results(self, query):
+        seed = zlib.crc32(query.encode())
+        return {"query": query, "results": [
+            {"title": f"Result {i} for {query}", "url": f"https://example.com/{seed:x}/{i}",
+             "content": f"Synthetic finding #{i} about {query}. " * 8, "score": round(1 - i / 10, 2)}
+            for i in range(self.max_results)]}
+
+    def _run(self, query: str, **kwargs):
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self._results(query)
+
+    async def _arun(self, query: str, **kwargs):
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self._results(query)
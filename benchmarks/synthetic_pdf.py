@@ -0,0 +1,67 @@
+"""
+Writes text-only PDFs for ingestion benchmarks (no reportlab needed).
+Each page gets `lines_per_page` lines of pseudo-random résumé-ish prose,
+seeded so every run produces byte-identical files.
+"""
+import random
+
+WORDS = (
+    "candidate experience python docker kubernetes mlops pipeline research "
+    "analysis model training deployment latency throughput vector search "
+    "retrieval embedding cluster data engineering project led team built "
+    "designed improved reduced scaled production monitoring metrics cloud"
+).split()
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_page_text(rng, lines_per_page=40, words_per_line=12):
+    return [" ".join(rng.choice(WORDS) for _ in range(words_per_line)) for _ in range(lines_per_page)]
+
+
+def write_pdf(path, pages=50, lines_per_page=40, seed=7):
+    """Writes a `pages`-page PDF to `path` and returns the path."""
+    rng = random.Random(seed)
+    objects = []  # 1-based object bodies
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")  # placeholder, filled once kids are known
+    kids = []
+    for page_no in range(pages):
+        lines = [f"Page {page_no + 1}"] + make_page_text(rng, lines_per_page)
+        ops = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"]
+        for line in lines:
+            ops.append(f"({_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, font_id, content_id)
+        ))
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref)
+
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
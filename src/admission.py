@@ -0,0 +1,182 @@
+import os
+import math
+import time
+import asyncio
+import logging
+import contextlib
+from collections import deque
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("vera_admission")
+
+# --- CONFIG ---
+# Chat turns running at once; the rest queue
+ADMIT_MAX_ACTIVE = int(os.getenv("VERA_ADMIT_MAX_ACTIVE", "64"))
+# Turns allowed to wait for a slot; beyond this, reject immediately
+ADMIT_MAX_QUEUE = int(os.getenv("VERA_ADMIT_MAX_QUEUE", "256"))
+# Longest a turn should wait in the queue; predicted or actual waits past this are shed
+ADMIT_TARGET_WAIT_S = float(os.getenv("VERA_ADMIT_TARGET_WAIT_S", "5"))
+# Smoothing for the service-time estimate used to predict queue wait
+EWMA_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Turn refused before any work (or tokens) were spent on it."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class _ThreadSlot:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0  # running + waiting turns on this thread
+
+
+class Ticket:
+    """An admitted turn. release() is idempotent (streams release from two places)."""
+
+    def __init__(self, controller: "AdmissionController", thread_id: str, slot: _ThreadSlot):
+        self.controller = controller
+        self.thread_id = thread_id
+        self.slot = slot
+        self.started = time.monotonic()
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller._release(self)
+
+
+class AdmissionController:
+    """
+    Bounds accepted chat work.
+
+    - At most `max_active` turns run at once; up to `max_queue` more wait.
+    - Turns on the same thread_id run one at a time (they'd otherwise race
+      the thread's checkpoint); a third concurrent turn on a thread gets 429.
+    - If the predicted wait (queue position x smoothed service time) or the
+      actual wait exceeds `target_wait`, the turn gets 503 + Retry-After
+      right away instead of timing out after tokens were spent.
+
+    Runs on the API's event loop; not thread-safe.
+    """
+
+    def __init__(self, max_active: int = ADMIT_MAX_ACTIVE, max_queue: int = ADMIT_MAX_QUEUE,
+                 target_wait: float = ADMIT_TARGET_WAIT_S):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.target_wait = target_wait
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._threads: Dict[str, _ThreadSlot] = {}
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = {"thread_busy": 0, "queue_full": 0, "overloaded": 0, "wait_timeout": 0}
+        self.service_ewma = 1.0
+        self.wait_ewma = 0.0
+        self._waits = deque(maxlen=1000)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_active)
+        return self._slots
+
+    def predicted_wait(self) -> float:
+        """Seconds a new turn would wait for a slot, from queue depth and recent service time."""
+        if self.active < self.max_active:
+            return 0.0
+        return (self.queued + 1) / self.max_active * self.service_ewma
+
+    def _reject(self, kind: str, status: int, reason: str, retry_after: float):
+        self.rejected[kind] += 1
+        logger.warning(f"🚦 Rejected turn ({kind}): {reason}")
+        raise AdmissionRejected(status, reason, retry_after)
+
+    async def acquire(self, thread_id: str) -> Ticket:
+        slot = self._threads.get(thread_id)
+        if slot is not None and slot.users >= 2:
+            self._reject("thread_busy", 429, "A turn is already running and one is queued for this thread.",
+                         self.service_ewma)
+        if self.queued >= self.max_queue:
+            self._reject("queue_full", 503, "Chat queue is full.", self.predicted_wait())
+        predicted = self.predicted_wait()
+        if predicted > self.target_wait:
+            self._reject("overloaded", 503, f"Server busy (predicted wait {predicted:.1f}s).", predicted)
+
+        slot = self._threads.setdefault(thread_id, slot or _ThreadSlot())
+        slot.users += 1
+        self.queued += 1
+        enqueued = time.monotonic()
+        try:
+            await asyncio.wait_for(self._enter(slot), self.target_wait)
+        except asyncio.TimeoutError:
+            self._forget(thread_id, slot)
+            self._reject("wait_timeout", 503, f"Waited over {self.target_wait:g}s for a slot.", self.service_ewma)
+        except BaseException:
+            self._forget(thread_id, slot)
+            raise
+        finally:
+            self.queued -= 1
+
+        wait = time.monotonic() - enqueued
+        self._waits.append(wait)
+        self.wait_ewma += EWMA_ALPHA * (wait - self.wait_ewma)
+        self.active += 1
+        self.admitted += 1
+        return Ticket(self, thread_id, slot)
+
+    @contextlib.asynccontextmanager
+    async def admit(self, thread_id: str):
+        ticket = await self.acquire(thread_id)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    async def _enter(self, slot: _ThreadSlot):
+        # Thread lock first, so a thread's second turn doesn't sit on a global slot
+        await slot.lock.acquire()
+        try:
+            await self._semaphore().acquire()
+        except BaseException:
+            slot.lock.release()
+            raise
+
+    def _forget(self, thread_id: str, slot: _ThreadSlot):
+        slot.users -= 1
+        if slot.users <= 0 and self._threads.get(thread_id) is slot:
+            del self._threads[thread_id]
+
+    def _release(self, ticket: Ticket):
+        self.service_ewma += EWMA_ALPHA * ((time.monotonic() - ticket.started) - self.service_ewma)
+        self.active -= 1
+        self._semaphore().release()
+        ticket.slot.lock.release()
+        self._forget(ticket.thread_id, ticket.slot)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "active": self.active,
+            "max_active": self.max_active,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "target_wait_s": self.target_wait,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "wait_ms_avg": round(self.wait_ewma * 1000, 1),
+            "wait_ms_p95": round(waits[int(len(waits) * 0.95) - 1] * 1000, 1) if waits else 0.0,
+            "service_ms_avg": round(self.service_ewma * 1000, 1),
+            "predicted_wait_ms": round(self.predicted_wait() * 1000, 1),
+        }
+
+
+# Singleton Instance (one per API process)
+admission = AdmissionController()
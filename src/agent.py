@@ -1,27 +1,38 @@
+import asyncio
 import logging
+import time
 import uuid
-import re  # <--- NEW IMPORT
 from typing import Annotated
 from typing_extensions import TypedDict
 
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode, tools_condition
 
-from langchain_nvidia_ai_endpoints import ChatNVIDIA
-from langchain_tavily import TavilySearch
-from langchain_core.messages import SystemMessage, AIMessage, trim_messages
+from langchain_core.messages import SystemMessage, AIMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 
-from rag_engine import lookup_document, is_document_uploaded 
-from budget import global_budget 
+from rag_engine import lookup_document, is_document_uploaded, get_thread_id
+from budget import global_budget, get_tenant_id, BUDGET_COMPLETION_RESERVE
+from route_stats import route_stats
+from web_search import CachedSearchTool
+from tool_runner import timed
+from router import IntentRouter, default_router
+from context_window import context_window, count_tokens
+from llm_client import create_chat_model, llm_limiter, LLM_TIMEOUT
+from metrics import instrument_node, LLM_SECONDS, ROUTE_DECISIONS
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("vera_agent")
 
+def merge_profile(old: dict, new: dict) -> dict:
+    """Reducer: personal facts accumulate over the thread, newest value wins."""
+    return {**(old or {}), **(new or {})}
+
 # Define State
 class AgentState(TypedDict):
     messages: Annotated[list, add_messages]
+    user_profile: Annotated[dict, merge_profile]
 
 # --- SYSTEM PROMPTS ---
 PROMPT_WITH_DOC = SystemMessage(content="""
@@ -41,98 +52,190 @@ RULES:
 3. If the user asks to "summarize" or "search the file", politely reply: "Please upload a document first."
 """)
 
-def get_vera_graph(model_name: str = "meta/llama-3.1-8b-instruct", memory=None):
-    
+# --- INSTANT REPLIES (No LLM, No Cost) ---
+# Templates live in router.INSTANT_TEMPLATES; only whole-message matches qualify.
+IDENTITY_REPLY = (
+    "I'm Vera, an AI Research Agent. I can research topics on the web, answer "
+    "questions about PDFs you upload, and remember details you share with me."
+)
+
+def instant_reply_for(text: str, profile: dict, router: IntentRouter = default_router):
+    """
+    Returns (reply, profile_update) when a turn can be answered from a
+    template, else None.
+    """
+    intent = router.classify(text)
+    name = profile.get("name")
+
+    if intent.template == "greeting":
+        who = f", {name}" if name else ""
+        return f"Hello{who}! I'm Vera. How can I help you today?", {}
+    if intent.template == "identity":
+        return IDENTITY_REPLY, {}
+    if intent.template == "name":
+        new_name = intent.value
+        if new_name.islower():
+            new_name = new_name.title()
+        return f"Nice to meet you, {new_name}! I'll remember that.", {"name": new_name}
+    if intent.template == "email":
+        return f"Got it. I'll remember that your email is {intent.value}.", {"email": intent.value}
+    if intent.template == "recall_name" and name:
+        return f"Your name is {name}.", {}
+    return None
+
+def profile_prompt(prompt: SystemMessage, profile: dict) -> SystemMessage:
+    """Appends remembered facts so they survive history trimming."""
+    if not profile:
+        return prompt
+    facts = "\n".join(f"- {key}: {value}" for key, value in sorted(profile.items()))
+    return SystemMessage(content=f"{prompt.content}\nKNOWN USER FACTS:\n{facts}\n")
+
+def get_vera_graph(model_name: str = "meta/llama-3.1-8b-instruct", memory=None, llm=None, search_tool=None):
+    # Imported here, not at module level: langgraph.prebuilt pulls in
+    # transformers via langchain_core's language models (seconds of import)
+    from langgraph.prebuilt import ToolNode, tools_condition
+
     # --- MEMORY MANAGEMENT ---
     def trim_history(messages):
-        return trim_messages(
-            messages,
-            max_tokens=10, 
-            strategy="last",
-            token_counter=len, 
-            include_system=True, 
-            allow_partial=False,
-            start_on="human"
-        )
+        # Real token budget (minus tool-output headroom), whole turns only
+        return context_window.trim(messages)
 
     # --- 1. Tools ---
-    tavily_tool = TavilySearch(max_results=1, topic="general")
-    tools_all = [tavily_tool, lookup_document] 
-    tools_web_only = [tavily_tool]             
+    if search_tool is None:
+        # Cached + coalesced: identical searches across threads hit Tavily once per TTL
+        from langchain_tavily import TavilySearch
+        search_tool = CachedSearchTool(TavilySearch(max_results=1, topic="general"))
+    # Own thread pools + deadlines; ToolNode runs one turn's calls concurrently
+    web_tool = timed(search_tool, pool_kind="web")
+    doc_tool = timed(lookup_document, pool_kind="doc")
+    tools_all = [web_tool, doc_tool]
+    tools_web_only = [web_tool]
     tool_node = ToolNode(tools_all)
 
     # --- 2. Model ---
-    llm = ChatNVIDIA(model=model_name, temperature=0.5) 
+    if llm is None:
+        # Shares the process-wide keep-alive connection pool
+        llm = create_chat_model(model_name, temperature=0.5)
+    # Tool-bound variants are built once per graph, not once per turn
+    llm_doc = llm.bind_tools(tools_all)
+    llm_web = llm.bind_tools(tools_web_only)
+
+    # One compiled classifier for every routing decision in this graph
+    router = IntentRouter()
 
     # --- 3. Reasoning Node (The Brain) ---
-    def reasoning_node(state: AgentState):
+    def prepare_turn(state: AgentState, config: RunnableConfig):
+        """Prompt, model variant, trimmed history and budget reservation (or a halt message)."""
         messages = state["messages"]
-        
-        # Guardrail: Budget Check
-        if not global_budget.check_budget():
-            return {"messages": [AIMessage(content="🛑 **SYSTEM HALT**: Daily Token Budget Exceeded.")]}
 
         # --- DYNAMIC LOGIC START ---
-        has_doc = is_document_uploaded()
+        has_doc = is_document_uploaded(get_thread_id(config))
         
         # 1. Select Prompt
         current_prompt = PROMPT_WITH_DOC if has_doc else PROMPT_NO_DOC
+        current_prompt = profile_prompt(current_prompt, state.get("user_profile") or {})
         if isinstance(messages[0], SystemMessage):
             messages[0] = current_prompt 
         else:
             messages = [current_prompt] + messages 
 
-        # 2. INTELLIGENT FILTERS
-        last_msg_text = messages[-1].content.lower().strip()
-        
-        # Filter A: Chitchat (Greetings)
-        chitchat_triggers = ["hello", "hi", "hey", "hola", "greetings", "good morning", "who are you"]
-        is_chitchat = any(last_msg_text.startswith(t) for t in chitchat_triggers) and len(last_msg_text) < 20
-
-        # Filter B: Personal Info (My name is...) - NEW!
-        # If user says "My name is X", we disable tools so it DOES NOT search.
-        personal_patterns = [
-            r"my name is",
-            r"i am",
-            r"call me",
-            r"i'm",
-            r"my email is"
-        ]
-        is_personal = any(re.search(p, last_msg_text) for p in personal_patterns)
-
-        # 3. Bind Tools Accordingly
-        if is_chitchat or is_personal:
+        # 2. INTELLIGENT FILTERS (one pass over the message)
+        intent = router.classify(messages[-1].content)
+
+        # 3. Pick the prebuilt model variant
+        if intent.chitchat or intent.personal:
             # FORCE: Pure LLM response (No Search)
             llm_active = llm
         elif has_doc:
             # PDF Mode: RAG + Web
-            llm_active = llm.bind_tools(tools_all)
+            llm_active = llm_doc
         else:
             # Web Mode: Web only
-            llm_active = llm.bind_tools(tools_web_only)
-        # ----------------------------
+            llm_active = llm_web
+
+        trimmed_messages = trim_history(messages)
+        prompt_tokens = sum(context_window.message_tokens(m) for m in trimmed_messages)
 
+        # Guardrail: Budget Check (reserves prompt + expected completion up front)
+        reservation = global_budget.check_budget(get_tenant_id(config), prompt_tokens + BUDGET_COMPLETION_RESERVE)
+        if not reservation:
+            return None, {"messages": [AIMessage(content="🛑 **SYSTEM HALT**: Daily Token Budget Exceeded.")]}
+        return (llm_active, trimmed_messages, prompt_tokens, reservation), None
+
+    def settle_turn(turn, response, started: float):
+        _, _, prompt_tokens, reservation = turn
+        usage = response.response_metadata.get("token_usage", {}) or {}
+        elapsed = time.perf_counter() - started
+        LLM_SECONDS.observe(elapsed)
+        route_stats.record("agent", elapsed, tokens_used=usage.get("total_tokens", 0))
+        global_budget.update_cost(response.response_metadata, reservation=reservation,
+                                  fallback_tokens=prompt_tokens + count_tokens(str(response.content)))
+        return {"messages": [response]}
+
+    def failed_turn(turn, error: Exception):
+        turn[3].release()
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+            error = f"LLM call timed out: {error}" if str(error) else f"LLM call timed out after {LLM_TIMEOUT:.0f}s"
+        logger.error(f"LLM Call Failed: {error}")
+        return {"messages": [AIMessage(content=f"⚠️ System Error: {str(error)}")]}
+
+    def reasoning_node(state: AgentState, config: RunnableConfig):
+        """Sync path (graph.invoke / Streamlit): holds a worker thread for the call."""
+        turn, halt = prepare_turn(state, config)
+        if halt:
+            return halt
         try:
-            trimmed_messages = trim_history(messages)
-            response = llm_active.invoke(trimmed_messages)
-            global_budget.update_cost(response.response_metadata)
-            return {"messages": [response]}
-            
+            with llm_limiter.sync_slot():
+                started = time.perf_counter()
+                response = turn[0].invoke(turn[1], config)
+            return settle_turn(turn, response, started)
         except Exception as e:
-            logger.error(f"LLM Call Failed: {e}")
-            return {"messages": [AIMessage(content=f"⚠️ System Error: {str(e)}")]}
+            return failed_turn(turn, e)
+
+    async def areasoning_node(state: AgentState, config: RunnableConfig):
+        """
+        Async path (FastAPI): the call is awaited on the pooled keep-alive
+        session, so in-flight chats are bounded by llm_limiter, not by the
+        executor's thread count. Under astream(stream_mode="messages"), ainvoke
+        streams the tokens (the model switches to its astream path automatically).
+        The budget and document checks run on a worker thread: in shared mode
+        they are SQLite transactions that may wait on another worker's lock.
+        """
+        turn, halt = await asyncio.to_thread(prepare_turn, state, config)
+        if halt:
+            return halt
+        try:
+            async with llm_limiter.slot():
+                started = time.perf_counter()
+                response = await asyncio.wait_for(turn[0].ainvoke(turn[1], config), LLM_TIMEOUT)
+            return await asyncio.to_thread(settle_turn, turn, response, started)
+        except Exception as e:
+            return await asyncio.to_thread(failed_turn, turn, e)
 
     # --- 4. Fast Path Optimization ---
-    def route_start(state: AgentState):
-        last_msg = state["messages"][-1].content.lower()
-        fast_keywords = ["pdf", "resume", "cv", "document", "file", "candidate", "skills"]
-        
-        if is_document_uploaded() and any(k in last_msg for k in fast_keywords):
-            return "fast_doc_trigger"
-        
-        return "agent"
+    def route_start(state: AgentState, config: RunnableConfig):
+        last_msg = state["messages"][-1].content
+        profile = state.get("user_profile") or {}
+        intent = router.classify(last_msg)
+        # Only pay for the document check when the turn could use it
+        has_doc = intent.doc_keyword and is_document_uploaded(get_thread_id(config))
+        route = router.route(last_msg, has_doc, profile)
+        ROUTE_DECISIONS.inc(route)
+        return route
+
+    def instant_reply(state: AgentState):
+        """Answers greetings/identity/personal-fact turns from templates: zero LLM tokens."""
+        start = time.perf_counter()
+        messages = state["messages"]
+        reply, profile_update = instant_reply_for(messages[-1].content, state.get("user_profile") or {}, router)
+
+        # What the LLM round trip would have cost: the trimmed prompt plus the reply
+        saved = sum(context_window.message_tokens(m) for m in trim_history(messages)) + count_tokens(reply)
+        route_stats.record("instant_reply", time.perf_counter() - start, tokens_saved=saved)
+        return {"messages": [AIMessage(content=reply)], "user_profile": profile_update}
 
     def fast_doc_trigger(state: AgentState):
+        route_stats.record("fast_doc_trigger")
         last_user_msg = state["messages"][-1].content
         tool_call_id = str(uuid.uuid4())
         fast_tool_msg = AIMessage(
@@ -146,12 +249,27 @@ def get_vera_graph(model_name: str = "meta/llama-3.1-8b-instruct", memory=None):
         return {"messages": [fast_tool_msg]}
 
     # --- 5. Graph Construction ---
+    # Every node (and the entry routing decision) reports to vera_node_seconds
+    def run_tools(state: AgentState, config: RunnableConfig):
+        return tool_node.invoke(state, config)
+
+    async def arun_tools(state: AgentState, config: RunnableConfig):
+        return await tool_node.ainvoke(state, config)
+
     builder = StateGraph(AgentState)
-    builder.add_node("agent", reasoning_node)
-    builder.add_node("tools", tool_node)
-    builder.add_node("fast_doc_trigger", fast_doc_trigger)
+    builder.add_node("agent", RunnableLambda(instrument_node("agent", reasoning_node),
+                                             instrument_node("agent", areasoning_node), name="agent"))
+    builder.add_node("tools", RunnableLambda(instrument_node("tools", run_tools),
+                                             instrument_node("tools", arun_tools), name="tools"))
+    builder.add_node("fast_doc_trigger", instrument_node("fast_doc_trigger", fast_doc_trigger))
+    builder.add_node("instant_reply", instrument_node("instant_reply", instant_reply))
     
-    builder.add_conditional_edges(START, route_start, {"fast_doc_trigger": "fast_doc_trigger", "agent": "agent"})
+    builder.add_conditional_edges(
+        START,
+        instrument_node("route_start", route_start),
+        {"instant_reply": "instant_reply", "fast_doc_trigger": "fast_doc_trigger", "agent": "agent"},
+    )
+    builder.add_edge("instant_reply", END)
     builder.add_edge("fast_doc_trigger", "tools")
     builder.add_conditional_edges("agent", tools_condition)
     builder.add_edge("tools", "agent")
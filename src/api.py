@@ -1,44 +1,86 @@
 import os
-import json
 import uuid
-import shutil
-from contextlib import asynccontextmanager
+import hashlib
+from contextlib import asynccontextmanager, suppress
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+from starlette.background import BackgroundTask
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from langchain_core.messages import HumanMessage
 
 # Import Graph Logic
 from agent import get_vera_graph
-from rag_engine import process_document
+from rag_engine import index_store, remove_document, list_documents, retrieval_cache_stats
+from ingestion import ingestion_queue, IngestionQueueFull, UPLOAD_DIR, UPLOAD_CHUNK_BYTES
+from parallel_ingest import shutdown_parse_pool
+from web_search import web_search_stats
+from route_stats import route_stats
+from context_window import context_window
+from embedding_service import init_embedding_service, get_embedding_service, shutdown_embedding_service
+from index_registry import registry
+from budget import global_budget
+from llm_client import llm_pool, llm_stats
+from admission import admission, AdmissionRejected
+from streaming import stream_turn, stream_stats
+from tool_runner import tool_stats, shutdown_tool_pools
+from metrics import metrics, CONTENT_TYPE
+from warmup import warmup, WARMUP_MODE
 
-# --- FIX: Use In-Memory Checkpointer (Stable) ---
-from langgraph.checkpoint.memory import MemorySaver
+# --- Checkpointer: durable SQLite (WAL, write-behind) or MemorySaver via VERA_CHECKPOINTER ---
+from checkpointer import create_checkpointer, checkpoint_mode
 
 # --- GLOBAL VARIABLES ---
 graph = None  # Will be initialized on startup
+memory = None
 
-# --- LIFESPAN MANAGER ---
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    global graph
-    print("✅ Initializing In-Memory Persistence...")
+# --- WARM-UP STEPS ---
+def build_graph():
+    global graph, memory
+    print(f"✅ Initializing Persistence ({checkpoint_mode()})...")
     
-    # Use MemorySaver instead of SQLite to avoid the 'is_alive' bug
-    memory = MemorySaver()
+    # Our own SQLite saver: sidesteps the aiosqlite 'is_alive' bug in AsyncSqliteSaver
+    memory = create_checkpointer()
     
     # Build Graph with this memory
     graph = get_vera_graph(memory=memory)
     print("✅ Graph initialized successfully.")
+
+def preload_ingestion():
+    # The PDF loader and text splitters are lazy imports; pay for them now, not on the first upload
+    from langchain_community.document_loaders import PyPDFLoader  # noqa: F401
+    from langchain_text_splitters import RecursiveCharacterTextSplitter  # noqa: F401
+
+# Graph first (time-to-first-chat), then the embedder model, then ingestion imports
+warmup.add("graph", build_graph)
+warmup.add("embedder", init_embedding_service)
+warmup.add("ingestion", preload_ingestion)
+
+# --- LIFESPAN MANAGER ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background mode: listen now (/health is live), /ready flips once warm
+    print(f"✅ Warming up ({WARMUP_MODE})...")
+    if WARMUP_MODE == "blocking":
+        await run_in_threadpool(warmup.start, True)
+    else:
+        warmup.start()
     
     yield  # Application runs here
     
     print("🛑 Shutting down...")
+    ingestion_queue.shutdown(wait=False)
+    shutdown_parse_pool()
+    shutdown_tool_pools()
+    shutdown_embedding_service()
+    await llm_pool.aclose()
+    if hasattr(memory, "close"):
+        memory.close()  # commits any queued checkpoint writes
 
 # --- APP SETUP ---
 app = FastAPI(title="Project Vera API", lifespan=lifespan)
@@ -52,61 +94,155 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Shed load before spending tokens: 429 (thread busy) / 503 (queue) with Retry-After
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request, exc: AdmissionRejected):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.reason},
+                        headers={"Retry-After": str(exc.retry_after)})
+
 # Define Input Structure
 class ChatRequest(BaseModel):
     message: str
     thread_id: str = None
+    user_id: str = None  # per-tenant token budget; defaults to the thread
 
 # --- ENDPOINTS ---
 
 @app.get("/health")
 def health_check():
-    return {"status": "active", "model": "Llama 3 8B", "mode": "Memory"}
+    # Liveness: answers as soon as the server listens, warm or not
+    return {"status": "active", "model": "Llama 3 8B", "mode": checkpoint_mode()}
+
+@app.get("/ready")
+def readiness_check():
+    # Readiness: 200 once the graph, embedder and ingestion deps are warm, else 503;
+    # also 503 while checkpoint writes keep failing (turns would not be saved)
+    report = warmup.stats()
+    if getattr(memory, "degraded", False):
+        report.update(status="degraded", ready=False,
+                      checkpoints={"failed_commits": memory.failed_commits, "last_error": memory.last_error})
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+async def get_graph():
+    """The compiled graph, waiting (up to VERA_READY_WAIT_S) for warm-up to build it."""
+    if graph is None and not await warmup.wait("graph"):
+        raise HTTPException(status_code=503, detail="Warming up, retry shortly", headers={"Retry-After": "5"})
+    return graph
+
+# One table feeds /stats (JSON) and /metrics (read as gauges at scrape time)
+STATS_SECTIONS = {
+    "embeddings": lambda: get_embedding_service().stats(),
+    "indexes": registry.stats,
+    "index_store": index_store.stats,
+    "retrieval_cache": retrieval_cache_stats,
+    "web_search": web_search_stats,
+    "tools": tool_stats.stats,
+    "routes": route_stats.stats,
+    "context": context_window.stats,
+    "budget": global_budget.stats,
+    "llm": llm_stats,
+    "admission": admission.stats,
+    "streaming": stream_stats.stats,
+    "checkpoints": lambda: memory.stats() if hasattr(memory, "stats") else {"mode": "memory"},
+    "ingestion": ingestion_queue.stats,
+    "warmup": warmup.stats,
+}
+# Sections keyed by a dynamic name export it as a label, e.g. vera_tools_calls{tool="..."}
+STATS_LABELS = {"tools": "tool", "routes": "route"}
+for _section, _collect in STATS_SECTIONS.items():
+    metrics.register_stats(_section, _collect, label=STATS_LABELS.get(_section))
 
-@app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+@app.get("/stats")
+def stats():
+    return {section: collect() for section, collect in STATS_SECTIONS.items()}
+
+@app.get("/metrics")
+def prometheus_metrics():
+    # Node/LLM/tool/ingestion histograms plus every /stats counter, in Prometheus text format
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+@app.post("/upload", status_code=202)
+async def upload_file(file: UploadFile = File(...), thread_id: str = Form(None)):
+    # thread_id scopes the document to one conversation; omit it to share globally
+    filename = os.path.basename(file.filename or "upload.pdf")
+    file_location = os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}-{filename}")
     try:
-        file_location = f"/tmp/{file.filename}"
-        with open(file_location, "wb+") as file_object:
-            shutil.copyfileobj(file.file, file_object)
-        
-        process_document(file_location)
-        return {"status": "success", "filename": file.filename}
+        try:
+            # Stream to disk in chunks (hashing as we go) without blocking the loop
+            digest = hashlib.sha256()
+            with open(file_location, "wb") as file_object:
+                while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                    digest.update(chunk)
+                    await run_in_threadpool(file_object.write, chunk)
+
+            job = ingestion_queue.submit(file_location, filename, thread_id=thread_id,
+                                         content_hash=digest.hexdigest())
+        except Exception:
+            # Not queued, so nothing else will ever delete the upload
+            with suppress(OSError):
+                os.remove(file_location)
+            raise
+    except IngestionQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return {"status": "queued", "job_id": job.job_id, "filename": filename, "thread_id": thread_id}
+
+@app.get("/upload/{job_id}")
+def upload_status(job_id: str):
+    status = ingestion_queue.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return status
+
+@app.get("/documents")
+def documents(thread_id: str = None):
+    return {"thread_id": thread_id, "documents": list_documents(thread_id)}
+
+@app.delete("/documents/{doc_id}")
+def delete_document(doc_id: str, thread_id: str = None):
+    if not remove_document(doc_id, thread_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"status": "deleted", "doc_id": doc_id, "thread_id": thread_id}
+
 @app.post("/chat")
 async def chat_endpoint(request: ChatRequest):
     thread_id = request.thread_id or str(uuid.uuid4())
-    config = {"configurable": {"thread_id": thread_id}}
+    config = {"configurable": {"thread_id": thread_id, "user_id": request.user_id}}
 
-    try:
-        # Use await because the graph is async
-        response = await graph.ainvoke(
-            {"messages": [HumanMessage(content=request.message)]},
-            config=config
-        )
-        ai_message = response["messages"][-1].content
-        return {"response": ai_message, "thread_id": thread_id}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    graph = await get_graph()
+    # One turn per thread at a time, bounded global concurrency (raises AdmissionRejected)
+    async with admission.admit(thread_id):
+        try:
+            # Use await because the graph is async
+            response = await graph.ainvoke(
+                {"messages": [HumanMessage(content=request.message)]},
+                config=config
+            )
+            ai_message = response["messages"][-1].content
+            return {"response": ai_message, "thread_id": thread_id}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/chat/stream")
 async def chat_stream(request: ChatRequest):
+    thread_id = request.thread_id or str(uuid.uuid4())
+    config = {"configurable": {"thread_id": thread_id, "user_id": request.user_id}}
+    graph = await get_graph()
+    # Admit before the 200 goes out, so rejections are real 429/503 responses
+    ticket = await admission.acquire(thread_id)
+
     async def event_generator():
-        thread_id = request.thread_id or str(uuid.uuid4())
-        config = {"configurable": {"thread_id": thread_id}}
-        
-        # Stream events
-        async for event in graph.astream_events(
-            {"messages": [HumanMessage(content=request.message)]},
-            config=config,
-            version="v1"
-        ):
-            kind = event["event"]
-            if kind == "on_chat_model_stream":
-                content = event["data"]["chunk"].content
-                if content:
-                    yield f"data: {json.dumps({'token': content})}\n\n"
-                    
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
\ No newline at end of file
+        try:
+            # Typed SSE: thread, tool_start/tool_end, token, heartbeat, done (TTFT + tokens/sec)
+            inputs = {"messages": [HumanMessage(content=request.message)]}
+            async for event in stream_turn(graph, inputs, config):
+                yield event
+        finally:
+            ticket.release()
+
+    # The background task covers clients that disconnect before the body starts
+    return StreamingResponse(event_generator(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                             background=BackgroundTask(ticket.release))
\ No newline at end of file
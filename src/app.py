@@ -55,7 +55,7 @@ with st.sidebar:
     st.caption(f"Status: {global_budget.get_status()}")
     
     if st.button("Reset Budget 🔄"):
-        global_budget.used = 0
+        global_budget.reset()
         st.rerun()
 
 # --- MAIN APP ---
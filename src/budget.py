@@ -1,49 +1,435 @@
+import os
+import time
 import logging
-from typing import Dict, Any
+import threading
+import itertools
+from collections import deque
+from typing import Dict, Any, Optional
+
+from shared_state import get_shared_store
 
 logger = logging.getLogger("vera_budget")
 
-class BudgetManager:
-    def __init__(self, max_daily_tokens: int = 500000):
-        self.limit = max_daily_tokens
-        self.used = 0
+# --- CONFIG ---
+# Global wallet across every tenant (sliding 24h / 60s windows; 0 disables a limit)
+BUDGET_DAILY = int(os.getenv("VERA_BUDGET_DAILY", "20000"))
+BUDGET_MINUTE = int(os.getenv("VERA_BUDGET_MINUTE", "0"))
+# Per-tenant limits (tenant = user_id/tenant_id from the request, else the thread)
+BUDGET_TENANT_DAILY = int(os.getenv("VERA_BUDGET_TENANT_DAILY", "0"))
+BUDGET_TENANT_MINUTE = int(os.getenv("VERA_BUDGET_TENANT_MINUTE", "0"))
+# Completion tokens held back up front, on top of the prompt
+BUDGET_COMPLETION_RESERVE = int(os.getenv("VERA_BUDGET_COMPLETION_RESERVE", "512"))
+# A reservation nobody settled (crashed request) stops counting after this long
+BUDGET_RESERVATION_TTL = float(os.getenv("VERA_BUDGET_RESERVATION_TTL", "120"))
+BUDGET_SHARDS = 16
+# Idle tenant accounts are dropped once a shard holds this many
+TENANT_PRUNE_AT = 4096
+
+DAY = 86400.0
+MINUTE = 60.0
+DEFAULT_TENANT = "anonymous"
+
+
+def get_tenant_id(config) -> str:
+    """Who pays for a turn: explicit tenant/user id, else the conversation thread."""
+    configurable = (config or {}).get("configurable", {})
+    return str(configurable.get("tenant_id") or configurable.get("user_id")
+               or configurable.get("thread_id") or DEFAULT_TENANT)
+
+
+class SlidingWindow:
+    """Token total over the last `span` seconds, kept in `buckets` time buckets (not thread-safe)."""
+
+    __slots__ = ("span", "width", "_buckets", "_total")
+
+    def __init__(self, span: float, buckets: int):
+        self.span = span
+        self.width = span / buckets
+        self._buckets = deque()  # [bucket_start, tokens]
+        self._total = 0
+
+    def _expire(self, now: float):
+        horizon = now - self.span
+        while self._buckets and self._buckets[0][0] + self.width <= horizon:
+            self._total -= self._buckets.popleft()[1]
+
+    def add(self, tokens: int, now: float):
+        start = now - (now % self.width)
+        if self._buckets and self._buckets[-1][0] == start:
+            self._buckets[-1][1] += tokens
+        else:
+            self._buckets.append([start, tokens])
+        self._total += tokens
+        self._expire(now)
+
+    def total(self, now: float) -> int:
+        self._expire(now)
+        return self._total
+
+    def clear(self):
+        self._buckets.clear()
+        self._total = 0
+
+
+class _Account:
+    """Usage windows plus outstanding reservations for one tenant (or the global wallet)."""
+
+    __slots__ = ("day", "minute", "reserved", "requests", "estimated")
+
+    def __init__(self):
+        self.day = SlidingWindow(DAY, 24)
+        self.minute = SlidingWindow(MINUTE, 12)
+        self.reserved: Dict[int, tuple] = {}  # reservation id -> (tokens, expires_at)
         self.requests = 0
+        self.estimated = 0
+
+    def held(self, now: float) -> int:
+        expired = [rid for rid, (_, expires) in self.reserved.items() if expires <= now]
+        for rid in expired:
+            del self.reserved[rid]
+        return sum(tokens for tokens, _ in self.reserved.values())
 
-    def check_budget(self) -> bool:
-        """Returns True if we are safe. Returns False if budget exceeded."""
-        if self.used >= self.limit:
-            logger.warning(f"💸 BUDGET EXCEEDED: Used {self.used}/{self.limit} tokens.")
+    def fits(self, tokens: int, day_limit: int, minute_limit: int, now: float) -> bool:
+        held = self.held(now)
+        if day_limit and self.day.total(now) + held + tokens > day_limit:
+            return False
+        if minute_limit and self.minute.total(now) + held + tokens > minute_limit:
             return False
         return True
 
-    def update_cost(self, response_metadata: Dict[str, Any]):
+    def charge(self, tokens: int, now: float):
+        self.day.add(tokens, now)
+        self.minute.add(tokens, now)
+        self.requests += 1
+
+
+class Reservation:
+    """
+    Tokens held against a tenant's (and the global) budget until the call
+    settles. Truthy, so `if not budget.check_budget(...)` keeps working.
+    """
+
+    def __init__(self, manager: "BudgetManager", tenant: str, rid: int, tokens: int):
+        self.manager = manager
+        self.tenant = tenant
+        self.rid = rid
+        self.tokens = tokens
+        self.settled = False
+
+    def commit(self, used_tokens: int):
+        self.manager._settle(self, used_tokens)
+
+    def release(self):
+        self.manager._settle(self, 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if not self.settled:
+            self.release()
+
+
+class BudgetManager:
+    """
+    Token budgets per tenant and globally, over sliding day and minute windows.
+
+    Tenants are spread over lock shards so concurrent users rarely contend;
+    the global wallet has its own lock, held only for its own short check
+    and never together with a shard lock. check_budget() reserves the
+    expected cost up front (tenant first, then the wallet, rolling the
+    tenant hold back if the wallet refuses), so N concurrent requests
+    can't all pass the check and overshoot the limit together.
+    """
+
+    def __init__(self, max_daily_tokens: int = BUDGET_DAILY, max_minute_tokens: int = BUDGET_MINUTE,
+                 tenant_daily: int = BUDGET_TENANT_DAILY, tenant_minute: int = BUDGET_TENANT_MINUTE,
+                 shards: int = BUDGET_SHARDS):
+        self.limit = max_daily_tokens
+        self.minute_limit = max_minute_tokens
+        self.tenant_daily = tenant_daily
+        self.tenant_minute = tenant_minute
+        self._shards = [(threading.Lock(), {}) for _ in range(shards)]
+        self._global_lock = threading.Lock()
+        self._global = _Account()
+        self._ids = itertools.count(1)
+        self.rejected = 0
+
+    def _shard(self, tenant: str):
+        return self._shards[hash(tenant) % len(self._shards)]
+
+    # --- RESERVE / SETTLE ---
+    def check_budget(self, tenant: str = DEFAULT_TENANT, estimate: int = BUDGET_COMPLETION_RESERVE) -> Optional[Reservation]:
+        """Returns a Reservation if `estimate` tokens fit every window, else None."""
+        now = time.time()
+        rid = next(self._ids)
+        expires = now + BUDGET_RESERVATION_TTL
+        lock, accounts = self._shard(tenant)
+        with lock:
+            if tenant not in accounts and len(accounts) >= TENANT_PRUNE_AT:
+                self._prune(accounts, now)
+            account = accounts.get(tenant) or accounts.setdefault(tenant, _Account())
+            if not account.fits(estimate, self.tenant_daily, self.tenant_minute, now):
+                self._reject(f"💸 TENANT BUDGET EXCEEDED: '{tenant}'")
+                return None
+            # Held on the tenant first; dropped again below if the global wallet says no
+            account.reserved[rid] = (estimate, expires)
+        with self._global_lock:
+            granted = self._global.fits(estimate, self.limit, self.minute_limit, now)
+            if granted:
+                self._global.reserved[rid] = (estimate, expires)
+            else:
+                used = self._global.day.total(now)
+        if not granted:
+            with lock:
+                account.reserved.pop(rid, None)
+            self._reject(f"💸 BUDGET EXCEEDED: Used {used}/{self.limit} tokens.")
+            return None
+        return Reservation(self, tenant, rid, estimate)
+
+    def _reject(self, message: str):
+        with self._global_lock:
+            self.rejected += 1
+        logger.warning(message)
+
+    @staticmethod
+    def _prune(accounts: dict, now: float):
+        # Caller holds the shard lock
+        idle = [t for t, a in accounts.items() if not a.day.total(now) and not a.held(now)]
+        for tenant in idle:
+            del accounts[tenant]
+
+    def _settle(self, reservation: Reservation, used_tokens: int, estimated: bool = False):
+        if reservation.settled:
+            return
+        reservation.settled = True
+        now = time.time()
+        lock, accounts = self._shard(reservation.tenant)
+        with lock:
+            account = accounts.get(reservation.tenant) or accounts.setdefault(reservation.tenant, _Account())
+            account.reserved.pop(reservation.rid, None)
+            if used_tokens:
+                account.charge(used_tokens, now)
+                account.estimated += int(estimated)
+        with self._global_lock:
+            self._global.reserved.pop(reservation.rid, None)
+            if used_tokens:
+                self._global.charge(used_tokens, now)
+                self._global.estimated += int(estimated)
+        if used_tokens:
+            logger.info(f"💰 Cost Update: +{used_tokens} tokens ({reservation.tenant}). "
+                        f"Total: {self.used}/{self.limit}")
+
+    def update_cost(self, response_metadata: Dict[str, Any], reservation: Optional[Reservation] = None,
+                    tenant: str = DEFAULT_TENANT, fallback_tokens: int = 0):
         """
         Parses NVIDIA/OpenAI metadata to track usage.
         Structure usually looks like: {'token_usage': {'total_tokens': 150, ...}}
+        Without usage metadata (some self-hosted NIMs) `fallback_tokens`, the
+        caller's estimate of prompt + completion, is charged instead.
         """
         try:
-            usage = response_metadata.get("token_usage", {})
+            usage = (response_metadata or {}).get("token_usage", {}) or {}
             total_tokens = usage.get("total_tokens", 0)
-            
-            if total_tokens == 0:
-                # Fallback if API doesn't return metadata (estimate: 1 word ~= 1.3 tokens)
-                # This happens with some self-hosted NIMs
+            estimated = not total_tokens
+            if estimated:
                 logger.warning("⚠️ No token metadata found. Using estimation.")
-                return 
+                total_tokens = fallback_tokens
 
-            self.used += total_tokens
-            self.requests += 1
-            logger.info(f"💰 Cost Update: +{total_tokens} tokens. Total: {self.used}/{self.limit}")
-            
+            if reservation is None:
+                reservation = Reservation(self, tenant, 0, 0)
+            self._settle(reservation, total_tokens, estimated=estimated)
         except Exception as e:
             logger.error(f"Failed to track cost: {e}")
 
+    # --- REPORTING ---
+    @property
+    def used(self) -> int:
+        with self._global_lock:
+            return self._global.day.total(time.time())
+
+    @property
+    def requests(self) -> int:
+        return self._global.requests
+
+    def tenant_usage(self, tenant: str) -> Dict[str, int]:
+        now = time.time()
+        lock, accounts = self._shard(tenant)
+        with lock:
+            account = accounts.get(tenant)
+            if account is None:
+                return {"day": 0, "minute": 0, "reserved": 0}
+            return {"day": account.day.total(now), "minute": account.minute.total(now), "reserved": account.held(now)}
+
+    def reset(self):
+        """Clears every window and reservation (dashboard 'Reset Budget')."""
+        for lock, accounts in self._shards:
+            with lock:
+                accounts.clear()
+        with self._global_lock:
+            self._global = _Account()
+
     def get_status(self) -> str:
         """Returns a string for the UI dashboard."""
-        percent = (self.used / self.limit) * 100
-        return f"{self.used} / {self.limit} Tokens ({percent:.1f}%)"
+        used = self.used
+        percent = (used / self.limit) * 100 if self.limit else 0.0
+        return f"{used} / {self.limit} Tokens ({percent:.1f}%)"
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._global_lock:
+            stats = {
+                "daily_limit": self.limit,
+                "minute_limit": self.minute_limit,
+                "tenant_daily_limit": self.tenant_daily,
+                "tenant_minute_limit": self.tenant_minute,
+                "used_day": self._global.day.total(now),
+                "used_minute": self._global.minute.total(now),
+                "reserved": self._global.held(now),
+                "requests": self._global.requests,
+                "estimated": self._global.estimated,
+                "rejected": self.rejected,
+            }
+        stats["tenants"] = sum(len(accounts) for _, accounts in self._shards)
+        return stats
+
+class SharedBudgetManager(BudgetManager):
+    """
+    The same budgets, kept in the shared SQLite database so every worker
+    process draws on one wallet (multi-worker mode).
+
+    Usage lives in time buckets per tenant (hourly for the day window, 5s
+    for the minute window, like SlidingWindow) and reservations are rows
+    with an expiry. A reservation is checked and inserted in one
+    BEGIN IMMEDIATE transaction, so workers can't overshoot together.
+    """
+
+    WALLET = "__global__"
+    SPANS = (("day", DAY, DAY / 24), ("minute", MINUTE, MINUTE / 12))
+
+    def __init__(self, store, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def _total(self, conn, tenant: str, span: str, now: float) -> int:
+        length, width = next((length, width) for name, length, width in self.SPANS if name == span)
+        return conn.execute(
+            "SELECT COALESCE(SUM(tokens), 0) FROM budget_usage WHERE tenant = ? AND span = ? AND bucket > ?",
+            (tenant, span, now - length - width)).fetchone()[0]
+
+    def _held(self, conn, tenant: Optional[str], now: float) -> int:
+        if tenant is None:
+            query, args = "SELECT COALESCE(SUM(tokens), 0) FROM budget_reservations WHERE expires > ?", (now,)
+        else:
+            query = "SELECT COALESCE(SUM(tokens), 0) FROM budget_reservations WHERE tenant = ? AND expires > ?"
+            args = (tenant, now)
+        return conn.execute(query, args).fetchone()[0]
+
+    def _fits(self, conn, tenant: Optional[str], tokens: int, day_limit: int, minute_limit: int, now: float) -> bool:
+        held = self._held(conn, tenant, now)
+        account = tenant or self.WALLET
+        if day_limit and self._total(conn, account, "day", now) + held + tokens > day_limit:
+            return False
+        if minute_limit and self._total(conn, account, "minute", now) + held + tokens > minute_limit:
+            return False
+        return True
+
+    @staticmethod
+    def _count(conn, name: str, amount: int = 1):
+        conn.execute("INSERT INTO budget_counters VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+                     (name, amount, amount))
+
+    def _counter(self, conn, name: str) -> int:
+        row = conn.execute("SELECT value FROM budget_counters WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    # --- RESERVE / SETTLE ---
+    def check_budget(self, tenant: str = DEFAULT_TENANT, estimate: int = BUDGET_COMPLETION_RESERVE) -> Optional[Reservation]:
+        now = time.time()
+        with self.store.transaction(immediate=True) as conn:
+            conn.execute("DELETE FROM budget_reservations WHERE expires <= ?", (now,))
+            if not self._fits(conn, tenant, estimate, self.tenant_daily, self.tenant_minute, now):
+                self._count(conn, "rejected")
+                logger.warning(f"💸 TENANT BUDGET EXCEEDED: '{tenant}'")
+                return None
+            if not self._fits(conn, None, estimate, self.limit, self.minute_limit, now):
+                self._count(conn, "rejected")
+                logger.warning(f"💸 BUDGET EXCEEDED: Used {self._total(conn, self.WALLET, 'day', now)}/{self.limit} tokens.")
+                return None
+            rid = conn.execute("INSERT INTO budget_reservations (tenant, tokens, expires) VALUES (?, ?, ?)",
+                               (tenant, estimate, now + BUDGET_RESERVATION_TTL)).lastrowid
+        return Reservation(self, tenant, rid, estimate)
+
+    def _settle(self, reservation: Reservation, used_tokens: int, estimated: bool = False):
+        if reservation.settled:
+            return
+        reservation.settled = True
+        now = time.time()
+        with self.store.transaction(immediate=True) as conn:
+            if reservation.rid:
+                conn.execute("DELETE FROM budget_reservations WHERE rid = ?", (reservation.rid,))
+            if used_tokens:
+                for account in (reservation.tenant, self.WALLET):
+                    for span, _, width in self.SPANS:
+                        conn.execute(
+                            "INSERT INTO budget_usage VALUES (?, ?, ?, ?) "
+                            "ON CONFLICT(tenant, span, bucket) DO UPDATE SET tokens = tokens + excluded.tokens",
+                            (account, span, now - (now % width), used_tokens))
+                self._count(conn, "requests")
+                if estimated:
+                    self._count(conn, "estimated")
+                conn.execute("DELETE FROM budget_usage WHERE bucket < ?", (now - DAY - DAY / 24,))
+        if used_tokens:
+            logger.info(f"💰 Cost Update: +{used_tokens} tokens ({reservation.tenant}). "
+                        f"Total: {self.used}/{self.limit}")
+
+    # --- REPORTING ---
+    @property
+    def used(self) -> int:
+        return self._total(self.store.connection(), self.WALLET, "day", time.time())
+
+    @property
+    def requests(self) -> int:
+        return self._counter(self.store.connection(), "requests")
+
+    def tenant_usage(self, tenant: str) -> Dict[str, int]:
+        now = time.time()
+        with self.store.transaction() as conn:
+            return {"day": self._total(conn, tenant, "day", now), "minute": self._total(conn, tenant, "minute", now),
+                    "reserved": self._held(conn, tenant, now)}
+
+    def reset(self):
+        with self.store.transaction(immediate=True) as conn:
+            for table in ("budget_usage", "budget_reservations", "budget_counters"):
+                conn.execute(f"DELETE FROM {table}")
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self.store.transaction() as conn:
+            return {
+                "daily_limit": self.limit,
+                "minute_limit": self.minute_limit,
+                "tenant_daily_limit": self.tenant_daily,
+                "tenant_minute_limit": self.tenant_minute,
+                "used_day": self._total(conn, self.WALLET, "day", now),
+                "used_minute": self._total(conn, self.WALLET, "minute", now),
+                "reserved": self._held(conn, None, now),
+                "requests": self._counter(conn, "requests"),
+                "estimated": self._counter(conn, "estimated"),
+                "rejected": self._counter(conn, "rejected"),
+                "tenants": conn.execute(
+                    "SELECT COUNT(DISTINCT tenant) FROM budget_usage WHERE tenant != ? AND span = 'day' AND bucket > ?",
+                    (self.WALLET, now - DAY - DAY / 24)).fetchone()[0],
+                "shared": True,
+            }
+
+
+def create_budget_manager(**kwargs) -> BudgetManager:
+    """In-process wallet, or the node-wide SQLite one when VERA_SHARED_STATE is on."""
+    store = get_shared_store()
+    return SharedBudgetManager(store, **kwargs) if store is not None else BudgetManager(**kwargs)
 
 # Singleton Instance (Global Wallet)
-# In a real SaaS, this would be a Redis Database keyed by User ID.
-# For this side project, a global variable is fine.
-global_budget = BudgetManager(max_daily_tokens=20000) # Set your safety limit here
\ No newline at end of file
+# Shared by every thread in this process (every worker, in shared mode);
+# per-tenant limits are opt-in via env.
+global_budget = create_budget_manager()
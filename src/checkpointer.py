@@ -0,0 +1,617 @@
+import os
+import time
+import queue
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict, Counter
+from typing import Any, Dict, Iterator, AsyncIterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from shared_state import SHARED_STATE
+
+logger = logging.getLogger("vera_checkpoints")
+
+# --- CONFIG ---
+CHECKPOINT_MODE = os.getenv("VERA_CHECKPOINTER", "sqlite")  # sqlite | memory
+CHECKPOINT_DB = os.getenv("VERA_CHECKPOINT_DB", "data/vera_checkpoints.sqlite")
+# Older checkpoints per thread are pruned (time travel depth)
+CHECKPOINT_KEEP = int(os.getenv("VERA_CHECKPOINT_KEEP", "5"))
+# Threads idle this long are dropped from RAM; they reload from disk on the next turn
+CHECKPOINT_IDLE_TTL = float(os.getenv("VERA_CHECKPOINT_IDLE_TTL", "900"))
+# Threads idle this long are deleted from disk too (0 = keep forever)
+CHECKPOINT_RETENTION = float(os.getenv("VERA_CHECKPOINT_RETENTION", "0"))
+# Write-behind: one transaction per batch of queued writes
+CHECKPOINT_FLUSH_MS = float(os.getenv("VERA_CHECKPOINT_FLUSH_MS", "50"))
+CHECKPOINT_BATCH_SIZE = int(os.getenv("VERA_CHECKPOINT_BATCH_SIZE", "256"))
+CHECKPOINT_READERS = int(os.getenv("VERA_CHECKPOINT_READERS", "2"))
+# A failed batch is retried this many times, backing off from RETRY_MS (doubling)
+CHECKPOINT_RETRIES = int(os.getenv("VERA_CHECKPOINT_RETRIES", "3"))
+CHECKPOINT_RETRY_MS = float(os.getenv("VERA_CHECKPOINT_RETRY_MS", "50"))
+# Consecutive batches lost (retries exhausted) before the checkpointer reports degraded
+CHECKPOINT_DEGRADED_AFTER = int(os.getenv("VERA_CHECKPOINT_DEGRADED_AFTER", "3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,
+    parent_id TEXT, type TEXT, checkpoint BLOB, metadata_type TEXT, metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT, type TEXT, value BLOB, task_path TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS threads (thread_id TEXT PRIMARY KEY, last_seen REAL, version INTEGER NOT NULL DEFAULT 0);
+"""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    # WAL: readers never block the writer; NORMAL sync is durable across app crashes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class _Thread:
+    """RAM copy of one thread: its latest checkpoints (serialized) and their pending writes."""
+
+    __slots__ = ("checkpoints", "writes", "last_seen", "version")
+
+    def __init__(self):
+        # ns -> {checkpoint_id: (checkpoint_typed, metadata_typed, parent_id)}
+        self.checkpoints: Dict[str, Dict[str, tuple]] = {}
+        # (ns, checkpoint_id) -> {(task_id, idx): (task_id, channel, value_typed, task_path)}
+        self.writes: Dict[Tuple[str, str], Dict[tuple, tuple]] = {}
+        self.last_seen = time.time()
+        self.version = 0  # threads.version this copy matches (bumped by every commit touching the thread)
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """
+    Durable checkpointer: SQLite (WAL) on disk, active threads in RAM.
+
+    - Reads for a resident thread never touch disk; a cold thread is loaded
+      once through a small pool of reader connections (off the event loop).
+    - Writes update RAM and are queued; a single writer thread commits them
+      in batches (one transaction per batch) every `flush_ms`.
+    - Only the latest `keep` checkpoints per thread survive, in RAM and on disk.
+    - Threads idle for `idle_ttl` are evicted from RAM (after their writes
+      are committed), so memory tracks active users, not total users.
+    - A batch that fails to commit is retried with backoff; if it still
+      fails, its threads stay pinned in RAM (never evicted). Once
+      `degraded_after` batches in a row are lost the checkpointer reports
+      `degraded` (and /ready turns 503) until a batch commits again.
+
+    With `shared` (several worker processes on one database) writes are
+    write-through: put() returns once its batch is committed, so the next
+    turn can land on any worker. A resident copy with no pending writes is
+    revalidated against the thread's on-disk version before it's used, and
+    reloaded if another worker has written the thread since.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_DB, keep: int = CHECKPOINT_KEEP,
+                 idle_ttl: float = CHECKPOINT_IDLE_TTL, retention: float = CHECKPOINT_RETENTION,
+                 flush_ms: float = CHECKPOINT_FLUSH_MS, batch_size: int = CHECKPOINT_BATCH_SIZE,
+                 readers: int = CHECKPOINT_READERS, shared: bool = SHARED_STATE,
+                 retries: int = CHECKPOINT_RETRIES, retry_ms: float = CHECKPOINT_RETRY_MS,
+                 degraded_after: int = CHECKPOINT_DEGRADED_AFTER, serde=None):
+        super().__init__(serde=serde)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.keep = max(1, keep)
+        self.idle_ttl = idle_ttl
+        self.retention = retention
+        self.flush_s = flush_ms / 1000
+        self.batch_size = batch_size
+        self.shared = shared
+        self.retries = max(0, retries)
+        self.retry_s = retry_ms / 1000
+        self.degraded_after = max(1, degraded_after)
+
+        self._writer = _connect(path)
+        self._writer.executescript(SCHEMA)
+        try:
+            # Databases created before threads carried a version
+            self._writer.execute("ALTER TABLE threads ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(max(1, readers)):
+            self._readers.put(_connect(path))
+
+        self._lock = threading.Lock()
+        self._resident: "OrderedDict[str, _Thread]" = OrderedDict()
+        self._dirty: Counter = Counter()  # thread_id -> queued, uncommitted ops
+        self._ops: queue.Queue = queue.Queue()
+
+        self.loads = 0
+        self.stale_reloads = 0
+        self.evictions = 0
+        self.batches = 0
+        self.committed = 0
+        self.commit_seconds = 0.0
+        self.retried_commits = 0
+        self.failed_commits = 0  # batches dropped after every retry failed
+        self.failed_ops = 0      # their ops: pinned in RAM, never written
+        self._failed_in_row = 0
+        self.last_error: Optional[str] = None
+
+        self._closed = False
+        self._flusher = threading.Thread(target=self._run, name="vera-checkpoints", daemon=True)
+        self._flusher.start()
+        logger.info(f"💾 SQLite checkpointer at {path} (keep {self.keep}, idle TTL {idle_ttl:.0f}s"
+                    f"{', shared write-through' if shared else ''})")
+
+    # --- RESIDENT THREADS ---
+    def _thread(self, thread_id: str) -> _Thread:
+        """Returns the RAM copy of a thread, loading it from disk on first use."""
+        with self._lock:
+            state = self._resident.get(thread_id)
+            dirty = self._dirty[thread_id] > 0
+            # Pending writes mean this process is the one writing the thread
+            if state is not None and (dirty or not self.shared):
+                state.last_seen = time.time()
+                self._resident.move_to_end(thread_id)
+                return state
+        stale = state
+        if stale is not None:
+            # Shared: another worker may have written the thread since we loaded it
+            if self._disk_version(thread_id) == stale.version:
+                with self._lock:
+                    stale.last_seen = time.time()
+                    self._resident.move_to_end(thread_id)
+                return stale
+            self.stale_reloads += 1
+        elif dirty:
+            # A delete is still queued; don't read pre-delete rows back in
+            self.flush()
+        state = self._load(thread_id)
+        with self._lock:
+            # Another caller may have loaded it meanwhile; keep the first fresh copy
+            current = self._resident.get(thread_id)
+            if current is None or current is stale:
+                self._resident[thread_id] = current = state
+            self._resident.move_to_end(thread_id)
+            return current
+
+    def _disk_version(self, thread_id: str) -> int:
+        conn = self._readers.get()
+        try:
+            row = conn.execute("SELECT version FROM threads WHERE thread_id = ?", (thread_id,)).fetchone()
+        finally:
+            self._readers.put(conn)
+        return row[0] if row else 0
+
+    def _load(self, thread_id: str) -> _Thread:
+        state = _Thread()
+        conn = self._readers.get()
+        try:
+            # One read transaction: rows and version from the same snapshot
+            conn.execute("BEGIN")
+            version = conn.execute("SELECT version FROM threads WHERE thread_id = ?", (thread_id,)).fetchone()
+            rows = conn.execute(
+                "SELECT checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata "
+                "FROM checkpoints WHERE thread_id = ?", (thread_id,)).fetchall()
+            writes = conn.execute(
+                "SELECT checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path "
+                "FROM writes WHERE thread_id = ?", (thread_id,)).fetchall()
+            conn.execute("COMMIT")
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._readers.put(conn)
+        state.version = version[0] if version else 0
+        for ns, cid, parent, ctype, cblob, mtype, mblob in rows:
+            state.checkpoints.setdefault(ns, {})[cid] = ((ctype, cblob), (mtype, mblob), parent)
+        for ns, cid, task_id, idx, channel, vtype, vblob, task_path in writes:
+            state.writes.setdefault((ns, cid), {})[(task_id, idx)] = (task_id, channel, (vtype, vblob), task_path)
+        self.loads += 1
+        return state
+
+    def _enqueue(self, thread_id: str, op: tuple):
+        # Caller holds self._lock
+        self._dirty[thread_id] += 1
+        self._ops.put(op)
+
+    # --- READS ---
+    def _tuple(self, thread_id: str, ns: str, cid: str, saved: tuple, writes: dict) -> CheckpointTuple:
+        checkpoint, metadata, parent = saved
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": cid}},
+            checkpoint=self.serde.loads_typed(checkpoint),
+            metadata=self.serde.loads_typed(metadata),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": parent}}
+                if parent else None
+            ),
+            pending_writes=[(task_id, c, self.serde.loads_typed(v)) for task_id, c, v, _ in writes.values()],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        state = self._thread(thread_id)
+        with self._lock:
+            checkpoints = state.checkpoints.get(ns) or {}
+            cid = get_checkpoint_id(config) or (max(checkpoints) if checkpoints else None)
+            saved = checkpoints.get(cid)
+            if saved is None:
+                return None
+            writes = dict(state.writes.get((ns, cid), {}))
+        return self._tuple(thread_id, ns, cid, saved, writes)
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        if config:
+            thread_ids = [config["configurable"]["thread_id"]]
+        else:
+            # Every thread, including ones only on disk
+            self.flush()
+            conn = self._readers.get()
+            try:
+                thread_ids = [r[0] for r in conn.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+            finally:
+                self._readers.put(conn)
+        want_ns = config["configurable"].get("checkpoint_ns") if config else None
+        want_id = get_checkpoint_id(config) if config else None
+        before_id = get_checkpoint_id(before) if before else None
+
+        for thread_id in thread_ids:
+            state = self._thread(thread_id)
+            with self._lock:
+                entries = [
+                    (ns, cid, saved, dict(state.writes.get((ns, cid), {})))
+                    for ns, checkpoints in state.checkpoints.items()
+                    for cid, saved in checkpoints.items()
+                ]
+            for ns, cid, saved, writes in sorted(entries, key=lambda e: e[1], reverse=True):
+                if want_ns is not None and ns != want_ns:
+                    continue
+                if (want_id and cid != want_id) or (before_id and cid >= before_id):
+                    continue
+                item = self._tuple(thread_id, ns, cid, saved, writes)
+                if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                if limit is not None:
+                    if limit <= 0:
+                        return
+                    limit -= 1
+                yield item
+
+    # --- WRITES ---
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        parent = config["configurable"].get("checkpoint_id")
+        saved = (
+            self.serde.dumps_typed(checkpoint),
+            self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+            parent,
+        )
+        state = self._thread(thread_id)
+        with self._lock:
+            checkpoints = state.checkpoints.setdefault(ns, {})
+            checkpoints[checkpoint["id"]] = saved
+            # Keep only the newest N (checkpoint ids sort by time)
+            for old in sorted(checkpoints)[:-self.keep]:
+                del checkpoints[old]
+                state.writes.pop((ns, old), None)
+            self._enqueue(thread_id, ("checkpoint", thread_id, ns, checkpoint["id"], saved))
+        if self.shared:
+            self.flush()
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        cid = config["configurable"]["checkpoint_id"]
+        state = self._thread(thread_id)
+        rows = []
+        with self._lock:
+            existing = state.writes.setdefault((ns, cid), {})
+            for idx, (channel, value) in enumerate(writes):
+                key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+                # Regular writes are idempotent per task; special channels overwrite
+                if key[1] >= 0 and key in existing:
+                    continue
+                typed = self.serde.dumps_typed(value)
+                existing[key] = (task_id, channel, typed, task_path)
+                rows.append((thread_id, ns, cid, task_id, key[1], channel, typed[0], typed[1], task_path))
+            if rows:
+                self._enqueue(thread_id, ("writes", thread_id, rows))
+        if rows and self.shared:
+            self.flush()
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._resident.pop(thread_id, None)
+            self._enqueue(thread_id, ("delete", thread_id))
+        if self.shared:
+            self.flush()
+
+    # --- ASYNC (resident threads are served inline; cold loads, and every call in
+    # shared mode, which may read or commit, go to a worker thread) ---
+    def _is_resident(self, config: Optional[RunnableConfig]) -> bool:
+        if self.shared:
+            return False
+        with self._lock:
+            return bool(config) and config["configurable"]["thread_id"] in self._resident
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        if self._is_resident(config):
+            return self.get_tuple(config)
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        if not self._is_resident(config):
+            items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        else:
+            items = self.list(config, filter=filter, before=before, limit=limit)
+        for item in items:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        if self._is_resident(config):
+            return self.put(config, checkpoint, metadata, new_versions)
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        if self._is_resident(config):
+            return self.put_writes(config, writes, task_id, task_path)
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        if self.shared:
+            return await asyncio.to_thread(self.delete_thread, thread_id)
+        return self.delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        return MemorySaver.get_next_version(self, current, channel)
+
+    # --- WRITER THREAD ---
+    def _run(self):
+        next_sweep = time.monotonic() + self._sweep_interval()
+        while True:
+            try:
+                batch = [self._ops.get(timeout=max(0.05, next_sweep - time.monotonic()))]
+            except queue.Empty:
+                batch = []
+            # Gather whatever else arrives within the flush window
+            deadline = time.monotonic() + self.flush_s
+            while batch and len(batch) < self.batch_size and batch[-1][0] not in ("flush", "stop"):
+                try:
+                    batch.append(self._ops.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if batch:
+                self._commit(batch)
+                if batch[-1][0] == "stop":
+                    return
+            if time.monotonic() >= next_sweep:
+                self._sweep()
+                next_sweep = time.monotonic() + self._sweep_interval()
+
+    def _sweep_interval(self) -> float:
+        return min(60.0, max(1.0, self.idle_ttl / 4))
+
+    def _commit(self, batch: list):
+        start = time.perf_counter()
+        ops = [op for op in batch if op[0] in ("checkpoint", "writes", "delete")]
+        committed = False
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    versions = self._write(batch)
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        raise
+                    self.retried_commits += 1
+                    delay = self.retry_s * 2 ** attempt
+                    logger.warning(f"⚠️ Checkpoint batch failed ({e}); retrying in {delay * 1000:.0f} ms")
+                    time.sleep(delay)
+            with self._lock:
+                # RAM already holds these writes; it now matches the committed version
+                for thread_id, version in versions.items():
+                    state = self._resident.get(thread_id)
+                    if state is not None:
+                        state.version = version
+            committed = True
+            if self._failed_in_row >= self.degraded_after:
+                logger.info("💾 Checkpoint writes recovered")
+            self._failed_in_row = 0
+        except Exception as e:
+            # The ops never reach disk; their threads stay dirty (below), so the
+            # sweep never evicts the RAM copy, the only one left
+            self.failed_commits += 1
+            self.failed_ops += len(ops)
+            self._failed_in_row += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"❌ Checkpoint batch lost after {self.retries + 1} attempts ({len(batch)} ops): {e}")
+            if self._failed_in_row == self.degraded_after:
+                logger.error(f"🚨 Checkpointer degraded: {self._failed_in_row} batches in a row failed to commit")
+        finally:
+            if committed:
+                with self._lock:
+                    for op in ops:
+                        self._dirty[op[1]] -= 1
+                        if self._dirty[op[1]] <= 0:
+                            del self._dirty[op[1]]
+                self.committed += len(ops)
+            self.batches += 1
+            self.commit_seconds += time.perf_counter() - start
+            for op in batch:
+                if op[0] == "flush":
+                    op[1].set()
+
+    @property
+    def degraded(self) -> bool:
+        """True while the last `degraded_after` batches all failed to commit."""
+        return self._failed_in_row >= self.degraded_after
+
+    def _write(self, batch: list) -> Dict[str, int]:
+        """One transaction for the batch (rolled back on error); returns the new thread versions."""
+        conn = self._writer
+        checkpoints, writes, touched, versions = [], [], {}, {}
+
+        def apply():
+            conn.executemany("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)", checkpoints)
+            conn.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", writes)
+            now = time.time()
+            threads = set(touched.values()) | {row[0] for row in writes}
+            conn.executemany(
+                "INSERT INTO threads VALUES (?, ?, 1) "
+                "ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen, version = version + 1",
+                [(t, now) for t in threads])
+            for thread_id in threads:
+                versions[thread_id] = conn.execute(
+                    "SELECT version FROM threads WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+            for thread_id, ns in touched:
+                conn.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN "
+                    "(SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT ?)", (thread_id, ns, thread_id, ns, self.keep))
+                conn.execute(
+                    "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN "
+                    "(SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?)",
+                    (thread_id, ns, thread_id, ns))
+            checkpoints.clear(), writes.clear(), touched.clear()
+
+        conn.execute("BEGIN")
+        try:
+            for op in batch:
+                kind = op[0]
+                if kind == "checkpoint":
+                    _, thread_id, ns, cid, ((ctype, cblob), (mtype, mblob), parent) = op
+                    checkpoints.append((thread_id, ns, cid, parent, ctype, cblob, mtype, mblob))
+                    touched[(thread_id, ns)] = thread_id
+                elif kind == "writes":
+                    writes.extend(op[2])
+                elif kind == "delete":
+                    # Apply what came before so a delete never wipes a later write
+                    apply()
+                    for table in ("checkpoints", "writes", "threads"):
+                        conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (op[1],))
+                    versions[op[1]] = 0
+            apply()
+            conn.execute("COMMIT")
+        except BaseException:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            raise
+        return versions
+
+    def _sweep(self):
+        """Evicts idle, fully-committed threads from RAM; optionally purges old ones from disk."""
+        cutoff = time.time() - self.idle_ttl
+        with self._lock:
+            idle = [t for t, s in self._resident.items() if s.last_seen < cutoff and not self._dirty[t]]
+            for thread_id in idle:
+                del self._resident[thread_id]
+        if idle:
+            self.evictions += len(idle)
+            logger.info(f"🧹 Evicted {len(idle)} idle threads from RAM")
+        if self.retention > 0:
+            conn = self._readers.get()
+            try:
+                expired = [r[0] for r in conn.execute(
+                    "SELECT thread_id FROM threads WHERE last_seen < ?", (time.time() - self.retention,))]
+            finally:
+                self._readers.put(conn)
+            with self._lock:
+                expired = [t for t in expired if t not in self._resident]
+                for thread_id in expired:
+                    self._enqueue(thread_id, ("delete", thread_id))
+            if expired:
+                logger.info(f"🗑️ Purging {len(expired)} expired threads from disk")
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Blocks until everything queued so far is committed."""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._ops.put(("flush", done))
+        return done.wait(timeout)
+
+    def evict_idle(self):
+        """Runs an eviction sweep now (normally the writer thread does this periodically)."""
+        self.flush()
+        self._sweep()
+
+    def close(self):
+        if self._closed:
+            return
+        self._ops.put(("stop", None))
+        self._flusher.join(timeout=30)
+        self._closed = True
+        self._writer.close()
+        while not self._readers.empty():
+            self._readers.get().close()
+        logger.info("💾 Checkpointer closed")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            resident = len(self._resident)
+            pending = sum(self._dirty.values())
+        return {
+            "mode": "sqlite",
+            "path": self.path,
+            "resident_threads": resident,
+            "pending_ops": pending,
+            "loads": self.loads,
+            "stale_reloads": self.stale_reloads,
+            "shared": self.shared,
+            "evictions": self.evictions,
+            "batches": self.batches,
+            "avg_batch": round(self.committed / self.batches, 1) if self.batches else 0.0,
+            "avg_commit_ms": round(self.commit_seconds / self.batches * 1000, 3) if self.batches else 0.0,
+            "retried_commits": self.retried_commits,
+            "failed_commits": self.failed_commits,
+            "failed_ops": self.failed_ops,
+            "degraded": self.degraded,
+            "last_error": self.last_error,
+            "db_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+
+def checkpoint_mode(mode: Optional[str] = None) -> str:
+    """The checkpointer create_checkpointer() builds for `mode` (default VERA_CHECKPOINTER)."""
+    mode = (mode or CHECKPOINT_MODE).lower()
+    # A MemorySaver per worker would split every conversation across processes
+    return "sqlite" if mode == "memory" and SHARED_STATE else mode
+
+
+def create_checkpointer(mode: Optional[str] = None):
+    """'sqlite' (durable, bounded RAM) or 'memory' (MemorySaver, for dev and tests)."""
+    requested, mode = (mode or CHECKPOINT_MODE).lower(), checkpoint_mode(mode)
+    if requested != mode:
+        logger.warning("⚠️ VERA_CHECKPOINTER=memory can't be shared between workers; using SQLite")
+    if mode == "memory":
+        return MemorySaver()
+    if mode == "sqlite":
+        return SQLiteCheckpointer()
+    raise ValueError(f"Unknown checkpointer mode: {mode}")
@@ -0,0 +1,175 @@
+import os
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from langchain_core.documents import Document
+
+from context_window import count_tokens, CONTEXT_TOOL_HEADROOM
+
+# --- CONFIG ---
+# Token budget for one lookup_document result; defaults to fit inside the
+# context window's tool-output headroom
+RAG_CONTEXT_TOKENS = int(os.getenv("VERA_RAG_CONTEXT_TOKENS", str(max(256, CONTEXT_TOOL_HEADROOM - 300))))
+# Word-shingle Jaccard at or above this drops the lower-ranked chunk
+NEAR_DUP_THRESHOLD = float(os.getenv("VERA_NEAR_DUP_THRESHOLD", "0.85"))
+# Shortest shared text that counts as splitter overlap (shorter may be boilerplate)
+MIN_OVERLAP_CHARS = 50
+# A partial chunk is only worth packing if this many tokens still fit
+MIN_PARTIAL_TOKENS = 48
+SHINGLE_WORDS = 3
+
+_WORD = re.compile(r"\w+")
+_SENTENCE_END = re.compile(r"[.!?]\s")
+
+
+@dataclass
+class _Segment:
+    text: str
+    rank: int  # best (lowest) retrieval rank among merged chunks
+    source: tuple  # (doc_id, page): pages are split separately, so overlaps never cross them
+
+
+def overlap(left: str, right: str, min_chars: int = MIN_OVERLAP_CHARS) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right` (0 if under min_chars)."""
+    if len(left) < min_chars or len(right) < min_chars:
+        return 0
+    probe = right[:min_chars]
+    pos = left.find(probe)
+    while pos != -1:
+        # Earliest match = longest overlap
+        if right.startswith(left[pos:]):
+            return len(left) - pos
+        pos = left.find(probe, pos + 1)
+    return 0
+
+
+def _shingles(text: str) -> Set[int]:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(" ".join(words).encode())}
+    return {zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode()) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cuts text to fit max_tokens, preferring a sentence (then word) boundary."""
+    max_tokens -= 2  # room for the ellipsis
+    tokens = count_tokens(text)
+    cut = text[:max(1, len(text) * max_tokens // max(tokens, 1))]
+    while cut and count_tokens(cut) > max_tokens:
+        cut = cut[:int(len(cut) * 0.9)]
+    ends = [m.end() for m in _SENTENCE_END.finditer(cut)]
+    if ends and ends[-1] > len(cut) // 2:
+        return cut[:ends[-1]].rstrip()
+    space = cut.rfind(" ")
+    return (cut[:space] if space > len(cut) // 2 else cut).rstrip() + " …"
+
+
+class ChunkCompressor:
+    """
+    Post-retrieval stage between the retrievers and the LLM:
+
+    1. Merge chunks of the same document that overlap (the splitter repeats
+       up to chunk_overlap chars between neighbours) or contain one another.
+    2. Drop near-duplicates (same passage from another upload/page).
+    3. Pack by relevance into a token budget; the last chunk that doesn't
+       fit whole is cut at a sentence boundary.
+    """
+
+    def __init__(self, budget: int = RAG_CONTEXT_TOKENS, near_dup: float = NEAR_DUP_THRESHOLD):
+        self.budget = budget
+        self.near_dup = near_dup
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.merged = 0
+        self.duplicates = 0
+        self.truncated = 0
+
+    def _merge(self, segments: List[_Segment]) -> Tuple[List[_Segment], int]:
+        merged = 0
+        changed = True
+        while changed:
+            changed = False
+            for i, a in enumerate(segments):
+                for j, b in enumerate(segments):
+                    if i == j or a.source != b.source:
+                        continue
+                    if b.text in a.text:
+                        text = a.text
+                    else:
+                        shared = overlap(a.text, b.text)
+                        if not shared:
+                            continue
+                        text = a.text + b.text[shared:]
+                    segments[i] = _Segment(text, min(a.rank, b.rank), a.source)
+                    del segments[j]
+                    merged += 1
+                    changed = True
+                    break
+                if changed:
+                    break
+        return segments, merged
+
+    def _dedupe(self, segments: List[_Segment]) -> Tuple[List[_Segment], int]:
+        kept, kept_shingles, dropped = [], [], 0
+        for segment in sorted(segments, key=lambda s: s.rank):
+            shingles = _shingles(segment.text)
+            if any(len(shingles & other) / len(shingles | other) >= self.near_dup for other in kept_shingles):
+                dropped += 1
+                continue
+            kept.append(segment)
+            kept_shingles.append(shingles)
+        return kept, dropped
+
+    def compress(self, docs: List[Document], budget: Optional[int] = None) -> str:
+        """Chunks in relevance order -> one context string within `budget` tokens."""
+        budget = self.budget if budget is None else budget
+        segments = [_Segment(d.page_content, rank, (d.metadata.get("doc_id"), d.metadata.get("page")))
+                    for rank, d in enumerate(docs) if d.page_content.strip()]
+        tokens_in = sum(count_tokens(s.text) for s in segments)
+        segments, merged = self._merge(segments)
+        segments, duplicates = self._dedupe(segments)
+
+        packed, used, truncated = [], 0, 0
+        for segment in segments:
+            tokens = count_tokens(segment.text)
+            if used + tokens <= budget:
+                packed.append(segment.text)
+                used += tokens
+                continue
+            if budget - used >= MIN_PARTIAL_TOKENS:
+                text = _truncate(segment.text, budget - used)
+                packed.append(text)
+                used += count_tokens(text)
+                truncated += 1
+            break
+
+        with self._lock:
+            self.calls += 1
+            self.tokens_in += tokens_in
+            self.tokens_out += used
+            self.merged += merged
+            self.duplicates += duplicates
+            self.truncated += truncated
+        return "\n\n".join(packed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "budget_tokens": self.budget,
+                "calls": self.calls,
+                "tokens_in": self.tokens_in,
+                "tokens_out": self.tokens_out,
+                "saved_ratio": round(1 - self.tokens_out / self.tokens_in, 3) if self.tokens_in else 0.0,
+                "merged": self.merged,
+                "duplicates": self.duplicates,
+                "truncated": self.truncated,
+            }
+
+
+# Singleton Instance
+chunk_compressor = ChunkCompressor()
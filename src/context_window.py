@@ -0,0 +1,158 @@
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+logger = logging.getLogger("vera_context")
+
+# --- CONFIG ---
+# Prompt budget for the reasoning model (history + system prompt)
+CONTEXT_MAX_TOKENS = int(os.getenv("VERA_CONTEXT_TOKENS", "6000"))
+# Kept free for the tool output (search results, RAG chunks) the next call may add
+CONTEXT_TOOL_HEADROOM = int(os.getenv("VERA_CONTEXT_TOOL_HEADROOM", "1500"))
+CONTEXT_TOKENIZER = os.getenv("VERA_TOKENIZER", "cl100k_base")
+# Chat templates add role/separator tokens around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+TOKEN_CACHE_SIZE = int(os.getenv("VERA_TOKEN_CACHE_SIZE", "20000"))
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def _get_encoder():
+    """Loads the tiktoken encoding once; None when it isn't available (offline, not installed)."""
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                try:
+                    import tiktoken
+                    _encoder = tiktoken.get_encoding(CONTEXT_TOKENIZER)
+                    logger.info(f"🔢 Counting tokens with tiktoken/{CONTEXT_TOKENIZER}")
+                except Exception as e:
+                    logger.warning(f"⚠️ tiktoken unavailable ({e}). Estimating 4 chars per token.")
+                    _encoder = False
+    return _encoder or None
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return max(1, (len(text) + 3) // 4)
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        content += json.dumps([{"name": c["name"], "args": c["args"]} for c in tool_calls], default=str)
+    return content
+
+
+class ContextWindow:
+    """
+    Trims a thread's history to a real token budget.
+
+    Token counts are cached per message id (messages in graph state are
+    immutable once added), so each turn only tokenizes what is new. Trimming
+    walks history newest-first and stops as soon as the budget is spent, and
+    it drops whole turns: a turn starts at a human message, so an AI tool call
+    is never separated from its ToolMessage results.
+    """
+
+    def __init__(self, max_tokens: int = CONTEXT_MAX_TOKENS, tool_headroom: int = CONTEXT_TOOL_HEADROOM,
+                 cache_size: int = TOKEN_CACHE_SIZE):
+        if tool_headroom >= max_tokens:
+            raise ValueError("tool_headroom must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.tool_headroom = tool_headroom
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._counts: "OrderedDict[tuple, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.trimmed = 0
+        self.last_prompt_tokens = 0
+
+    @property
+    def budget(self) -> int:
+        return self.max_tokens - self.tool_headroom
+
+    def message_tokens(self, message: BaseMessage) -> int:
+        # Content length guards against a message being replaced under the same id
+        key = (message.id, len(message.content)) if message.id else None
+        if key is not None:
+            with self._lock:
+                cached = self._counts.get(key)
+                if cached is not None:
+                    self._counts.move_to_end(key)
+                    self.hits += 1
+                    return cached
+        tokens = count_tokens(_message_text(message)) + MESSAGE_OVERHEAD_TOKENS
+        if key is not None:
+            with self._lock:
+                self.misses += 1
+                self._counts[key] = tokens
+                if len(self._counts) > self.cache_size:
+                    self._counts.popitem(last=False)
+        return tokens
+
+    def trim(self, messages: List[BaseMessage], budget: Optional[int] = None) -> List[BaseMessage]:
+        """
+        Returns the leading system prompt plus as many of the most recent
+        whole turns as fit in `budget` (default: max_tokens - tool_headroom).
+        The current turn is always kept, even if it alone is over budget.
+        """
+        budget = self.budget if budget is None else budget
+        head = [m for m in messages[:1] if isinstance(m, SystemMessage)]
+        history = messages[len(head):]
+        used = sum(self.message_tokens(m) for m in head)
+
+        start = len(history)
+        turn_tokens = 0
+        for i in range(len(history) - 1, -1, -1):
+            turn_tokens += self.message_tokens(history[i])
+            if not isinstance(history[i], HumanMessage):
+                continue
+            # history[i:start] is one complete turn
+            if start < len(history) and used + turn_tokens > budget:
+                break
+            used += turn_tokens
+            turn_tokens = 0
+            start = i
+        if start == len(history) and history:
+            # No human message at all: keep what there is rather than nothing
+            start, used = 0, used + turn_tokens
+        elif used > budget:
+            logger.warning(f"⚠️ Current turn alone is {used} tokens (budget {budget}).")
+
+        self.trimmed += start
+        self.last_prompt_tokens = used
+        return head + history[start:]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cached = len(self._counts)
+        return {
+            "max_tokens": self.max_tokens,
+            "tool_headroom": self.tool_headroom,
+            "tokenizer": "not loaded" if _encoder is None else (CONTEXT_TOKENIZER if _encoder else "chars/4"),
+            "cached_messages": cached,
+            "hits": self.hits,
+            "misses": self.misses,
+            "trimmed_messages": self.trimmed,
+            "last_prompt_tokens": self.last_prompt_tokens,
+        }
+
+
+# Singleton Instance (token counts are keyed by message id, so threads can share it)
+context_window = ContextWindow()
@@ -0,0 +1,223 @@
+import os
+import logging
+import itertools
+import threading
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+from langchain_core.documents import Document
+
+from lexical_index import BM25Index, phrases
+from index_factory import describe, build_index, supports_remove, index_bytes, index_info
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
+
+logger = logging.getLogger("vera_document_index")
+
+# --- CONFIG ---
+# Compact once this share of the stored vectors belongs to removed documents
+COMPACT_RATIO = float(os.getenv("VERA_COMPACT_RATIO", "0.25"))
+
+# Versions are unique across all indexes, so (scope, version) never repeats
+# even after a thread's index is evicted and rebuilt.
+_VERSIONS = itertools.count(1)
+
+
+class DocumentIndex:
+    """
+    One FAISS store holding many documents (a thread's knowledge base).
+
+    Adding a document appends only its chunks. Removing one tombstones its
+    chunks (they are filtered out of results immediately) and the vectors
+    are physically dropped by compact(), which runs automatically once
+    COMPACT_RATIO of the index is dead weight.
+
+    The FAISS structure follows corpus size (see index_factory): exact flat
+    search while small, HNSW and then IVF as it grows, with optional fp16/PQ
+    codes. Crossing a threshold rebuilds (and, for IVF/PQ, retrains) the
+    index from its stored vectors.
+    """
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.vectorstore: Optional["FAISS"] = None
+        self.description: Optional[str] = None  # faiss.index_factory string in use
+        self.rebuilds = 0
+        self.lexical = BM25Index()  # same chunks, keyword-searchable
+        self.version = next(_VERSIONS)
+        self._docs: Dict[str, List[str]] = {}       # doc_id -> chunk ids
+        self._filenames: Dict[str, Optional[str]] = {}
+        self._removed: Dict[str, List[str]] = {}    # tombstoned doc_id -> chunk ids
+        self._text_bytes = 0
+        self._lock = threading.RLock()
+
+    # --- WRITES ---
+    def _empty_store(self, vectors: np.ndarray, n: int) -> "FAISS":
+        """An empty store whose index suits `n` chunks (trained on `vectors` if needed)."""
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores import FAISS
+        self.description = describe(n, vectors.shape[1])
+        return FAISS(self.embeddings, build_index(vectors, self.description), InMemoryDocstore(), {})
+
+    def _rebuild(self):
+        """Re-creates the index for the live chunks (new structure, no tombstones)."""
+        store = self.vectorstore
+        position = {chunk_id: i for i, chunk_id in store.index_to_docstore_id.items()}
+        ids = [chunk_id for chunk_ids in self._docs.values() for chunk_id in chunk_ids]
+        if not ids:
+            self.vectorstore, self.description = None, None
+            return
+        # Stored codes are the only copy; fp16 round-trips exactly enough, PQ approximately
+        all_vectors = store.index.reconstruct_n(0, store.index.ntotal)
+        vectors = all_vectors[[position[chunk_id] for chunk_id in ids]]
+        chunks = [store.docstore.search(chunk_id) for chunk_id in ids]
+        previous = self.description
+        self.vectorstore = self._empty_store(vectors, len(ids))
+        self.vectorstore.add_embeddings(
+            [(c.page_content, v) for c, v in zip(chunks, vectors)], metadatas=[c.metadata for c in chunks], ids=ids
+        )
+        self.rebuilds += 1
+        logger.info(f"🏗️ Rebuilt index {previous} -> {self.description} ({len(ids)} vectors)")
+
+    def add_document(self, doc_id: str, source: "FAISS", filename: Optional[str] = None) -> bool:
+        """
+        Appends every chunk of `source` under `doc_id`. O(chunks in source).
+        The vectors are copied into this index (and counted by nbytes()), so
+        `source` may be a read-only mmapped store that is dropped afterwards:
+        mmap makes loading cheap, it does not share the vectors' RAM.
+        Returns False if the document is already present.
+        """
+        index = source.index
+        if index.ntotal == 0:
+            return False
+        vectors = index.reconstruct_n(0, index.ntotal)
+        chunks = [source.docstore.search(source.index_to_docstore_id[i]) for i in range(index.ntotal)]
+        return self.add_chunks(
+            doc_id,
+            [c.page_content for c in chunks],
+            vectors,
+            [c.metadata for c in chunks],
+            filename=filename,
+        )
+
+    def add_chunks(self, doc_id: str, texts: List[str], vectors, metadatas: List[dict],
+                   filename: Optional[str] = None) -> bool:
+        with self._lock:
+            if doc_id in self._docs:
+                return False
+            if doc_id in self._removed:
+                # Re-adding a removed document: drop the stale copy first
+                self.compact()
+
+            ids = [f"{doc_id}-{i}" for i in range(len(texts))]
+            metadatas = [{**m, "doc_id": doc_id} for m in metadatas]
+            vectors = np.asarray(vectors, dtype="float32")
+            if self.vectorstore is None:
+                self.vectorstore = self._empty_store(vectors, len(texts))
+            self.vectorstore.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+            for chunk_id, text in zip(ids, texts):
+                self.lexical.add(chunk_id, text)
+
+            self._docs[doc_id] = ids
+            self._filenames[doc_id] = filename
+            self._text_bytes += sum(len(t.encode("utf-8")) + 64 for t in texts)
+            # Grown past a size threshold: switch structure (flat -> HNSW -> IVF, more lists)
+            if describe(self.live_chunks, vectors.shape[1]) != self.description:
+                self._rebuild()
+            self.version = next(_VERSIONS)
+            return True
+
+    def remove_document(self, doc_id: str) -> bool:
+        with self._lock:
+            ids = self._docs.pop(doc_id, None)
+            if ids is None:
+                return False
+            self._filenames.pop(doc_id, None)
+            self._removed[doc_id] = ids
+            self.lexical.remove(ids)
+            self.version = next(_VERSIONS)
+            if self.dead_ratio() >= COMPACT_RATIO:
+                self.compact()
+            return True
+
+    def compact(self):
+        """Physically drops tombstoned vectors (O(index size), so run sparingly)."""
+        with self._lock:
+            if not self._removed:
+                return
+            dead = [chunk_id for ids in self._removed.values() for chunk_id in ids]
+            for chunk_id in dead:
+                self._text_bytes -= len(self.vectorstore.docstore.search(chunk_id).page_content.encode("utf-8")) + 64
+            if supports_remove(self.vectorstore.index):
+                self.vectorstore.delete(dead)
+            else:
+                self._rebuild()
+            self._removed.clear()
+            self.version = next(_VERSIONS)
+            left = self.vectorstore.index.ntotal if self.vectorstore is not None else 0
+            logger.info(f"🧹 Compacted index: dropped {len(dead)} vectors, {left} left")
+
+    # --- READS ---
+    def search_by_vector(self, vector, k: int = 4) -> List[Tuple[Document, float]]:
+        with self._lock:
+            if self.vectorstore is None or self.live_chunks == 0:
+                return []
+            if not self._removed:
+                return self.vectorstore.similarity_search_with_score_by_vector(vector, k=k)
+            # Over-fetch so tombstoned hits can't starve the result
+            fetch = min(k + self.dead_chunks, self.vectorstore.index.ntotal)
+            hits = self.vectorstore.similarity_search_with_score_by_vector(vector, k=fetch)
+            return [h for h in hits if h[0].metadata.get("doc_id") not in self._removed][:k]
+
+    def search_lexical(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        """BM25 hits (higher is better). Quoted phrases must appear verbatim."""
+        required = phrases(query)
+        with self._lock:
+            if self.vectorstore is None or self.live_chunks == 0:
+                return []
+            # Over-fetch when phrases will filter the candidates
+            ranked = self.lexical.search(query, k=k * 8 if required else k)
+            hits = [(self.vectorstore.docstore.search(chunk_id), score) for chunk_id, score in ranked]
+        if required:
+            hits = [h for h in hits if all(p in h[0].page_content.lower() for p in required)]
+        return hits[:k]
+
+    def documents(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"doc_id": doc_id, "filename": self._filenames.get(doc_id), "chunks": len(ids)}
+                for doc_id, ids in self._docs.items()
+            ]
+
+    def has_document(self, doc_id: str) -> bool:
+        with self._lock:
+            return doc_id in self._docs
+
+    @property
+    def document_count(self) -> int:
+        return len(self._docs)
+
+    @property
+    def live_chunks(self) -> int:
+        return sum(len(ids) for ids in self._docs.values())
+
+    @property
+    def dead_chunks(self) -> int:
+        return sum(len(ids) for ids in self._removed.values())
+
+    def dead_ratio(self) -> float:
+        total = self.live_chunks + self.dead_chunks
+        return self.dead_chunks / total if total else 0.0
+
+    def nbytes(self) -> int:
+        """Rough RAM footprint: vector codes (our own copy) + chunk text + inverted index."""
+        with self._lock:
+            if self.vectorstore is None:
+                return 0
+            return index_bytes(self.vectorstore.index) + self._text_bytes + self.lexical.nbytes()
+
+    def index_info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**index_info(self.vectorstore and self.vectorstore.index), "description": self.description,
+                    "rebuilds": self.rebuilds}
@@ -0,0 +1,265 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger("vera_embeddings")
+
+# --- CONFIG ---
+EMBED_MODEL_NAME = os.getenv("VERA_EMBED_MODEL", "all-MiniLM-L6-v2")
+# "torch" (HuggingFaceEmbeddings, full precision) or "onnx" (int8 ONNX graph, see onnx_embedder)
+EMBED_BACKEND = os.getenv("VERA_EMBED_BACKEND", "torch")
+EMBED_BATCH_SIZE = int(os.getenv("VERA_EMBED_BATCH_SIZE", "32"))
+EMBED_MAX_WAIT_MS = float(os.getenv("VERA_EMBED_MAX_WAIT_MS", "5"))
+
+
+class _EncodeRequest:
+    """A slice of texts waiting for a forward pass, plus the future to resolve."""
+
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingService(Embeddings):
+    """
+    Process-wide embedder. Loads the model once and micro-batches concurrent
+    encode calls (uploads and queries) into single forward passes.
+
+    Queries are queued ahead of document slices, so a chat turn never waits
+    behind a whole 300-page upload - only behind the batch currently running.
+    """
+
+    def __init__(
+        self,
+        model: Optional[Embeddings] = None,
+        model_name: str = EMBED_MODEL_NAME,
+        backend: str = EMBED_BACKEND,
+        max_batch_size: int = EMBED_BATCH_SIZE,
+        max_wait_ms: float = EMBED_MAX_WAIT_MS,
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._queries: deque = deque()
+        self._documents: deque = deque()
+        self._worker: Optional[threading.Thread] = None
+        self._running = False
+
+        # Stats
+        self._stats_lock = threading.Lock()
+        self._texts = 0
+        self._batches = 0
+        self._max_batch = 0
+        self._busy_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._requests = 0
+        self._served = 0
+
+    # --- LIFECYCLE ---
+    @property
+    def model(self) -> Embeddings:
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    logger.info(f"📦 Loading embedding model '{self.model_name}' ({self.backend})...")
+                    if self.backend == "onnx":
+                        from onnx_embedder import OnnxEmbeddings
+                        self._model = OnnxEmbeddings(model_name=self.model_name)
+                    else:
+                        from langchain_huggingface import HuggingFaceEmbeddings
+                        self._model = HuggingFaceEmbeddings(model_name=self.model_name)
+        return self._model
+
+    def start(self) -> "EmbeddingService":
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+            self._worker = threading.Thread(
+                target=self._run, name="vera-embedder", daemon=True
+            )
+            self._worker.start()
+        return self
+
+    def warm(self) -> "EmbeddingService":
+        """Loads the weights and runs one forward pass so the first real call is fast."""
+        start = time.perf_counter()
+        self.start()
+        self.embed_query("warm-up")
+        logger.info(f"✅ Embedder warm in {time.perf_counter() - start:.2f}s")
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+            self._worker = None
+
+    # --- EMBEDDINGS INTERFACE ---
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        # Slice big uploads so queued queries can slip in between forward passes
+        requests = [
+            _EncodeRequest(texts[i:i + self.max_batch_size])
+            for i in range(0, len(texts), self.max_batch_size)
+        ]
+        self._submit(requests, self._documents)
+
+        vectors: List[List[float]] = []
+        for request in requests:
+            vectors.extend(request.future.result())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        request = _EncodeRequest([text])
+        self._submit([request], self._queries)
+        return request.future.result()[0]
+
+    def _submit(self, requests: List[_EncodeRequest], queue: deque):
+        if not self._running:
+            self.start()
+        with self._cond:
+            queue.extend(requests)
+            self._cond.notify()
+        with self._stats_lock:
+            self._requests += 1
+
+    # --- WORKER ---
+    def _pending(self) -> int:
+        return len(self._queries) + len(self._documents)
+
+    def _take_batch(self) -> List[_EncodeRequest]:
+        """Collects requests until the batch is full or max_wait has elapsed."""
+        with self._cond:
+            while self._running and not self._pending():
+                self._cond.wait()
+            if not self._pending():
+                return []
+
+            deadline = time.perf_counter() + self.max_wait
+            batch, size = [], 0
+            while True:
+                for queue in (self._queries, self._documents):
+                    while queue and size + len(queue[0].texts) <= self.max_batch_size:
+                        request = queue.popleft()
+                        batch.append(request)
+                        size += len(request.texts)
+                    # A slice is never split; an oversized one runs on its own
+                    if not batch and queue:
+                        request = queue.popleft()
+                        return [request]
+
+                remaining = deadline - time.perf_counter()
+                if size >= self.max_batch_size or remaining <= 0 or not self._running:
+                    return batch
+                self._cond.wait(timeout=remaining)
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                if not self._running:
+                    return
+                continue
+
+            texts = [t for request in batch for t in request.texts]
+            start = time.perf_counter()
+            try:
+                vectors = self.model.embed_documents(texts)
+            except Exception as e:
+                logger.error(f"Embedding batch failed: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            elapsed = time.perf_counter() - start
+
+            offset = 0
+            for request in batch:
+                n = len(request.texts)
+                request.future.set_result(vectors[offset:offset + n])
+                offset += n
+
+            with self._stats_lock:
+                self._texts += len(texts)
+                self._batches += 1
+                self._max_batch = max(self._max_batch, len(texts))
+                self._busy_seconds += elapsed
+                self._wait_seconds += sum(start - r.enqueued_at for r in batch)
+                self._served += len(batch)
+
+    # --- STATS ---
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            batches = self._batches or 1
+            served = self._served or 1
+            return {
+                "model": self.model_name,
+                "backend": self.backend,
+                "loaded": self._model is not None,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "requests": self._requests,
+                "texts": self._texts,
+                "batches": self._batches,
+                "avg_batch_size": round(self._texts / batches, 2),
+                "max_batch_seen": self._max_batch,
+                "busy_seconds": round(self._busy_seconds, 4),
+                "texts_per_second": round(self._texts / self._busy_seconds, 1) if self._busy_seconds else 0.0,
+                "avg_queue_wait_ms": round(self._wait_seconds / served * 1000, 3),
+                "queued": self._pending(),
+            }
+
+
+# --- SINGLETON ---
+_SERVICE: Optional[EmbeddingService] = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Returns the shared embedder, creating it lazily (e.g. for Streamlit or tests)."""
+    global _SERVICE
+    if _SERVICE is None:
+        with _SERVICE_LOCK:
+            if _SERVICE is None:
+                _SERVICE = EmbeddingService()
+    return _SERVICE
+
+
+def set_embedding_service(service: Optional[EmbeddingService]):
+    """Swaps the shared embedder (used by tests and benchmarks)."""
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is not None and _SERVICE is not service:
+            _SERVICE.stop()
+        _SERVICE = service
+
+
+def init_embedding_service(**kwargs) -> EmbeddingService:
+    """Builds (if needed) and warms the shared embedder. Called from the API lifespan."""
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            _SERVICE = EmbeddingService(**kwargs)
+    return _SERVICE.warm()
+
+
+def shutdown_embedding_service():
+    if _SERVICE is not None:
+        _SERVICE.stop()
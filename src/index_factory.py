@@ -0,0 +1,126 @@
+import os
+import math
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import faiss
+
+# --- CONFIG ---
+# "auto" picks by corpus size; "flat", "hnsw" or "ivf" force one structure
+INDEX_TYPE = os.getenv("VERA_INDEX_TYPE", "auto")
+# Vector storage: "float32" (exact), "fp16" (half the RAM, ~lossless) or "pq" (~1/32, lossy)
+INDEX_STORAGE = os.getenv("VERA_INDEX_STORAGE", "float32")
+# auto: exact flat search below this many chunks, HNSW up to IVF_MIN_CHUNKS, IVF beyond
+ANN_MIN_CHUNKS = int(os.getenv("VERA_ANN_MIN_CHUNKS", "20000"))
+IVF_MIN_CHUNKS = int(os.getenv("VERA_IVF_MIN_CHUNKS", "500000"))
+HNSW_M = int(os.getenv("VERA_HNSW_M", "32"))
+HNSW_EF_SEARCH = int(os.getenv("VERA_HNSW_EF_SEARCH", "128"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("VERA_HNSW_EF_CONSTRUCTION", "80"))
+IVF_NPROBE = int(os.getenv("VERA_IVF_NPROBE", "16"))
+# Bytes per vector for PQ codes (dim must be divisible; falls back to fp16 if not)
+PQ_BYTES = int(os.getenv("VERA_PQ_BYTES", "48"))
+# k-means needs this many points per centroid to train well
+TRAIN_POINTS_PER_CENTROID = 39
+# PQ trains 256 centroids per sub-quantizer; smaller corpora store fp16 instead
+PQ_MIN_CHUNKS = 256 * TRAIN_POINTS_PER_CENTROID
+# Training sample cap: more points add build time, not accuracy
+MAX_TRAIN_POINTS = int(os.getenv("VERA_INDEX_MAX_TRAIN", "100000"))
+
+
+def choose_kind(n: int, index_type: str = None) -> str:
+    index_type = index_type or INDEX_TYPE
+    if index_type != "auto":
+        return index_type
+    if n < ANN_MIN_CHUNKS:
+        return "flat"
+    return "hnsw" if n < IVF_MIN_CHUNKS else "ivf"
+
+
+def _nlist(n: int) -> int:
+    # ~4*sqrt(n) lists, rounded to a power of two so growth rebuilds are rare
+    want = 2 ** round(math.log2(max(16, 4 * math.sqrt(n))))
+    return max(1, min(want, n // TRAIN_POINTS_PER_CENTROID))
+
+
+def _storage(dim: int, n: int, storage: str) -> str:
+    """Factory suffix for the vector codes; PQ uses fp16 until there's enough data to train it."""
+    if storage == "pq":
+        if dim % PQ_BYTES == 0 and n >= PQ_MIN_CHUNKS:
+            return f"PQ{PQ_BYTES}"
+        return "SQfp16"
+    return "SQfp16" if storage == "fp16" else "Flat"
+
+
+def describe(n: int, dim: int, index_type: str = None, storage: str = None) -> str:
+    """faiss.index_factory string for a corpus of n vectors."""
+    kind = choose_kind(n, index_type)
+    codes = _storage(dim, n, storage or INDEX_STORAGE)
+    if kind == "hnsw":
+        return f"HNSW{HNSW_M}" if codes == "Flat" else f"HNSW{HNSW_M}_{codes}"
+    if kind == "ivf":
+        return f"IVF{_nlist(n)},{codes}"
+    return codes
+
+
+def build_index(vectors: np.ndarray, description: str) -> "faiss.Index":
+    """Creates, trains (on a sample, if the type needs it) and tunes an empty index."""
+    import faiss
+    dim = vectors.shape[1]
+    index = faiss.index_factory(dim, description)
+    if not index.is_trained:
+        sample = vectors
+        if len(vectors) > MAX_TRAIN_POINTS:
+            rows = np.random.default_rng(0).choice(len(vectors), MAX_TRAIN_POINTS, replace=False)
+            sample = vectors[rows]
+        index.train(np.ascontiguousarray(sample, dtype="float32"))
+    tune(index)
+    return index
+
+
+def tune(index: "faiss.Index"):
+    """Search-time knobs (and the id map IVF needs to reconstruct vectors)."""
+    import faiss
+    hnsw = getattr(index, "hnsw", None)
+    if hnsw is not None:
+        hnsw.efSearch = HNSW_EF_SEARCH
+        hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = IVF_NPROBE
+        ivf.set_direct_map_type(faiss.DirectMap.Array)
+
+
+def supports_remove(index: "faiss.Index") -> bool:
+    """
+    Only flat code arrays renumber vectors after remove_ids, which is what the
+    LangChain store's id map assumes. HNSW can't drop nodes at all and IVF
+    keeps the old ids, so those are rebuilt on compaction instead.
+    """
+    import faiss
+    return isinstance(faiss.downcast_index(index), faiss.IndexFlatCodes)
+
+
+def index_bytes(index: "faiss.Index") -> int:
+    """Approximate RAM: codes plus per-vector structure (HNSW links, IVF ids)."""
+    import faiss
+    n = index.ntotal
+    hnsw = getattr(index, "hnsw", None)
+    if hnsw is not None:
+        storage = faiss.downcast_index(index.storage)
+        code_size = getattr(storage, "code_size", 0) or index.d * 4
+        # Level-0 links dominate (2*M neighbours of 4 bytes); upper levels add ~1/M of that
+        return n * (code_size + hnsw.nb_neighbors(0) * 4 + 8)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return n * (ivf.code_size + 8 + 16) + ivf.nlist * index.d * 4
+    code_size = getattr(faiss.downcast_index(index), "code_size", 0) or index.d * 4
+    return n * code_size
+
+
+def index_info(index: Optional["faiss.Index"]) -> Dict[str, Any]:
+    if index is None:
+        return {"type": None, "vectors": 0, "bytes": 0}
+    import faiss
+    return {"type": type(faiss.downcast_index(index)).__name__, "vectors": index.ntotal, "bytes": index_bytes(index)}
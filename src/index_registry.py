@@ -0,0 +1,178 @@
+import os
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Any, List, Optional
+
+from document_index import DocumentIndex
+
+logger = logging.getLogger("vera_registry")
+
+# --- CONFIG ---
+# Uploads without a thread_id land here and are visible to every thread.
+GLOBAL_SCOPE = "__global__"
+INDEX_RAM_BUDGET_MB = float(os.getenv("VERA_INDEX_RAM_MB", "512"))
+
+
+class RetrieverRegistry:
+    """
+    Per-thread knowledge bases: scope (thread_id) -> DocumentIndex holding
+    that thread's documents.
+
+    Lookups touch entries, so the least recently queried thread's whole
+    knowledge base is the first to leave RAM once the budget is exceeded.
+    Which documents each scope holds (doc_id, filename) is kept apart from
+    the indexes and survives eviction: with a `loader` (doc_id -> store,
+    e.g. the on-disk index store) an evicted scope is rebuilt on its next
+    lookup instead of looking empty.
+    """
+
+    def __init__(self, max_bytes: int = int(INDEX_RAM_BUDGET_MB * 1024 * 1024),
+                 loader: Optional[Callable[[str], Any]] = None):
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self._entries: "OrderedDict[str, DocumentIndex]" = OrderedDict()
+        self._bytes: Dict[str, int] = {}
+        # scope -> {doc_id: filename}, in upload order; kept when the index is evicted
+        self._known: Dict[str, "OrderedDict[str, Optional[str]]"] = {}
+        self._lock = threading.RLock()
+        self._restore_lock = threading.Lock()
+        self.evictions = 0
+        self.restores = 0
+
+    @staticmethod
+    def _scope(thread_id: Optional[str]) -> str:
+        return thread_id or GLOBAL_SCOPE
+
+    def add_document(self, doc_id: str, vectorstore, thread_id: Optional[str] = None,
+                     filename: Optional[str] = None) -> bool:
+        """Appends a document to the thread's index (O(its chunks)). False if already there."""
+        scope = self._scope(thread_id)
+        with self._lock:
+            index = self._entries.get(scope)
+            if index is None:
+                index = self._entries[scope] = DocumentIndex(vectorstore.embeddings)
+            self._entries.move_to_end(scope)
+        added = index.add_document(doc_id, vectorstore, filename=filename)
+        with self._lock:
+            self._known.setdefault(scope, OrderedDict()).setdefault(doc_id, filename)
+            if self._entries.get(scope) is index:
+                self._bytes[scope] = index.nbytes()
+                self._evict(keep=scope)
+        return added
+
+    def remove_document(self, doc_id: str, thread_id: Optional[str] = None) -> bool:
+        scope = self._scope(thread_id)
+        with self._lock:
+            index = self._entries.get(scope)
+            known = self._known.get(scope, {})
+            forgotten = doc_id in known
+            if forgotten:
+                del known[doc_id]
+                if not known:
+                    del self._known[scope]
+        if index is None or not index.remove_document(doc_id):
+            return forgotten  # evicted: only the record needed dropping
+        with self._lock:
+            if index.document_count == 0:
+                self._entries.pop(scope, None)
+                self._bytes.pop(scope, None)
+            elif self._entries.get(scope) is index:
+                self._bytes[scope] = index.nbytes()
+        return True
+
+    def _evict(self, keep: str):
+        for scope in list(self._entries):
+            if self.ram_bytes <= self.max_bytes:
+                return
+            if scope == keep:
+                continue
+            self._entries.pop(scope)
+            nbytes = self._bytes.pop(scope, 0)
+            self.evictions += 1
+            logger.info(f"♻️ Evicted knowledge base '{scope}' ({nbytes / 1e6:.1f} MB)")
+        if self.ram_bytes > self.max_bytes:
+            logger.warning(
+                f"⚠️ Knowledge base '{keep}' alone exceeds the RAM budget "
+                f"({self.ram_bytes / 1e6:.1f} MB > {self.max_bytes / 1e6:.1f} MB)"
+            )
+
+    @property
+    def ram_bytes(self) -> int:
+        return sum(self._bytes.values())
+
+    def _restore(self, scope: str) -> Optional[DocumentIndex]:
+        """The scope's index, reloading (through `loader`) documents that were evicted."""
+        with self._lock:
+            index = self._entries.get(scope)
+            missing = [(doc_id, filename) for doc_id, filename in self._known.get(scope, {}).items()
+                       if index is None or not index.has_document(doc_id)]
+            if not missing or self.loader is None:
+                if index is not None:
+                    self._entries.move_to_end(scope)
+                return index
+        with self._restore_lock:
+            for doc_id, filename in missing:
+                with self._lock:
+                    index = self._entries.get(scope)
+                    if doc_id not in self._known.get(scope, {}) or (index is not None and index.has_document(doc_id)):
+                        continue  # removed meanwhile, or another lookup restored it
+                vectorstore = self.loader(doc_id)
+                if vectorstore is None:
+                    logger.warning(f"⚠️ Document {doc_id[:12]} of '{scope}' is gone from the index store")
+                    with self._lock:
+                        self._known.get(scope, {}).pop(doc_id, None)
+                    continue
+                self.add_document(doc_id, vectorstore, thread_id=None if scope == GLOBAL_SCOPE else scope,
+                                  filename=filename)
+            self.restores += 1
+            logger.info(f"♻️ Restored knowledge base '{scope}' ({len(missing)} documents)")
+        with self._lock:
+            return self._entries.get(scope)
+
+    def resolve(self, thread_id: Optional[str] = None) -> List[DocumentIndex]:
+        """Returns the indexes visible to a thread (its own, then global)."""
+        scopes = [self._scope(thread_id)]
+        if scopes[0] != GLOBAL_SCOPE:
+            scopes.append(GLOBAL_SCOPE)
+        found = []
+        for scope in scopes:
+            index = self._restore(scope)
+            if index is not None and index.document_count:
+                found.append(index)
+        return found
+
+    def has_documents(self, thread_id: Optional[str] = None) -> bool:
+        return bool(self.resolve(thread_id))
+
+    def documents(self, thread_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        index = self._restore(self._scope(thread_id))
+        return index.documents() if index is not None else []
+
+    def versions(self) -> set:
+        """Current version of every resident index (for cache invalidation)."""
+        with self._lock:
+            return {index.version for index in self._entries.values()}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes.clear()
+            self._known.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "threads": len(self._entries),
+                "documents": sum(index.document_count for index in self._entries.values()),
+                "ram_bytes": self.ram_bytes,
+                "ram_budget_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "restores": self.restores,
+                "evicted_threads": sum(1 for scope in self._known if scope not in self._entries),
+                "index_types": dict(Counter(index.description for index in self._entries.values())),
+            }
+
+
+# Singleton Instance (rag_engine sets its loader to the on-disk index store)
+registry = RetrieverRegistry()
@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, TYPE_CHECKING
+
+from langchain_core.documents import Document
+
+from shared_state import SharedStore, DocumentCatalog
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
+
+logger = logging.getLogger("vera_index_store")
+
+# --- CONFIG ---
+INDEX_STORE_DIR = os.getenv("VERA_INDEX_STORE", os.path.join("data", "indexes"))
+
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.json"
+MANIFEST_FILE = "manifest.json"
+# scope -> content hashes, next to the indexes so a restart knows who uploaded what
+CATALOG_FILE = "documents.sqlite"
+
+
+# Read-only mmap of the vector codes: loading costs a few syscalls instead of
+# reading the whole file up front. This speeds up loading only: the registry
+# copies the vectors into each thread's in-RAM DocumentIndex, so RAM is not
+# shared between threads or worker processes (and the copy counts against
+# VERA_INDEX_RAM_MB).
+# NOTE: FAISS aborts the process if a memory-mapped index is mutated, so
+# stores returned by load() must be copied before add/remove.
+def _mmap_flags() -> int:
+    import faiss
+    return getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def hash_file(file_path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of the file contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IndexStore:
+    """
+    Content-addressed on-disk FAISS store.
+
+    Layout: <root>/<hash[:2]>/<hash>/{index.faiss, chunks.json, manifest.json}
+    The manifest records how the index was built (embedder, chunking); an
+    entry built with different settings is treated as a miss and rebuilt.
+    """
+
+    def __init__(self, root: str = INDEX_STORE_DIR, fingerprint: Optional[Dict[str, Any]] = None):
+        self.root = root
+        self.fingerprint = fingerprint or {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load_seconds = 0.0
+        self.last_load_ms = 0.0
+        self._catalog: Optional[DocumentCatalog] = None
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self.root, content_hash[:2], content_hash)
+
+    @property
+    def catalog(self) -> DocumentCatalog:
+        """Which documents each scope (thread or global) holds; persisted with the indexes."""
+        if self._catalog is None:
+            with self._lock:
+                if self._catalog is None:
+                    os.makedirs(self.root, exist_ok=True)
+                    self._catalog = DocumentCatalog(SharedStore(os.path.join(self.root, CATALOG_FILE)))
+        return self._catalog
+
+    def exists(self, content_hash: str) -> bool:
+        """True if a complete entry built with the current settings is stored."""
+        try:
+            with open(os.path.join(self._path(content_hash), MANIFEST_FILE)) as f:
+                return json.load(f).get("fingerprint") == self.fingerprint
+        except (OSError, ValueError):
+            return False
+
+    def load(self, content_hash: str, embeddings) -> Optional["FAISS"]:
+        """Memory-maps a stored index. Returns None (a miss) if absent or stale."""
+        start = time.perf_counter()
+        vectorstore = self._read(content_hash, embeddings)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            if vectorstore is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._load_seconds += elapsed
+                self.last_load_ms = elapsed * 1000
+        if vectorstore is not None:
+            logger.info(f"⚡ Index cache hit {content_hash[:12]} ({elapsed * 1000:.1f} ms)")
+        return vectorstore
+
+    def _read(self, content_hash: str, embeddings) -> Optional["FAISS"]:
+        import faiss
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores import FAISS
+        path = self._path(content_hash)
+        try:
+            with open(os.path.join(path, MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+            if manifest.get("fingerprint") != self.fingerprint:
+                logger.info(f"🔁 Stored index {content_hash[:12]} built with other settings; rebuilding.")
+                return None
+
+            index = faiss.read_index(os.path.join(path, INDEX_FILE), _mmap_flags())
+            with open(os.path.join(path, CHUNKS_FILE)) as f:
+                chunks = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to load stored index {content_hash[:12]}: {e}")
+            return None
+
+        docstore = InMemoryDocstore({
+            c["id"]: Document(page_content=c["page_content"], metadata=c["metadata"], id=c["id"])
+            for c in chunks
+        })
+        index_to_docstore_id = {i: c["id"] for i, c in enumerate(chunks)}
+        return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+    def save(self, content_hash: str, vectorstore: "FAISS", **manifest_extra):
+        """
+        Writes the index into a temp dir and renames it into place, so readers
+        never see half a store. Content-addressed, so an up-to-date entry is
+        left as is, including one another worker publishes while this one is
+        writing (checked again just before the swap; the rename into an empty
+        slot also fails if one appeared). Only a stale entry (other settings,
+        or half-written) is renamed aside, replaced and then deleted; readers
+        may miss during that swap, which costs them a rebuild, not an error.
+        """
+        if self.exists(content_hash):
+            return
+        import faiss
+        path = self._path(content_hash)
+        suffix = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        tmp, old = f"{path}.tmp-{suffix}", f"{path}.old-{suffix}"
+        os.makedirs(tmp, exist_ok=True)
+        try:
+            faiss.write_index(vectorstore.index, os.path.join(tmp, INDEX_FILE))
+            chunks = []
+            for i in range(vectorstore.index.ntotal):
+                doc_id = vectorstore.index_to_docstore_id[i]
+                doc = vectorstore.docstore.search(doc_id)
+                chunks.append({"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata})
+            with open(os.path.join(tmp, CHUNKS_FILE), "w") as f:
+                json.dump(chunks, f, default=str)
+            with open(os.path.join(tmp, MANIFEST_FILE), "w") as f:
+                json.dump({
+                    "content_hash": content_hash,
+                    "fingerprint": self.fingerprint,
+                    "chunks": len(chunks),
+                    "created_at": time.time(),
+                    **manifest_extra,
+                }, f)
+
+            if self.exists(content_hash):
+                return  # published by another worker meanwhile; ours is dropped below
+            try:
+                os.rename(path, old)  # only a stale entry gets here
+            except FileNotFoundError:
+                pass
+            try:
+                os.replace(tmp, path)
+            except OSError:
+                # Another worker stored the same content first; theirs is just as good
+                if not self.exists(content_hash):
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+            shutil.rmtree(old, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "root": self.root,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "avg_load_ms": round(self._load_seconds / self.hits * 1000, 3) if self.hits else 0.0,
+                "last_load_ms": round(self.last_load_ms, 3),
+            }
@@ -0,0 +1,197 @@
+import os
+import time
+import uuid
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from rag_engine import process_document
+from shared_state import get_shared_store, JobBoard
+
+logger = logging.getLogger("vera_ingestion")
+
+# --- CONFIG ---
+INGEST_WORKERS = int(os.getenv("VERA_INGEST_WORKERS", "2"))
+INGEST_MAX_PENDING = int(os.getenv("VERA_INGEST_MAX_PENDING", "16"))
+UPLOAD_DIR = os.getenv("VERA_UPLOAD_DIR", tempfile.gettempdir())
+UPLOAD_CHUNK_BYTES = 1 << 20
+# Finished jobs kept around for status polling
+JOB_HISTORY = 1000
+# Multi-worker mode: progress is copied to the shared job board at most this often
+JOB_PUBLISH_INTERVAL_S = 0.5
+
+
+class IngestionQueueFull(Exception):
+    """Raised when more uploads are pending than the queue accepts."""
+
+
+class IngestJob:
+    """Status + progress of one upload. Updated from the worker thread."""
+
+    def __init__(self, filename: str, thread_id: Optional[str], board: Optional[JobBoard] = None):
+        self.job_id = str(uuid.uuid4())
+        self.filename = filename
+        self.thread_id = thread_id
+        self.status = "queued"
+        self.pages_total = 0
+        self.pages_parsed = 0
+        self.chunks_total = 0
+        self.chunks_embedded = 0
+        self.doc_id = None
+        self.cache_hit = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._board = board
+        self._published = 0.0
+
+    def update(self, **fields):
+        with self._lock:
+            status = self.status
+            for key, value in fields.items():
+                setattr(self, key, value)
+        if self._board is not None and (self.status != status or "finished_at" in fields
+                                        or time.monotonic() - self._published >= JOB_PUBLISH_INTERVAL_S):
+            self.publish()
+
+    def publish(self):
+        """Copies the status to the shared job board (multi-worker mode), so any worker can answer a poll."""
+        if self._board is None:
+            return
+        self._published = time.monotonic()
+        try:
+            self._board.publish(self.to_dict())
+        except Exception as e:
+            logger.warning(f"Could not publish job {self.job_id}: {e}")
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished_at or time.time()
+            return {
+                "job_id": self.job_id,
+                "filename": self.filename,
+                "thread_id": self.thread_id,
+                "status": self.status,
+                "pages_total": self.pages_total,
+                "pages_parsed": self.pages_parsed,
+                "chunks_total": self.chunks_total,
+                "chunks_embedded": self.chunks_embedded,
+                "doc_id": self.doc_id,
+                "cache_hit": self.cache_hit,
+                "error": self.error,
+                "queued_seconds": round((self.started_at or end) - self.created_at, 3),
+                "elapsed_seconds": round(end - (self.started_at or end), 3),
+            }
+
+
+class IngestionQueue:
+    """
+    Bounded worker pool for PDF ingestion.
+
+    Uploads return immediately with a job id; parsing and embedding run on
+    INGEST_WORKERS threads so the event loop keeps serving chats.
+    """
+
+    def __init__(self, workers: int = INGEST_WORKERS, max_pending: int = INGEST_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = 0
+        store = get_shared_store()
+        self._board = JobBoard(store) if store is not None else None
+        self.completed = 0
+        self.failed = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vera-ingest")
+        return self._executor
+
+    def submit(self, file_path: str, filename: str, thread_id: Optional[str] = None,
+               content_hash: Optional[str] = None) -> IngestJob:
+        job = IngestJob(filename, thread_id, board=self._board)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise IngestionQueueFull(f"{self._pending} uploads already pending")
+            self._pending += 1
+            self._jobs[job.job_id] = job
+            self._trim()
+            pool = self._pool()
+        job.publish()
+        pool.submit(self._run, job, file_path, content_hash)
+        return job
+
+    def _trim(self):
+        finished = [jid for jid, j in self._jobs.items() if j.finished]
+        for jid in finished[:max(0, len(self._jobs) - JOB_HISTORY)]:
+            del self._jobs[jid]
+
+    def _run(self, job: IngestJob, file_path: str, content_hash: Optional[str]):
+        job.update(status="running", started_at=time.time())
+        try:
+            result = process_document(
+                file_path,
+                thread_id=job.thread_id,
+                content_hash=content_hash,
+                progress=job,
+                filename=job.filename,
+            )
+            job.update(status="done", doc_id=result.doc_id, cache_hit=result.cache_hit)
+            logger.info(f"📄 Ingested {job.filename} in {result.seconds:.2f}s (cache_hit={result.cache_hit})")
+        except Exception as e:
+            logger.error(f"Ingestion of {job.filename} failed: {e}")
+            job.update(status="failed", error=str(e))
+        finally:
+            job.update(finished_at=time.time())
+            with self._lock:
+                self._pending -= 1
+                if job.status == "done":
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            # The index lives in the store now; the raw upload is no longer needed
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status from this worker, else (multi-worker mode) from whichever worker ran it."""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self._board.get(job_id) if self._board is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# Singleton Instance
+ingestion_queue = IngestionQueue()
@@ -0,0 +1,125 @@
+import os
+import re
+import math
+import heapq
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# --- CONFIG ---
+BM25_K1 = float(os.getenv("VERA_BM25_K1", "1.2"))
+BM25_B = float(os.getenv("VERA_BM25_B", "0.75"))
+# Queries with at most this many content terms (or a quoted phrase) are keyword lookups
+KEYWORD_MAX_TERMS = int(os.getenv("VERA_KEYWORD_MAX_TERMS", "3"))
+# Terms in more than this share of chunks barely move BM25 scores; skip their postings
+BM25_MAX_DF = float(os.getenv("VERA_BM25_MAX_DF", "0.9"))
+# Reciprocal-rank-fusion constant (60 is the usual choice)
+RRF_K = 60
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.@_-]*[a-z0-9+#]|[a-z0-9]")
+_PHRASE = re.compile(r'"([^"]+)"')
+# Tiny list: only words that would otherwise dominate postings or mark a question
+STOPWORDS = frozenset("""
+a an and are as at be by can did do does for from has have how i in is it its me my of on or
+please show tell that the their them there these this to was what when where which who why
+will with you your about any find list give mention
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms; keeps tokens like c++, c#, node.js and emails whole."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def is_keyword_query(query: str) -> bool:
+    """Names, skills, exact phrases: short or quoted queries, not questions."""
+    if _PHRASE.search(query):
+        return True
+    return 0 < len(tokenize(query)) <= KEYWORD_MAX_TERMS
+
+
+def fuse(*rankings: List[str], k: int = RRF_K) -> List[str]:
+    """Reciprocal rank fusion: ids ranked well by any list float to the top."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class BM25Index:
+    """
+    In-memory inverted index over chunks: term -> {chunk id: term frequency}.
+
+    Built alongside the FAISS store from the same chunk text, so keyword
+    lookups (a name, a skill, "an exact phrase") never touch the embedder.
+    Removal is immediate; there are no tombstones to compact.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._terms: Dict[str, Tuple[str, ...]] = {}  # chunk id -> distinct terms (for removal)
+        self._total_length = 0
+        self._posting_count = 0
+        self._lock = threading.RLock()
+
+    def add(self, chunk_id: str, text: str):
+        counts = Counter(tokenize(text))
+        with self._lock:
+            if chunk_id in self._lengths:
+                self.remove([chunk_id])
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[chunk_id] = tf
+            length = sum(counts.values())
+            self._lengths[chunk_id] = length
+            self._terms[chunk_id] = tuple(counts)
+            self._total_length += length
+            self._posting_count += len(counts)
+
+    def remove(self, chunk_ids: List[str]):
+        with self._lock:
+            for chunk_id in chunk_ids:
+                terms = self._terms.pop(chunk_id, None)
+                if terms is None:
+                    continue
+                self._total_length -= self._lengths.pop(chunk_id)
+                self._posting_count -= len(terms)
+                for term in terms:
+                    postings = self._postings[term]
+                    del postings[chunk_id]
+                    if not postings:
+                        del self._postings[term]
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[str, float]]:
+        """Top-k (chunk id, BM25 score). Only chunks matching at least one term."""
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._lengths)
+            if not n or not terms:
+                return []
+            avg_length = self._total_length / n or 1.0
+            matched = [p for p in map(self._postings.get, terms) if p]
+            selective = [p for p in matched if len(p) <= BM25_MAX_DF * n]
+            scores: Dict[str, float] = {}
+            for postings in selective or matched:
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def nbytes(self) -> int:
+        """Rough RAM footprint: ~48 bytes per posting plus per-chunk bookkeeping."""
+        return self._posting_count * 48 + len(self._lengths) * 96
+
+
+def phrases(query: str) -> Optional[List[str]]:
+    """Quoted phrases in a query, lowercased (None when there are none)."""
+    found = [p.strip().lower() for p in _PHRASE.findall(query) if p.strip()]
+    return found or None
@@ -0,0 +1,209 @@
+import os
+import asyncio
+import logging
+import threading
+import contextlib
+from typing import Any, Dict, Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("vera_llm")
+
+# --- CONFIG ---
+# Point at a self-hosted NIM / any OpenAI-compatible server (default: NVIDIA cloud)
+LLM_BASE_URL = os.getenv("VERA_LLM_BASE_URL") or None
+# LLM calls allowed in flight at once per process; the rest wait for a slot
+LLM_MAX_IN_FLIGHT = int(os.getenv("VERA_LLM_MAX_IN_FLIGHT", "256"))
+# Keep-alive connections held open to the endpoint
+LLM_POOL_SIZE = int(os.getenv("VERA_LLM_POOL_SIZE", str(LLM_MAX_IN_FLIGHT)))
+LLM_KEEPALIVE_S = float(os.getenv("VERA_LLM_KEEPALIVE_S", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("VERA_LLM_CONNECT_TIMEOUT", "5"))
+# Whole call, including streaming the answer
+LLM_TIMEOUT = float(os.getenv("VERA_LLM_TIMEOUT", "120"))
+# How long a turn may wait for an in-flight slot before giving up
+LLM_SLOT_TIMEOUT = float(os.getenv("VERA_LLM_SLOT_TIMEOUT", "30"))
+
+
+class _SharedSession:
+    """
+    Hands the pooled aiohttp session to a client that closes its session after
+    every request (langchain-nvidia does): close() is a no-op, so connections
+    stay alive for the next call.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def close(self):
+        pass
+
+
+class LLMConnectionPool:
+    """
+    Keep-alive HTTP pools to the LLM endpoint: one aiohttp session per event
+    loop (sessions can't cross loops) and one requests.Session for sync calls.
+    """
+
+    def __init__(self, size: int = LLM_POOL_SIZE, keepalive: float = LLM_KEEPALIVE_S,
+                 connect_timeout: float = LLM_CONNECT_TIMEOUT, timeout: float = LLM_TIMEOUT):
+        self.size = size
+        self.keepalive = keepalive
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.sync_timeout = (connect_timeout, timeout)
+        self._lock = threading.Lock()
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._sync: Optional[requests.Session] = None
+        self.sessions_created = 0
+
+    def session(self) -> _SharedSession:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                # Drop sessions whose loops are gone (tests, asyncio.run)
+                for old in [l for l in self._sessions if l.is_closed()]:
+                    del self._sessions[old]
+                connector = aiohttp.TCPConnector(limit=self.size, keepalive_timeout=self.keepalive)
+                session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+                self._sessions[loop] = session
+                self.sessions_created += 1
+        return _SharedSession(session)
+
+    def sync_session(self) -> requests.Session:
+        with self._lock:
+            if self._sync is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.request = _with_timeout(session.request, self.sync_timeout)
+                self._sync = session
+            return self._sync
+
+    async def aclose(self):
+        """Closes the session bound to the running loop (call at app shutdown)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.pop(loop, None)
+        if session is not None:
+            await session.close()
+
+    def attach(self, llm):
+        """Routes a langchain-nvidia chat model's HTTP traffic through this pool."""
+        client = getattr(llm, "_client", None)
+        if client is None:
+            return llm
+        client.get_async_session_fn = self.session
+        client.get_session_fn = self.sync_session
+        return llm
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            open_sessions = sum(1 for s in self._sessions.values() if not s.closed)
+        return {"pool_size": self.size, "open_sessions": open_sessions, "sessions_created": self.sessions_created}
+
+
+def _with_timeout(request, timeout):
+    def send(method, url, **kwargs):
+        kwargs.setdefault("timeout", timeout)
+        return request(method, url, **kwargs)
+    return send
+
+
+class InFlightLimiter:
+    """
+    Caps concurrent LLM calls. Async callers wait on a per-loop semaphore,
+    sync callers (graph.invoke, Streamlit) on a thread semaphore; both give up
+    after `slot_timeout` so a saturated endpoint sheds load instead of queueing
+    forever.
+    """
+
+    def __init__(self, limit: int = LLM_MAX_IN_FLIGHT, slot_timeout: float = LLM_SLOT_TIMEOUT):
+        self.limit = limit
+        self.slot_timeout = slot_timeout
+        self._lock = threading.Lock()
+        self._async: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._sync = threading.BoundedSemaphore(limit)
+        self.in_flight = 0
+        self.peak = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._async.get(loop)
+            if semaphore is None:
+                for old in [l for l in self._async if l.is_closed()]:
+                    del self._async[old]
+                semaphore = self._async[loop] = asyncio.Semaphore(self.limit)
+            self.waiting += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.slot_timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.rejected += 1
+            raise TimeoutError(f"No LLM slot free within {self.slot_timeout:g}s") from None
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        self._enter()
+        try:
+            yield
+        finally:
+            self._exit()
+            semaphore.release()
+
+    @contextlib.contextmanager
+    def sync_slot(self):
+        with self._lock:
+            self.waiting += 1
+        acquired = self._sync.acquire(timeout=self.slot_timeout)
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.rejected += 1
+        if not acquired:
+            raise TimeoutError(f"No LLM slot free within {self.slot_timeout:g}s")
+        self._enter()
+        try:
+            yield
+        finally:
+            self._exit()
+            self._sync.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"limit": self.limit, "in_flight": self.in_flight, "peak": self.peak,
+                    "waiting": self.waiting, "rejected": self.rejected}
+
+
+def create_chat_model(model_name: str, temperature: float = 0.5):
+    """ChatNVIDIA wired to the shared connection pool (and VERA_LLM_BASE_URL, if set)."""
+    from langchain_nvidia_ai_endpoints import ChatNVIDIA  # seconds to import; first graph build only
+    kwargs = {"base_url": LLM_BASE_URL} if LLM_BASE_URL else {}
+    return llm_pool.attach(ChatNVIDIA(model=model_name, temperature=temperature, **kwargs))
+
+
+def llm_stats() -> Dict[str, Any]:
+    return {**llm_limiter.stats(), **llm_pool.stats(), "timeout_s": LLM_TIMEOUT}
+
+
+# Shared by every graph in the process
+llm_pool = LLMConnectionPool()
+llm_limiter = InFlightLimiter()
@@ -0,0 +1,306 @@
+import os
+import time
+import bisect
+import inspect
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("vera_metrics")
+
+# --- CONFIG ---
+# "0" turns every hot-path timer into a no-op (nodes aren't even wrapped)
+METRICS_ENABLED = os.getenv("VERA_METRICS", "1").lower() not in ("0", "false", "off")
+# Trace spans: "off", "log" (one DEBUG line per span, no dependencies) or
+# "otel" (OpenTelemetry, if installed; configure its exporter as usual)
+TRACING = os.getenv("VERA_TRACING", "off").lower()
+# Seconds; covers instant replies (ms) through slow LLM calls and uploads
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    if value != value:
+        return "NaN"
+    if value.is_integer():
+        return str(int(value))
+    return {float("inf"): "+Inf", float("-inf"): "-Inf"}.get(value, repr(value))
+
+
+class Counter:
+    """Monotonic count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(v)}" for key, v in sorted(values.items())]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Bucketed distribution (cumulative on export) plus sum and count per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[tuple, list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, *labels):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[slot] += 1
+            series[-1] += value
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[:-1]) if series else 0
+
+    @contextmanager
+    def time(self, *labels, span_name: Optional[str] = None, **attributes):
+        """Observes the block's duration (and wraps it in a trace span when tracing is on)."""
+        with span(span_name or self.name, **attributes):
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        lines = []
+        for key, values in sorted(series.items()):
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), values[:-1]):
+                running += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(round(values[-1], 6))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {running}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class _NullCounter(Counter):
+    """What counters become with VERA_METRICS=0: inc() costs one call."""
+
+    def inc(self, *labels, amount: float = 1.0):
+        pass
+
+
+class _NullHistogram(Histogram):
+    """What histograms become with VERA_METRICS=0: observe() costs one call."""
+
+    def observe(self, value: float, *labels):
+        pass
+
+
+def _flatten(prefix: str, node: Dict[str, Any]) -> Iterable[Tuple[str, float]]:
+    for key, value in node.items():
+        name = f"{prefix}_{key}".replace("-", "_").replace(".", "_").replace(" ", "_").lower()
+        if isinstance(value, dict):
+            yield from _flatten(name, value)
+        elif isinstance(value, bool):
+            yield name, float(value)
+        elif isinstance(value, (int, float)):
+            yield name, float(value)
+
+
+class MetricsRegistry:
+    """
+    Prometheus text exposition for Vera.
+
+    Hot-path timings (nodes, LLM calls, tools, ingestion stages) are
+    histograms observed where they happen. Everything the modules already
+    count in their stats() (caches, budget, admission, routes...) is read
+    only when /metrics is scraped, as gauges: zero cost between scrapes.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+        self._stats: List[Tuple[str, Callable[[], Dict[str, Any]], Optional[str]]] = []
+
+    def _add(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        cls = Counter if self.enabled else _NullCounter
+        return self._add(cls(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        cls = Histogram if self.enabled else _NullHistogram
+        return self._add(cls(name, help, labels, buckets))
+
+    def register_stats(self, section: str, fn: Callable[[], Dict[str, Any]], label: Optional[str] = None):
+        """
+        Exports a stats() dict as vera_<section>_<key> gauges at scrape time.
+        With `label`, the top-level keys are dynamic (tool names, routes) and
+        become that label's values instead of part of the metric name.
+        """
+        with self._lock:
+            self._stats = [s for s in self._stats if s[0] != section] + [(section, fn, label)]
+
+    def _stats_lines(self) -> List[str]:
+        families: Dict[str, List[str]] = {}
+        for section, fn, label in list(self._stats):
+            try:
+                data = fn() or {}
+            except Exception as e:
+                logger.warning(f"Stats collector '{section}' failed: {e}")
+                continue
+            if label:
+                for key, entry in data.items():
+                    if isinstance(entry, dict):
+                        for name, value in _flatten(f"vera_{section}", entry):
+                            families.setdefault(name, []).append(f'{name}{{{label}="{_escape(key)}"}} {_number(value)}')
+            else:
+                for name, value in _flatten(f"vera_{section}", data):
+                    families.setdefault(name, []).append(f"{name} {_number(value)}")
+        lines = []
+        for name, samples in families.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+        return lines
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            samples = metric.render()
+            if samples:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(samples)
+        lines.extend(self._stats_lines())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+# --- TRACING ---
+_tracer = None
+_tracer_ready = False
+_tracer_lock = threading.Lock()
+
+
+def _get_tracer():
+    global _tracer, _tracer_ready
+    if _tracer_ready:
+        return _tracer
+    with _tracer_lock:
+        if not _tracer_ready:
+            if TRACING == "otel":
+                try:
+                    from opentelemetry import trace
+                    _tracer = trace.get_tracer("vera")
+                except ImportError:
+                    logger.warning("⚠️ VERA_TRACING=otel but opentelemetry is not installed; spans go to the log")
+                    _tracer = "log"
+            elif TRACING == "log":
+                _tracer = "log"
+            _tracer_ready = True
+    return _tracer
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """A trace span around the block; a bare yield when VERA_TRACING=off."""
+    tracer = _get_tracer() if TRACING != "off" else None
+    if tracer is None:
+        yield
+    elif tracer == "log":
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            attrs = " ".join(f"{k}={v}" for k, v in attributes.items())
+            logger.debug(f"🔭 {name} {(time.perf_counter() - start) * 1000:.2f}ms {attrs}".rstrip())
+    else:
+        with tracer.start_as_current_span(name, attributes=attributes):
+            yield
+
+
+def instrument_node(name: str, fn: Callable) -> Callable:
+    """
+    Times a graph node (or edge function) into vera_node_seconds{node=name}.
+    Returns fn untouched when metrics and tracing are both off. The wrapper
+    keeps fn's signature, so LangGraph still injects config.
+    """
+    if not metrics.enabled and TRACING == "off":
+        return fn
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def timed_async(*args, **kwargs):
+            with NODE_SECONDS.time(name, span_name=f"node.{name}"):
+                return await fn(*args, **kwargs)
+        return timed_async
+
+    @functools.wraps(fn)
+    def timed_sync(*args, **kwargs):
+        with NODE_SECONDS.time(name, span_name=f"node.{name}"):
+            return fn(*args, **kwargs)
+    return timed_sync
+
+
+# Singleton Instance
+metrics = MetricsRegistry()
+
+# --- HOT-PATH METRICS ---
+NODE_SECONDS = metrics.histogram("vera_node_seconds", "Wall time per graph node / routing decision", ["node"])
+LLM_SECONDS = metrics.histogram("vera_llm_seconds", "LLM call duration in the reasoning node")
+TTFT_SECONDS = metrics.histogram("vera_ttft_seconds", "Streamed turns: request start to first answer token")
+TOOL_SECONDS = metrics.histogram("vera_tool_seconds", "Tool call duration", ["tool", "outcome"])
+INGEST_STAGE_SECONDS = metrics.histogram("vera_ingest_stage_seconds", "Document ingestion time per stage", ["stage"])
+ROUTE_DECISIONS = metrics.counter("vera_route_decisions_total", "Entry routing decisions", ["route"])
@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger("vera_onnx")
+
+# --- CONFIG ---
+ONNX_DIR = os.getenv("VERA_ONNX_DIR", os.path.join("data", "onnx"))
+# "int8" (dynamic weight quantization) or "fp32" (plain export, bit-for-bit close to PyTorch)
+ONNX_PRECISION = os.getenv("VERA_ONNX_PRECISION", "int8")
+# Intra-op threads for one forward pass; 0 = every core this process may run on
+ONNX_THREADS = int(os.getenv("VERA_ONNX_THREADS", "0"))
+# Padded tokens per forward pass: texts are length-sorted and cut into batches
+# of at most this many (rows x longest row), so short queries never pad to 256
+ONNX_BATCH_TOKENS = int(os.getenv("VERA_ONNX_BATCH_TOKENS", "8192"))
+# Accuracy contract: every int8 embedding has at least this cosine similarity
+# with the full-precision PyTorch embedding of the same text. Retrieval only
+# compares vectors from one backend (the backend is part of the index-store
+# fingerprint); check_parity / bench_embeddings.py --real verify it.
+ONNX_COSINE_TOLERANCE = float(os.getenv("VERA_ONNX_COSINE_TOLERANCE", "0.98"))
+
+CONFIG_FILE = "vera_onnx.json"
+OPSET = 17
+
+
+def _cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))  # honours container CPU sets
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def model_dir(model_name: str, precision: str = ONNX_PRECISION, root: Optional[str] = None) -> str:
+    """Where the exported graph for a model lives (under VERA_ONNX_DIR by default)."""
+    name = model_name.strip("/").replace("/", "__")
+    return os.path.join(root or ONNX_DIR, name, precision)
+
+
+def export(model_name: str, out_dir: str, precision: str = ONNX_PRECISION) -> str:
+    """
+    One-off conversion of a sentence-transformers model to ONNX (run on first
+    use, then cached): the transformer goes into the graph, mean pooling and
+    normalization stay in numpy so they match the Pooling/Normalize modules.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    start = time.perf_counter()
+    st = SentenceTransformer(model_name, device="cpu")
+    pooling = next((m for m in st if isinstance(m, Pooling)), None)
+    if pooling is None or pooling.get_pooling_mode_str() != "mean":
+        raise ValueError(f"'{model_name}' does not use mean pooling; the ONNX backend only supports mean")
+
+    class _Encoder(torch.nn.Module):
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.transformer(input_ids=input_ids, attention_mask=attention_mask,
+                                    token_type_ids=token_type_ids).last_hidden_state
+
+    os.makedirs(out_dir, exist_ok=True)
+    fp32_path = os.path.join(out_dir, "model_fp32.onnx")
+    sample = st.tokenizer(["warm-up export"], return_tensors="pt", return_token_type_ids=True)
+    dynamic = {0: "batch", 1: "tokens"}
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(st[0].auto_model.eval()),
+            (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={"input_ids": dynamic, "attention_mask": dynamic, "token_type_ids": dynamic,
+                          "last_hidden_state": dynamic},
+            opset_version=OPSET,
+            dynamo=False,
+        )
+
+    model_file = fp32_path
+    if precision == "int8":
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        model_file = os.path.join(out_dir, "model_int8.onnx")
+        # Weights to int8 per output channel; activations are quantized per call
+        quantize_dynamic(fp32_path, model_file, weight_type=QuantType.QInt8, per_channel=True)
+        os.remove(fp32_path)
+
+    st.tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, CONFIG_FILE), "w") as f:
+        json.dump({
+            "model_name": model_name,
+            "precision": precision,
+            "model_file": os.path.basename(model_file),
+            "max_length": st.max_seq_length,
+            "normalize": any(isinstance(m, Normalize) for m in st),
+        }, f)
+    logger.info(f"📦 Exported '{model_name}' to ONNX ({precision}) in {time.perf_counter() - start:.1f}s")
+    return out_dir
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    CPU embedder running a sentence-transformers model as an (int8) ONNX
+    graph: no torch at serve time, one tuned onnxruntime session.
+
+    Batches are formed by padded-token budget over length-sorted texts, so
+    each forward pass pads only to its own longest text. Drop-in for
+    HuggingFaceEmbeddings inside EmbeddingService (VERA_EMBED_BACKEND=onnx).
+    """
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        precision: str = ONNX_PRECISION,
+        path: Optional[str] = None,
+        threads: int = ONNX_THREADS,
+        batch_tokens: int = ONNX_BATCH_TOKENS,
+    ):
+        self.model_name = model_name
+        self.precision = precision
+        self.path = path or model_dir(model_name, precision)
+        self.threads = threads or _cpu_count()
+        self.batch_tokens = max(1, batch_tokens)
+        self._load_lock = threading.Lock()
+        self._session = None
+        self._tokenizer = None
+        self._config: Dict[str, Any] = {}
+        self._input_names: List[str] = []
+
+    def _load(self):
+        if self._session is not None:
+            return
+        with self._load_lock:
+            if self._session is not None:
+                return
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+
+            if not os.path.exists(os.path.join(self.path, CONFIG_FILE)):
+                export(self.model_name, self.path, self.precision)
+            with open(os.path.join(self.path, CONFIG_FILE)) as f:
+                config = json.load(f)
+
+            tokenizer = Tokenizer.from_file(os.path.join(self.path, "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=config["max_length"])
+            tokenizer.no_padding()  # padded per batch in _forward
+
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = self.threads
+            # One graph runs at a time (EmbeddingService has a single worker)
+            options.inter_op_num_threads = 1
+            options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = ort.InferenceSession(os.path.join(self.path, config["model_file"]), options,
+                                           providers=["CPUExecutionProvider"])
+
+            self._input_names = [i.name for i in session.get_inputs()]
+            self._tokenizer, self._config = tokenizer, config
+            self._session = session
+            logger.info(f"✅ ONNX embedder ready ({config['precision']}, {self.threads} threads)")
+
+    def _forward(self, encodings) -> np.ndarray:
+        width = max(len(e.ids) for e in encodings)
+        feeds = {name: np.zeros((len(encodings), width), dtype=np.int64) for name in self._input_names}
+        for row, e in enumerate(encodings):
+            feeds["input_ids"][row, :len(e.ids)] = e.ids
+            feeds["attention_mask"][row, :len(e.ids)] = e.attention_mask
+            if "token_type_ids" in feeds:
+                feeds["token_type_ids"][row, :len(e.ids)] = e.type_ids
+        hidden = self._session.run(None, feeds)[0]
+        mask = feeds["attention_mask"][:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self._config["normalize"]:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        self._load()
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        encodings = self._tokenizer.encode_batch(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(encodings[i].ids))
+        out = None
+        start = 0
+        while start < len(order):
+            # Sorted ascending, so the last row taken sets the padded width
+            end = start + 1
+            while end < len(order) and (end - start + 1) * len(encodings[order[end]].ids) <= self.batch_tokens:
+                end += 1
+            rows = order[start:end]
+            vectors = self._forward([encodings[i] for i in rows])
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[rows] = vectors
+            start = end
+        return out
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.encode([text])[0].tolist()
+
+
+def check_parity(candidate: Embeddings, reference: Embeddings, texts: List[str],
+                 tolerance: float = ONNX_COSINE_TOLERANCE) -> Dict[str, Any]:
+    """Cosine agreement between two embedders on the same texts (e.g. ONNX int8 vs PyTorch)."""
+    a = np.asarray(candidate.embed_documents(texts), dtype=np.float32)
+    b = np.asarray(reference.embed_documents(texts), dtype=np.float32)
+    cosine = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return {
+        "texts": len(texts),
+        "min_cosine": round(float(cosine.min()), 5),
+        "mean_cosine": round(float(cosine.mean()), 5),
+        "tolerance": tolerance,
+        "ok": bool(cosine.min() >= tolerance),
+    }
@@ -0,0 +1,146 @@
+import os
+import time
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Optional
+
+from langchain_core.documents import Document
+
+from metrics import INGEST_STAGE_SECONDS
+
+logger = logging.getLogger("vera_parallel_ingest")
+
+# --- CONFIG ---
+PARSE_WORKERS = int(os.getenv("VERA_PARSE_WORKERS", str(os.cpu_count() or 1)))
+PAGES_PER_TASK = int(os.getenv("VERA_PAGES_PER_TASK", "8"))
+# Chunks handed to the embedder at a time while parsing continues
+STREAM_EMBED_BATCH = int(os.getenv("VERA_STREAM_EMBED_BATCH", "64"))
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _parse_pool() -> ProcessPoolExecutor:
+    """Shared parse pool. 'spawn' keeps children clear of the embedder/torch threads."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ProcessPoolExecutor(
+                    max_workers=PARSE_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _POOL
+
+
+def shutdown_parse_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+
+
+def count_pages(file_path: str) -> int:
+    """Page count from the xref (cheap); 0 if pypdf can't read the file."""
+    try:
+        from pypdf import PdfReader
+        return len(PdfReader(file_path).pages)
+    except Exception:
+        return 0
+
+
+def parse_page_range(file_path: str, start: int, end: int) -> List[Tuple[int, str, str, int]]:
+    """Runs in a worker process: returns (page, label, text, total_pages) for [start, end)."""
+    from pypdf import PdfReader
+    reader = PdfReader(file_path)
+    total = len(reader.pages)
+    labels = reader.page_labels
+    return [
+        (i, labels[i], reader.pages[i].extract_text().strip(), total)
+        for i in range(start, min(end, total))
+    ]
+
+
+def stream_vectorstore(file_path, splitter, embeddings, progress=None, workers: Optional[int] = None,
+                       pages_per_task: int = PAGES_PER_TASK, embed_batch: int = STREAM_EMBED_BATCH):
+    """
+    Parse -> chunk -> embed, overlapped.
+
+    Page ranges are parsed in a process pool; each range is chunked as soon
+    as it and every range before it are parsed, and its chunks are embedded
+    in batches on this thread while later ranges are still being parsed.
+    Ranges are consumed in page order (not completion order), so the chunk
+    order, and with it the index, is the same on every run and matches the
+    serial path. The FAISS index grows batch by batch instead of being
+    built in one call at the end.
+    """
+    from langchain_community.vectorstores import FAISS
+
+    total_pages = count_pages(file_path)
+    if progress is not None:
+        progress.update(pages_total=total_pages)
+
+    if workers is None:
+        pool = _parse_pool()
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    vectorstore = None
+    pending: List[Document] = []
+    pages_parsed = chunks_total = chunks_embedded = 0
+
+    def flush(batch: List[Document]):
+        nonlocal vectorstore, chunks_embedded
+        texts = [doc.page_content for doc in batch]
+        with INGEST_STAGE_SECONDS.time("embed", span_name="ingest.embed", chunks=len(texts)):
+            pairs = list(zip(texts, embeddings.embed_documents(texts)))
+        metadatas = [doc.metadata for doc in batch]
+        with INGEST_STAGE_SECONDS.time("index", span_name="ingest.index"):
+            if vectorstore is None:
+                vectorstore = FAISS.from_embeddings(pairs, embeddings, metadatas=metadatas)
+            else:
+                vectorstore.add_embeddings(pairs, metadatas=metadatas)
+        chunks_embedded += len(batch)
+        if progress is not None:
+            progress.update(chunks_embedded=chunks_embedded)
+
+    try:
+        futures = [
+            pool.submit(parse_page_range, file_path, start, start + pages_per_task)
+            for start in range(0, total_pages, pages_per_task)
+        ]
+        # "parse" here is time spent waiting on the workers, i.e. parsing not hidden by embedding
+        waited = time.perf_counter()
+        for future in futures:
+            INGEST_STAGE_SECONDS.observe(time.perf_counter() - waited, "parse")
+            pages = [
+                Document(page_content=text, metadata={
+                    "source": file_path, "total_pages": total, "page": page, "page_label": label,
+                })
+                for page, label, text, total in future.result()
+            ]
+            with INGEST_STAGE_SECONDS.time("split", span_name="ingest.split"):
+                chunks = splitter.split_documents(pages)
+            pending.extend(chunks)
+            pages_parsed += len(pages)
+            chunks_total += len(chunks)
+            if progress is not None:
+                progress.update(pages_parsed=pages_parsed, chunks_total=chunks_total)
+
+            while len(pending) >= embed_batch:
+                batch, pending = pending[:embed_batch], pending[embed_batch:]
+                flush(batch)
+            waited = time.perf_counter()
+
+        if pending:
+            flush(pending)
+    finally:
+        if workers is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    if vectorstore is None:
+        raise ValueError(f"No text could be extracted from {os.path.basename(file_path)}")
+    return vectorstore
@@ -1,57 +1,310 @@
 import os
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-# --- CHANGED IMPORT TO FIX WARNING ---
-from langchain_huggingface import HuggingFaceEmbeddings 
+import time
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional, TYPE_CHECKING
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 
-# Global variable to store the retriever instance temporarily
-CURRENT_RETRIEVER = None
+from cache import TTLCache, normalize_query
+from embedding_service import get_embedding_service, EMBED_MODEL_NAME, EMBED_BACKEND
+from index_registry import registry, GLOBAL_SCOPE
+from index_store import IndexStore, hash_file
+from lexical_index import is_keyword_query, fuse
+from chunk_compressor import chunk_compressor
+from parallel_ingest import stream_vectorstore, count_pages
+from metrics import INGEST_STAGE_SECONDS
+from shared_state import get_shared_store, DocumentCatalog
 
-def process_document(file_path):
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
+
+TOP_K = 4
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# Chunks embedded between progress reports
+EMBED_PROGRESS_STEP = 128
+# "serial" (PyPDFLoader, one core), "streaming" (page-parallel pipeline) or
+# "auto" (streaming once a PDF has at least STREAMING_MIN_PAGES pages)
+INGEST_MODE = os.getenv("VERA_INGEST_MODE", "auto")
+STREAMING_MIN_PAGES = int(os.getenv("VERA_STREAMING_MIN_PAGES", "16"))
+
+# "hybrid" (BM25 for keyword queries, fused BM25 + FAISS otherwise),
+# "vector" (FAISS only) or "lexical" (BM25 only, falling back to FAISS on no match)
+RETRIEVAL_MODE = os.getenv("VERA_RETRIEVAL_MODE", "hybrid")
+
+QUERY_CACHE_SIZE = int(os.getenv("VERA_QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = float(os.getenv("VERA_QUERY_CACHE_TTL", "600"))
+
+# Repeated document questions (the fast_doc_trigger path fires on "resume",
+# "skills", ...) skip the embedder and FAISS entirely.
+# query_vectors: normalized query -> embedding (index independent)
+# results:       (normalized query, index versions) -> tool output
+query_vector_cache = TTLCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+result_cache = TTLCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+# Which retriever answered each (uncached) lookup
+retrieval_paths = Counter()
+_paths_lock = threading.Lock()
+
+# Stored indexes are only reused if they were built with these settings
+index_store = IndexStore(fingerprint={
+    "embed_model": EMBED_MODEL_NAME,
+    "embed_backend": EMBED_BACKEND,
+    "chunk_size": CHUNK_SIZE,
+    "chunk_overlap": CHUNK_OVERLAP,
+})
+
+# Evicted knowledge bases come back from the store on their next lookup
+registry.loader = lambda doc_id: index_store.load(doc_id, get_embedding_service())
+
+# Which documents each scope holds, persisted so they survive a restart:
+# in multi-worker mode the node-wide shared store (every worker sees every
+# upload), else index_store.catalog next to the indexes (see _catalog()).
+# Vectors come from index_store on disk either way.
+_shared = get_shared_store()
+catalog = DocumentCatalog(_shared) if _shared is not None else None
+# scope -> (catalog version, documents) this process last mirrored
+_synced = {}
+_sync_lock = threading.Lock()
+
+@dataclass
+class IngestResult:
+    doc_id: str
+    filename: str
+    chunks: int
+    cache_hit: bool
+    seconds: float
+
+def get_thread_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    """Pulls the LangGraph thread_id out of a runnable config (None if absent)."""
+    if not config:
+        return None
+    return config.get("configurable", {}).get("thread_id")
+
+def _report(progress, **fields):
+    """Forwards ingestion progress to a job tracker (anything with .update(**fields))."""
+    if progress is not None:
+        progress.update(**fields)
+
+# langchain_community's loaders and langchain_text_splitters import torch,
+# sentence-transformers and nltk at package level (seconds of startup), so
+# they're imported on the first ingestion instead of with the API.
+def PyPDFLoader(file_path):
+    from langchain_community.document_loaders import PyPDFLoader as loader
+    return loader(file_path)
+
+def _splitter():
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    return RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+def _use_streaming(file_path, mode) -> bool:
+    if mode == "streaming":
+        return True
+    if mode == "auto":
+        return count_pages(file_path) >= STREAMING_MIN_PAGES
+    return False
+
+def build_vectorstore(file_path, progress=None, mode=None) -> "FAISS":
+    """Parses, chunks and embeds a PDF into a fresh FAISS store."""
+    from langchain_community.vectorstores import FAISS
+    if _use_streaming(file_path, mode or INGEST_MODE):
+        return stream_vectorstore(file_path, _splitter(), get_embedding_service(), progress=progress)
+
+    # 1. Load the PDF
+    with INGEST_STAGE_SECONDS.time("parse", span_name="ingest.parse"):
+        loader = PyPDFLoader(file_path)
+        docs = loader.load()
+    _report(progress, pages_total=len(docs), pages_parsed=len(docs))
+
+    # 2. Split into chunks (smaller pieces are easier to match)
+    text_splitter = _splitter()
+    with INGEST_STAGE_SECONDS.time("split", span_name="ingest.split"):
+        splits = text_splitter.split_documents(docs)
+    _report(progress, chunks_total=len(splits))
+
+    # 3. Shared Embeddings (model is loaded once per process and batched)
+    embeddings = get_embedding_service()
+
+    # 4. Embed in steps so the job status can show how far along we are
+    texts = [doc.page_content for doc in splits]
+    vectors = []
+    with INGEST_STAGE_SECONDS.time("embed", span_name="ingest.embed", chunks=len(texts)):
+        for i in range(0, len(texts), EMBED_PROGRESS_STEP):
+            vectors.extend(embeddings.embed_documents(texts[i:i + EMBED_PROGRESS_STEP]))
+            _report(progress, chunks_embedded=len(vectors))
+
+    # 5. Create Vector Store
+    with INGEST_STAGE_SECONDS.time("index", span_name="ingest.index"):
+        return FAISS.from_embeddings(
+            list(zip(texts, vectors)), embeddings, metadatas=[doc.metadata for doc in splits]
+        )
+
+def process_document(file_path, thread_id=None, content_hash=None, progress=None, filename=None):
     """
     Reads a PDF, chunks it, and creates a searchable Vector Store.
+    Indexes are cached on disk by content hash, so a re-upload (or a
+    restart) memory-maps the stored index instead of re-embedding.
+    The index is registered for `thread_id` (or globally when None).
     """
-    global CURRENT_RETRIEVER
-    
-    # 1. Load the PDF
-    loader = PyPDFLoader(file_path)
-    docs = loader.load()
-    
-    # 2. Split into chunks (smaller pieces are easier to match)
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200
+    start = time.perf_counter()
+    content_hash = content_hash or hash_file(file_path)
+    filename = filename or os.path.basename(file_path)
+
+    with INGEST_STAGE_SECONDS.time("cache_load", span_name="ingest.cache_load"):
+        vectorstore = index_store.load(content_hash, get_embedding_service())
+    cache_hit = vectorstore is not None
+    if not cache_hit:
+        vectorstore = build_vectorstore(file_path, progress=progress)
+        with INGEST_STAGE_SECONDS.time("save", span_name="ingest.save"):
+            index_store.save(content_hash, vectorstore, filename=filename)
+    else:
+        _report(progress, chunks_total=vectorstore.index.ntotal, chunks_embedded=vectorstore.index.ntotal)
+
+    # Append it to this thread's knowledge base (LRU-evicted under the RAM budget)
+    with INGEST_STAGE_SECONDS.time("register", span_name="ingest.register"):
+        registry.add_document(content_hash, vectorstore, thread_id=thread_id, filename=filename)
+        _catalog().add(thread_id or GLOBAL_SCOPE, content_hash, filename)
+    _drop_stale_results()
+    return IngestResult(
+        doc_id=content_hash,
+        filename=filename,
+        chunks=vectorstore.index.ntotal,
+        cache_hit=cache_hit,
+        seconds=round(time.perf_counter() - start, 4),
     )
-    splits = text_splitter.split_documents(docs)
-    
-    # 3. Create Embeddings (Local CPU model - Free & Fast)
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    
-    # 4. Create Vector Store
-    vectorstore = FAISS.from_documents(splits, embeddings)
-    
-    # 5. Create a Retriever interface
-    CURRENT_RETRIEVER = vectorstore.as_retriever()
-    return True
 
 @tool
-def lookup_document(query: str):
+def lookup_document(query: str, config: RunnableConfig):
     """
     Use this tool to search for information inside the uploaded PDF document.
     Input should be a specific question or keyword related to the document.
     """
-    if CURRENT_RETRIEVER is None:
+    thread_id = get_thread_id(config)
+    sync_documents(thread_id)
+    indexes = registry.resolve(thread_id)
+    if not indexes:
         return "Error: No document has been uploaded yet."
-    
-    # Retrieve relevant chunks
-    docs = CURRENT_RETRIEVER.invoke(query)
-    
-    # Combine chunks into a single string context
-    return "\n\n".join([doc.page_content for doc in docs])
-
-# --- ADD THIS FUNCTION AT THE END ---
-def is_document_uploaded():
-    """Returns True if a document is currently loaded in memory."""
-    return CURRENT_RETRIEVER is not None
\ No newline at end of file
+
+    # Any change to these indexes bumps a version, which changes the key
+    normalized = normalize_query(query)
+    result_key = (normalized, tuple(index.version for index in indexes))
+    cached = result_cache.get(result_key)
+    if cached is not None:
+        return cached
+
+    docs = retrieve(query, indexes)
+
+    # Merge overlapping neighbours, drop near-duplicates, pack into the token budget
+    context = chunk_compressor.compress(docs)
+    result_cache.set(result_key, context)
+    return context
+
+def _vector_hits(query, indexes, k):
+    # Embed once, then search the thread's knowledge base (and the global one)
+    normalized = normalize_query(query)
+    query_vector = query_vector_cache.get(normalized)
+    if query_vector is None:
+        query_vector = get_embedding_service().embed_query(query)
+        query_vector_cache.set(normalized, query_vector)
+    hits = []
+    for index in indexes:
+        hits.extend(index.search_by_vector(query_vector, k=k))
+    hits.sort(key=lambda hit: hit[1])  # L2 distance: lower is better
+    return [doc for doc, _ in hits[:k]]
+
+def _lexical_hits(query, indexes, k):
+    hits = []
+    for index in indexes:
+        hits.extend(index.search_lexical(query, k=k))
+    hits.sort(key=lambda hit: hit[1], reverse=True)  # BM25: higher is better
+    return [doc for doc, _ in hits[:k]]
+
+def retrieve(query, indexes, mode=None, k=TOP_K):
+    """
+    Top-k chunks for a query. Keyword-style queries (names, skills, quoted
+    phrases) are answered from the BM25 index without embedding anything;
+    other queries fuse the BM25 and FAISS rankings (reciprocal rank fusion).
+    """
+    mode = mode or RETRIEVAL_MODE
+    if mode == "vector":
+        _record_path("vector")
+        return _vector_hits(query, indexes, k)
+
+    lexical = _lexical_hits(query, indexes, k * 2)
+    if lexical and (mode == "lexical" or is_keyword_query(query)):
+        _record_path("lexical")
+        return lexical[:k]
+
+    vector = _vector_hits(query, indexes, k * 2)
+    if not lexical:
+        _record_path("vector")
+        return vector[:k]
+
+    _record_path("hybrid")
+    by_text = {doc.page_content: doc for doc in vector + lexical}
+    ranked = fuse([doc.page_content for doc in vector], [doc.page_content for doc in lexical])
+    return [by_text[text] for text in ranked[:k]]
+
+def _record_path(path):
+    with _paths_lock:
+        retrieval_paths[path] += 1
+
+def _drop_stale_results():
+    """Evicts cached results for index versions that no longer exist."""
+    live = registry.versions()
+    result_cache.invalidate(lambda key: not set(key[1]) <= live)
+
+def retrieval_cache_stats():
+    with _paths_lock:
+        paths = dict(retrieval_paths)
+    return {"query_vectors": query_vector_cache.stats(), "results": result_cache.stats(), "paths": paths,
+            "compression": chunk_compressor.stats()}
+
+def _catalog() -> DocumentCatalog:
+    return catalog if catalog is not None else index_store.catalog
+
+def sync_documents(thread_id=None):
+    """
+    Mirrors the catalog into the registry for this thread's scope and the
+    global one: documents uploaded before a restart, or by another worker
+    (or removed by one). Costs one catalog read when nothing changed; new
+    documents are memory-mapped from index_store.
+    """
+    catalog = _catalog()
+    changed = False
+    scopes = [thread_id or GLOBAL_SCOPE] + ([GLOBAL_SCOPE] if thread_id else [])
+    for scope, version in catalog.versions(scopes).items():
+        owner = None if scope == GLOBAL_SCOPE else scope
+        if _synced.get(scope) == (version, len(registry.documents(owner))):
+            continue
+        with _sync_lock:
+            wanted = dict(catalog.documents(scope))
+            have = {doc["doc_id"] for doc in registry.documents(owner)}
+            for doc_id in have - wanted.keys():
+                changed |= registry.remove_document(doc_id, owner)
+            for doc_id in wanted.keys() - have:
+                vectorstore = index_store.load(doc_id, get_embedding_service())
+                if vectorstore is None:
+                    continue  # not in the store (yet); retried on the next lookup
+                changed |= registry.add_document(doc_id, vectorstore, thread_id=owner, filename=wanted[doc_id])
+            _synced[scope] = (version, len(registry.documents(owner)))
+    if changed:
+        _drop_stale_results()
+
+def is_document_uploaded(thread_id=None):
+    """Returns True if a document is loaded for this thread (or globally)."""
+    sync_documents(thread_id)
+    return registry.has_documents(thread_id)
+
+def remove_document(doc_id, thread_id=None):
+    """Drops a document's vectors from the thread's knowledge base."""
+    removed = registry.remove_document(doc_id, thread_id)
+    # Other workers drop it on their next lookup in this scope
+    removed = _catalog().remove(thread_id or GLOBAL_SCOPE, doc_id) or removed
+    _drop_stale_results()
+    return removed
+
+def list_documents(thread_id=None):
+    sync_documents(thread_id)
+    return registry.documents(thread_id)
@@ -0,0 +1,39 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Any
+
+
+class RouteStats:
+    """Per-route counters: turns, time spent, tokens used and tokens saved."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = defaultdict(lambda: {"count": 0, "seconds": 0.0, "tokens_used": 0, "tokens_saved": 0})
+
+    def record(self, route: str, seconds: float = 0.0, tokens_used: int = 0, tokens_saved: int = 0):
+        with self._lock:
+            entry = self._routes[route]
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            entry["tokens_used"] += tokens_used
+            entry["tokens_saved"] += tokens_saved
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                route: {
+                    "count": e["count"],
+                    "avg_ms": round(e["seconds"] / e["count"] * 1000, 3) if e["count"] else 0.0,
+                    "tokens_used": e["tokens_used"],
+                    "tokens_saved": e["tokens_saved"],
+                }
+                for route, e in self._routes.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+# Singleton Instance
+route_stats = RouteStats()
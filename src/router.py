@@ -0,0 +1,116 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Sequence
+
+# --- DEFAULT TRIGGERS ---
+CHITCHAT_TRIGGERS = ("hello", "hi", "hey", "hola", "greetings", "good morning", "who are you")
+PERSONAL_PATTERNS = (r"my name is", r"i am", r"call me", r"i'm", r"my email is")
+DOC_KEYWORDS = ("pdf", "resume", "cv", "document", "file", "candidate", "skills")
+
+# Words that follow "call me" / "my name is" without being a name
+# ("call me later", "my name is not important"): never captured as one.
+# "call me" also takes adjectives ("call me crazy"), so it only captures a
+# name written capitalized; lowercase falls through to the agent.
+NAME_STOPWORDS = ("later", "back", "when", "if", "not", "now", "soon", "tomorrow", "tonight", "again",
+                  "anytime", "after", "before", "once", "whenever", "maybe", "please", "asap", "at",
+                  "on", "in", "by", "about", "a", "an", "the", "and", "or", "but", "so", "because",
+                  "here", "there", "what", "whatever", "anything", "something", "nothing", "none",
+                  "unknown", "unimportant", "irrelevant", "secret", "private", "you", "your", "it")
+_NAME_WORD = rf"(?!(?:{'|'.join(NAME_STOPWORDS)})\b)[a-z][a-z'\-]*"
+
+# Whole-message templates answered without the LLM. Anything beyond the
+# template ("hi, what did Jensen say at CES?") must still reach the agent.
+INSTANT_TEMPLATES = {
+    "greeting": r"(?:hello|hi|hey|hola|greetings|good (?:morning|afternoon|evening))(?:[\s,]+vera)?[\s!.]*",
+    "identity": r"(?:who are you|what are you|what(?: is|'s) your name|who is vera)[\s?!.]*",
+    "name": rf"^(?:(?:hi|hello|hey)[\s,!.]+)?(?P<name_phrase>my name is|call me)\s+(?P<name_value>{_NAME_WORD}(?:\s+{_NAME_WORD}){{0,2}})[\s.!]*$",
+    "email": r"my email(?: address)? is\s+(?P<email_value>[\w.+-]+@[\w-]+(?:\.[\w-]+)+)[\s.!]*",
+    "recall_name": r"(?:what is|what's|do you (?:remember|know)) my name[\s?!.]*",
+}
+
+# Routes out of START
+INSTANT = "instant_reply"
+FAST_DOC = "fast_doc_trigger"
+AGENT = "agent"
+
+# Messages longer than this are never "chitchat" (matches the old 20-char rule)
+CHITCHAT_MAX_LEN = 20
+
+
+@dataclass(frozen=True)
+class Intent:
+    template: Optional[str] = None   # INSTANT_TEMPLATES key on a whole-message match
+    value: Optional[str] = None      # captured name / email for personal templates
+    chitchat: bool = False
+    personal: bool = False
+    doc_keyword: bool = False
+
+
+class IntentRouter:
+    """
+    Classifies a turn with one combined regex, compiled once per graph.
+
+    The pattern is an alternation of named groups: the anchored instant
+    templates first (they consume the whole message when they match), then
+    the chitchat prefix, personal-info patterns and document keywords, so a
+    single finditer() pass yields every signal the graph needs.
+    """
+
+    def __init__(self, chitchat_triggers: Sequence[str] = CHITCHAT_TRIGGERS,
+                 personal_patterns: Sequence[str] = PERSONAL_PATTERNS,
+                 doc_keywords: Sequence[str] = DOC_KEYWORDS,
+                 cache_size: int = 1024):
+        def alternation(words):
+            return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+        templates = "|".join(f"(?P<t_{name}>{pattern})" for name, pattern in INSTANT_TEMPLATES.items())
+        self._pattern = re.compile(
+            rf"^(?:{templates})$"
+            rf"|(?P<chitchat>^(?:{alternation(chitchat_triggers)}))"
+            rf"|(?P<personal>{'|'.join(personal_patterns)})"
+            rf"|(?P<doc>{alternation(doc_keywords)})",
+            re.I,
+        )
+        # Nodes classify the same message several times per turn; memoize it
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _classify(self, text: str) -> Intent:
+        text = text.strip()
+        chitchat = personal = doc = False
+        for match in self._pattern.finditer(text):
+            kind = match.lastgroup
+            if kind.startswith("t_") or kind in ("name_phrase", "name_value", "email_value"):
+                # A template consumed the whole message
+                template = next(name for name in INSTANT_TEMPLATES if match.group(f"t_{name}") is not None)
+                value = match.group("name_value") or match.group("email_value")
+                if template == "name" and match.group("name_phrase").lower() == "call me" \
+                        and not all(word[0].isupper() for word in value.split()):
+                    personal = True  # "call me crazy": not a name, let the agent answer
+                    continue
+                return Intent(
+                    template=template,
+                    value=value.strip() if value else None,
+                    chitchat=template in ("greeting", "identity"),
+                    personal=template in ("name", "email", "recall_name"),
+                )
+            if kind == "chitchat":
+                chitchat = len(text) < CHITCHAT_MAX_LEN
+            elif kind == "personal":
+                personal = True
+            elif kind == "doc":
+                doc = True
+        return Intent(chitchat=chitchat, personal=personal, doc_keyword=doc)
+
+    def route(self, text: str, has_doc: bool, profile: Optional[dict] = None) -> str:
+        """START edge: instant template reply, forced document lookup, or the agent."""
+        intent = self.classify(text)
+        if intent.template and (intent.template != "recall_name" or (profile or {}).get("name")):
+            return INSTANT
+        if has_doc and intent.doc_keyword:
+            return FAST_DOC
+        return AGENT
+
+
+# Shared default (patterns never change at runtime)
+default_router = IntentRouter()
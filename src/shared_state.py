@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("vera_shared_state")
+
+# --- CONFIG ---
+# uvicorn --workers defaults to $WEB_CONCURRENCY; more than one worker
+# turns shared mode on unless VERA_SHARED_STATE says otherwise
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1") or "1")
+SHARED_STATE = os.getenv("VERA_SHARED_STATE", "1" if WORKERS > 1 else "0").lower() in ("1", "true", "on")
+# One SQLite file (WAL) for the budget wallet, document catalog and upload jobs
+SHARED_DB = os.getenv("VERA_SHARED_DB", os.path.join("data", "vera_shared.sqlite"))
+# Finished upload jobs older than this are dropped from the job board
+JOB_TTL_S = float(os.getenv("VERA_SHARED_JOB_TTL", "86400"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS budget_usage (
+    tenant TEXT NOT NULL, span TEXT NOT NULL, bucket REAL NOT NULL, tokens INTEGER NOT NULL,
+    PRIMARY KEY (tenant, span, bucket)
+);
+CREATE INDEX IF NOT EXISTS budget_usage_bucket ON budget_usage (bucket);
+CREATE TABLE IF NOT EXISTS budget_reservations (
+    rid INTEGER PRIMARY KEY AUTOINCREMENT, tenant TEXT NOT NULL, tokens INTEGER NOT NULL, expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS budget_reservations_tenant ON budget_reservations (tenant);
+CREATE TABLE IF NOT EXISTS budget_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS documents (
+    scope TEXT NOT NULL, doc_id TEXT NOT NULL, filename TEXT, added_at REAL,
+    PRIMARY KEY (scope, doc_id)
+);
+CREATE TABLE IF NOT EXISTS scopes (scope TEXT PRIMARY KEY, version INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, status TEXT, updated_at REAL, data TEXT);
+"""
+
+
+class SharedStore:
+    """
+    The SQLite database every worker process on the node shares.
+
+    WAL mode, so readers never wait on the writer; a busy timeout covers
+    the moments two workers write at once. Connections are per OS thread
+    (sqlite3 objects must not be shared across threads mid-transaction).
+    """
+
+    def __init__(self, path: str = SHARED_DB):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self.connection().executescript(SCHEMA)
+        logger.info(f"🤝 Shared state at {path}")
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        """BEGIN IMMEDIATE takes the write lock up front: check-then-write stays atomic across processes."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class DocumentCatalog:
+    """
+    Which documents each scope (thread_id or the global scope) holds, for
+    every worker. The vectors themselves live in the content-addressed
+    index store on disk, so a worker that sees a new row loads the stored
+    index (memory-mapped, then copied into its own RAM) instead of
+    re-embedding. Each scope carries a version bumped on every change,
+    which makes "anything new?" one primary-key read.
+    """
+
+    def __init__(self, store: SharedStore):
+        self.store = store
+
+    def _bump(self, conn, scope: str):
+        conn.execute("INSERT INTO scopes VALUES (?, 1) ON CONFLICT(scope) DO UPDATE SET version = version + 1",
+                     (scope,))
+
+    def add(self, scope: str, doc_id: str, filename: Optional[str] = None) -> bool:
+        with self.store.transaction(immediate=True) as conn:
+            added = conn.execute("INSERT OR IGNORE INTO documents VALUES (?, ?, ?, ?)",
+                                 (scope, doc_id, filename, time.time())).rowcount > 0
+            if added:
+                self._bump(conn, scope)
+        return added
+
+    def remove(self, scope: str, doc_id: str) -> bool:
+        with self.store.transaction(immediate=True) as conn:
+            removed = conn.execute("DELETE FROM documents WHERE scope = ? AND doc_id = ?", (scope, doc_id)).rowcount > 0
+            if removed:
+                self._bump(conn, scope)
+        return removed
+
+    def versions(self, scopes: Iterable[str]) -> Dict[str, int]:
+        scopes = list(scopes)
+        rows = self.store.connection().execute(
+            f"SELECT scope, version FROM scopes WHERE scope IN ({','.join('?' * len(scopes))})", scopes).fetchall()
+        found = dict(rows)
+        return {scope: found.get(scope, 0) for scope in scopes}
+
+    def documents(self, scope: str) -> List[Tuple[str, Optional[str]]]:
+        """(doc_id, filename) in upload order."""
+        return self.store.connection().execute(
+            "SELECT doc_id, filename FROM documents WHERE scope = ? ORDER BY added_at", (scope,)).fetchall()
+
+
+class JobBoard:
+    """Upload job status, so a poll can land on any worker, not just the one ingesting."""
+
+    def __init__(self, store: SharedStore, ttl: float = JOB_TTL_S):
+        self.store = store
+        self.ttl = ttl
+
+    def publish(self, job: Dict[str, Any]):
+        now = time.time()
+        conn = self.store.connection()
+        conn.execute("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)",
+                     (job["job_id"], job["status"], now, json.dumps(job, default=str)))
+        if job["status"] in ("done", "failed"):
+            conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (now - self.ttl,))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self.store.connection().execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+# --- SINGLETON (only built in shared mode) ---
+_STORE: Optional[SharedStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_shared_store() -> Optional[SharedStore]:
+    """The node-wide store when VERA_SHARED_STATE is on, else None (single-process mode)."""
+    global _STORE
+    if not SHARED_STATE:
+        return None
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = SharedStore()
+    return _STORE
@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Dict
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from metrics import TTFT_SECONDS
+
+logger = logging.getLogger("vera_streaming")
+
+# --- CONFIG ---
+# Idle seconds before a heartbeat event keeps proxies/clients from timing out
+STREAM_HEARTBEAT_S = float(os.getenv("VERA_STREAM_HEARTBEAT_S", "15"))
+# Nodes whose model output is the answer (tool-call planning chunks carry no content)
+ANSWER_NODES = {"agent", "instant_reply"}
+
+_END = object()
+
+
+def sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class StreamStats:
+    """Time-to-first-token and tokens/sec over recent streamed turns."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._ttft = deque(maxlen=window)
+        self._rates = deque(maxlen=window)
+        self.streams = 0
+        self.completed = 0
+        self.errors = 0
+        self.disconnects = 0
+        self.tokens = 0
+
+    def record(self, outcome: str, ttft: float = None, tokens: int = 0, tokens_per_s: float = None):
+        if ttft is not None:
+            TTFT_SECONDS.observe(ttft)
+        with self._lock:
+            self.streams += 1
+            self.tokens += tokens
+            if outcome == "done":
+                self.completed += 1
+            elif outcome == "error":
+                self.errors += 1
+            else:
+                self.disconnects += 1
+            if ttft is not None:
+                self._ttft.append(ttft)
+            if tokens_per_s is not None:
+                self._rates.append(tokens_per_s)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            ttft = sorted(self._ttft)
+            rates = list(self._rates)
+            return {
+                "streams": self.streams,
+                "completed": self.completed,
+                "errors": self.errors,
+                "disconnects": self.disconnects,
+                "tokens": self.tokens,
+                "ttft_ms_p50": round(ttft[len(ttft) // 2] * 1000, 1) if ttft else 0.0,
+                "ttft_ms_p95": round(ttft[max(0, int(len(ttft) * 0.95) - 1)] * 1000, 1) if ttft else 0.0,
+                "tokens_per_s_avg": round(sum(rates) / len(rates), 1) if rates else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.__init__(self._ttft.maxlen)
+
+
+class _TurnTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first = None
+        self.last = None
+        self.tokens = 0
+
+    def token(self):
+        now = time.perf_counter()
+        if self.first is None:
+            self.first = now
+        self.last = now
+        self.tokens += 1
+
+    @property
+    def ttft(self):
+        return None if self.first is None else self.first - self.started
+
+    @property
+    def tokens_per_s(self):
+        # Decode rate after the first token; single-chunk answers have none
+        if self.tokens < 2 or self.last <= self.first:
+            return None
+        return (self.tokens - 1) / (self.last - self.first)
+
+    def summary(self) -> Dict[str, Any]:
+        rate = self.tokens_per_s
+        return {
+            "ttft_ms": None if self.ttft is None else round(self.ttft * 1000, 1),
+            "tokens": self.tokens,
+            "tokens_per_s": None if rate is None else round(rate, 1),
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 1),
+        }
+
+
+def _events(mode: str, payload) -> list:
+    """Maps one (mode, payload) item from graph.astream to SSE events."""
+    if mode == "messages":
+        message, metadata = payload
+        if isinstance(message, (AIMessageChunk, AIMessage)) and message.content \
+                and metadata.get("langgraph_node") in ANSWER_NODES:
+            return [("token", {"token": message.content})]
+        return []
+
+    events = []
+    for node, update in (payload or {}).items():
+        for message in (update or {}).get("messages", []) if isinstance(update, dict) else []:
+            if isinstance(message, AIMessage):
+                events += [("tool_start", {"name": c["name"], "id": c["id"], "args": c["args"]})
+                           for c in message.tool_calls]
+            elif isinstance(message, ToolMessage):
+                events.append(("tool_end", {"name": message.name, "id": message.tool_call_id,
+                                            "status": message.status}))
+    return events
+
+
+async def stream_turn(graph, inputs: Dict[str, Any], config: Dict[str, Any],
+                      heartbeat: float = STREAM_HEARTBEAT_S, stats: StreamStats = None) -> AsyncIterator[str]:
+    """
+    Runs one turn with graph.astream(stream_mode=["messages", "updates"]) and
+    yields typed SSE events: thread, tool_start, tool_end, token, heartbeat,
+    then done (or error).
+
+    Unlike astream_events, only message chunks and node updates are produced,
+    not an event per callback of every runnable. The graph is pumped by one
+    task into a queue so heartbeats can be sent while a node is still busy.
+    """
+    stats = stats or stream_stats
+    timer = _TurnTimer()
+    outcome = "disconnect"
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for item in graph.astream(inputs, config, stream_mode=["messages", "updates"]):
+                queue.put_nowait(item)
+            queue.put_nowait(_END)
+        except Exception as e:
+            queue.put_nowait(e)
+
+    task = asyncio.create_task(pump())
+    try:
+        yield sse("thread", {"thread_id": config["configurable"]["thread_id"]})
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield sse("heartbeat", {"elapsed_ms": round((time.perf_counter() - timer.started) * 1000, 1)})
+                continue
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                outcome = "error"
+                logger.error(f"❌ Stream failed: {item}")
+                yield sse("error", {"detail": str(item)})
+                return
+            for event, data in _events(*item):
+                if event == "token":
+                    timer.token()
+                yield sse(event, data)
+        outcome = "done"
+        yield sse("done", {"thread_id": config["configurable"]["thread_id"], **timer.summary()})
+    finally:
+        task.cancel()
+        stats.record(outcome, timer.ttft, timer.tokens, timer.tokens_per_s)
+
+
+# Singleton Instance
+stream_stats = StreamStats()
@@ -0,0 +1,154 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import patch_config
+from langchain_core.tools import BaseTool, ToolException
+
+from metrics import span, TOOL_SECONDS
+
+logger = logging.getLogger("vera_tools")
+
+# --- CONFIG ---
+# Per-call deadlines: a slow search can't hold the turn (or a fast lookup) hostage
+WEB_TOOL_TIMEOUT = float(os.getenv("VERA_WEB_TOOL_TIMEOUT", "10"))
+DOC_TOOL_TIMEOUT = float(os.getenv("VERA_DOC_TOOL_TIMEOUT", "5"))
+# Separate pools: I/O-bound web searches get many threads, CPU-bound FAISS
+# lookups a few, and neither competes with the loop's default executor
+WEB_TOOL_WORKERS = int(os.getenv("VERA_WEB_TOOL_WORKERS", "64"))
+DOC_TOOL_WORKERS = int(os.getenv("VERA_DOC_TOOL_WORKERS", str(max(2, os.cpu_count() or 1))))
+
+_POOLS: Dict[str, ThreadPoolExecutor] = {}
+_POOLS_LOCK = threading.Lock()
+_POOL_SIZES = {"web": WEB_TOOL_WORKERS, "doc": DOC_TOOL_WORKERS}
+
+
+def tool_pool(kind: str) -> ThreadPoolExecutor:
+    with _POOLS_LOCK:
+        pool = _POOLS.get(kind)
+        if pool is None:
+            pool = _POOLS[kind] = ThreadPoolExecutor(_POOL_SIZES.get(kind, 4), thread_name_prefix=f"vera-tool-{kind}")
+        return pool
+
+
+def shutdown_tool_pools():
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _POOLS.clear()
+
+
+class ToolStats:
+    """Per-tool calls, time spent, timeouts and errors."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, seconds: float, outcome: str = "ok"):
+        TOOL_SECONDS.observe(seconds, name, outcome)
+        with self._lock:
+            entry = self._tools.setdefault(name, {"calls": 0, "seconds": 0.0, "timeouts": 0, "errors": 0})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            if outcome == "timeout":
+                entry["timeouts"] += 1
+            elif outcome == "error":
+                entry["errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                name: {
+                    "calls": e["calls"],
+                    "avg_ms": round(e["seconds"] / e["calls"] * 1000, 1) if e["calls"] else 0.0,
+                    "timeouts": e["timeouts"],
+                    "errors": e["errors"],
+                }
+                for name, e in self._tools.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._tools.clear()
+
+
+class TimedTool(BaseTool):
+    """
+    Drop-in wrapper (same name and schema) that runs a blocking tool on a
+    dedicated thread pool with a deadline. ToolNode already fans a turn's
+    tool calls out concurrently; this keeps each one off the event loop and
+    bounded, so turn latency is max(tool) capped at the timeout. A timed-out
+    call becomes an error ToolMessage the model can answer around.
+    """
+
+    inner: BaseTool
+    timeout: float = 10.0
+    pool_kind: str = "web"
+
+    def __init__(self, inner: BaseTool, timeout: float, pool_kind: str):
+        super().__init__(
+            name=inner.name,
+            description=inner.description,
+            args_schema=inner.args_schema,
+            handle_tool_error=True,
+            inner=inner,
+            timeout=timeout,
+            pool_kind=pool_kind,
+        )
+
+    def _call(self, kwargs: Dict[str, Any], config: RunnableConfig, run_manager) -> Any:
+        child = patch_config(config, callbacks=run_manager.get_child()) if run_manager else config
+        with span(f"tool.{self.name}", pool=self.pool_kind):
+            return self.inner.invoke(kwargs, child)
+
+    def _timed_out(self, started: float):
+        tool_stats.record(self.name, time.perf_counter() - started, "timeout")
+        logger.warning(f"⏱️ Tool '{self.name}' timed out after {self.timeout:g}s")
+        raise ToolException(f"Error: {self.name} timed out after {self.timeout:g}s.")
+
+    def _run(self, config: RunnableConfig, run_manager=None, **kwargs) -> Any:
+        started = time.perf_counter()
+        ctx = contextvars.copy_context()
+        future = tool_pool(self.pool_kind).submit(ctx.run, self._call, kwargs, config, run_manager)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._timed_out(started)
+        except Exception:
+            tool_stats.record(self.name, time.perf_counter() - started, "error")
+            raise
+        tool_stats.record(self.name, time.perf_counter() - started)
+        return result
+
+    async def _arun(self, config: RunnableConfig, run_manager=None, **kwargs) -> Any:
+        started = time.perf_counter()
+        ctx = contextvars.copy_context()
+        # Sync callbacks for the worker thread: the async manager belongs to the loop
+        sync_manager = run_manager.get_sync() if run_manager else None
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(tool_pool(self.pool_kind), ctx.run, self._call, kwargs, config, sync_manager)
+        try:
+            result = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self._timed_out(started)
+        except Exception:
+            tool_stats.record(self.name, time.perf_counter() - started, "error")
+            raise
+        tool_stats.record(self.name, time.perf_counter() - started)
+        return result
+
+
+def timed(tool: BaseTool, timeout: Optional[float] = None, pool_kind: str = "web") -> TimedTool:
+    default = DOC_TOOL_TIMEOUT if pool_kind == "doc" else WEB_TOOL_TIMEOUT
+    return TimedTool(tool, timeout if timeout is not None else default, pool_kind)
+
+
+# Singleton Instance
+tool_stats = ToolStats()
@@ -0,0 +1,132 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("vera_warmup")
+
+# --- CONFIG ---
+# "background": the API listens right away and warms up on a thread (/ready
+# flips to 200 when done); "blocking": the lifespan waits, as before
+WARMUP_MODE = os.getenv("VERA_WARMUP", "background").lower()
+# Longest a chat turn waits for the graph before getting 503 + Retry-After
+READY_WAIT_S = float(os.getenv("VERA_READY_WAIT_S", "60"))
+
+
+class _Step:
+    __slots__ = ("name", "fn", "state", "seconds", "error", "done")
+
+    def __init__(self, name: str, fn: Callable[[], Any]):
+        self.name = name
+        self.fn = fn
+        self.state = "pending"  # pending -> running -> ready | failed
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+
+class WarmUp:
+    """
+    Start-up work that shouldn't keep the server from listening.
+
+    Steps (checkpointer, graph, embedder, ingestion imports...) run in
+    order on one daemon thread, so /health answers as soon as uvicorn is
+    up. Requests that need a step await it (wait()); /ready reports 200
+    only once every step has finished. A failed step is recorded and the
+    rest still run: a broken embedder shouldn't keep chat down.
+    """
+
+    def __init__(self):
+        self._steps: List[_Step] = []
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def add(self, name: str, fn: Callable[[], Any]) -> "WarmUp":
+        with self._lock:
+            if self.started_at is not None:
+                raise RuntimeError("warm-up already started")
+            self._steps = [s for s in self._steps if s.name != name] + [_Step(name, fn)]
+        return self
+
+    def _get(self, name: str) -> Optional[_Step]:
+        return next((s for s in self._steps if s.name == name), None)
+
+    def run(self):
+        """Runs every pending step on the calling thread."""
+        for step in self._steps:
+            if step.state != "pending":
+                continue
+            step.state = "running"
+            start = time.perf_counter()
+            try:
+                step.fn()
+                step.state = "ready"
+            except Exception as e:
+                step.state, step.error = "failed", f"{type(e).__name__}: {e}"
+                logger.error(f"❌ Warm-up step '{step.name}' failed: {step.error}")
+            finally:
+                step.seconds = time.perf_counter() - start
+                step.done.set()
+            if step.state == "ready":
+                logger.info(f"✅ Warm-up '{step.name}' done in {step.seconds:.2f}s")
+        self.finished_at = time.monotonic()
+
+    def start(self, blocking: bool = False):
+        with self._lock:
+            if self.started_at is not None:
+                return
+            self.started_at = time.monotonic()
+        if blocking:
+            self.run()
+        else:
+            self._thread = threading.Thread(target=self.run, name="vera-warmup", daemon=True)
+            self._thread.start()
+
+    @property
+    def started(self) -> bool:
+        return self.started_at is not None
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._steps) and all(s.state == "ready" for s in self._steps)
+
+    @property
+    def failed(self) -> bool:
+        return any(s.state == "failed" for s in self._steps)
+
+    def is_ready(self, name: str) -> bool:
+        step = self._get(name)
+        return step is not None and step.state == "ready"
+
+    async def wait(self, name: str, timeout: float = READY_WAIT_S) -> bool:
+        """True once `name` is ready; False on timeout, failure, or if warm-up never started."""
+        step = self._get(name)
+        if step is None or not self.started:
+            return False
+        # Polls rather than parking an executor thread per waiting request
+        deadline = time.monotonic() + timeout
+        while not step.done.is_set() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        return step.state == "ready"
+
+    def stats(self) -> Dict[str, Any]:
+        status = "ready" if self.ready else "failed" if self.failed else "warming" if self.started else "idle"
+        return {
+            "status": status,
+            "ready": self.ready,
+            "seconds_to_ready": (round(self.finished_at - self.started_at, 3)
+                                 if self.ready and self.finished_at else None),
+            "steps": {
+                s.name: {"state": s.state, "seconds": None if s.seconds is None else round(s.seconds, 3),
+                         **({"error": s.error} if s.error else {})}
+                for s in self._steps
+            },
+        }
+
+
+# Singleton Instance
+warmup = WarmUp()
@@ -0,0 +1,81 @@
+import os
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from langchain_core.tools import BaseTool
+
+from cache import TTLCache, SingleFlight, normalize_query
+
+logger = logging.getLogger("vera_web_search")
+
+# --- CONFIG ---
+WEB_CACHE_SIZE = int(os.getenv("VERA_WEB_CACHE_SIZE", "512"))
+WEB_CACHE_TTL = float(os.getenv("VERA_WEB_CACHE_TTL", "300"))
+# Followers give up on a stuck leader after this long
+WEB_COALESCE_TIMEOUT = float(os.getenv("VERA_WEB_COALESCE_TIMEOUT", "30"))
+
+# Shared by every graph in the process, so all threads benefit
+web_cache = TTLCache(WEB_CACHE_SIZE, WEB_CACHE_TTL)
+web_flights = SingleFlight()
+
+_SIMPLE = (str, int, float, bool, type(None), list, tuple)
+
+
+def _tool_params(tool: BaseTool) -> Dict[str, Any]:
+    """Construction-time search settings (max_results, topic, ...) that shape the results."""
+    return {
+        name: getattr(tool, name)
+        for name in type(tool).model_fields
+        if name not in BaseTool.model_fields and isinstance(getattr(tool, name, None), _SIMPLE)
+    }
+
+
+class CachedSearchTool(BaseTool):
+    """
+    Drop-in wrapper for a web search tool (same name and schema, so the LLM
+    binding is unchanged). Results are cached per normalized query + search
+    parameters, and concurrent identical searches share one upstream call.
+    """
+
+    inner: BaseTool
+    cache: Any = None
+    flights: Any = None
+    params_key: str = ""
+
+    def __init__(self, inner: BaseTool, cache: Optional[TTLCache] = None,
+                 flights: Optional[SingleFlight] = None):
+        super().__init__(
+            name=inner.name,
+            description=inner.description,
+            args_schema=inner.args_schema,
+            handle_tool_error=inner.handle_tool_error,
+            inner=inner,
+            cache=cache if cache is not None else web_cache,
+            flights=flights if flights is not None else web_flights,
+            params_key=json.dumps(_tool_params(inner), sort_keys=True, default=str),
+        )
+
+    def _key(self, kwargs: Dict[str, Any]) -> tuple:
+        args = {k: v for k, v in kwargs.items() if v is not None}
+        query = normalize_query(str(args.pop("query", "")))
+        return (self.name, self.params_key, query, json.dumps(args, sort_keys=True, default=str))
+
+    def _run(self, **kwargs) -> Any:
+        key = self._key(kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        def search():
+            result = self.inner.invoke(kwargs)
+            # Upstream failures come back as {"error": ...}; never cache those
+            if not (isinstance(result, dict) and "error" in result):
+                self.cache.set(key, result)
+            return result
+
+        return self.flights.do(key, search, timeout=WEB_COALESCE_TIMEOUT)
+
+
+def web_search_stats() -> Dict[str, Any]:
+    return {**web_cache.stats(), "coalesced": web_flights.coalesced, "in_flight": web_flights.in_flight}
@@ -0,0 +1,44 @@
+import re
+import time
+import zlib
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+
+
+class KeywordEmbeddings(Embeddings):
+    """
+    Offline stand-in for MiniLM: hashed bag-of-words, L2-normalised.
+    Texts sharing words land close together, which is all the RAG tests need.
+    The benchmarks use it too: `ms_per_text` sleeps to mimic model cost;
+    sleeping releases the GIL the same way a torch forward pass does, so
+    overlap measurements stay honest.
+    """
+
+    def __init__(self, size=64, ms_per_text=0.0):
+        self.size = size
+        self.ms_per_text = ms_per_text
+        self.calls = 0
+
+    def _embed(self, text):
+        vector = [0.0] * self.size
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode()) % self.size] += 1.0
+        norm = sum(v * v for v in vector) ** 0.5 or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.ms_per_text:
+            time.sleep(self.ms_per_text * len(texts) / 1000)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class ScriptedModel(GenericFakeChatModel):
+    """Plays back canned messages (tool calls included); tools are ignored."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+import asyncio
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from admission import AdmissionController, AdmissionRejected
+
+
+class TestAdmissionController(unittest.TestCase):
+
+    def test_bounds_concurrency(self):
+        print("\n🧪 Testing admission concurrency bound...")
+        ctl = AdmissionController(max_active=3, max_queue=50, target_wait=5)
+        peak = 0
+
+        async def turn(i):
+            nonlocal peak
+            async with ctl.admit(f"t{i}"):
+                peak = max(peak, ctl.active)
+                await asyncio.sleep(0.02)
+
+        async def main():
+            await asyncio.gather(*(turn(i) for i in range(12)))
+
+        asyncio.run(main())
+        self.assertEqual(peak, 3)
+        stats = ctl.stats()
+        self.assertEqual(stats["admitted"], 12)
+        self.assertEqual(stats["active"], 0)
+        self.assertEqual(stats["queued"], 0)
+        self.assertGreater(stats["wait_ms_p95"], 0)
+        self.assertEqual(ctl._threads, {})
+
+    def test_same_thread_serialized(self):
+        print("🧪 Testing per-thread serialization...")
+        ctl = AdmissionController(max_active=8, max_queue=50, target_wait=5)
+        running, overlaps = 0, 0
+
+        async def turn():
+            nonlocal running, overlaps
+            async with ctl.admit("same"):
+                running += 1
+                overlaps = max(overlaps, running)
+                await asyncio.sleep(0.02)
+                running -= 1
+
+        async def main():
+            # Third concurrent turn on one thread is refused
+            tasks = [asyncio.create_task(turn()) for _ in range(2)]
+            await asyncio.sleep(0.005)
+            with self.assertRaises(AdmissionRejected) as cm:
+                await turn()
+            self.assertEqual(cm.exception.status_code, 429)
+            self.assertGreaterEqual(cm.exception.retry_after, 1)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(main())
+        self.assertEqual(overlaps, 1)
+        self.assertEqual(ctl.rejected["thread_busy"], 1)
+
+    def test_sheds_when_queue_full_or_wait_too_long(self):
+        print("🧪 Testing fast 503 rejection...")
+        ctl = AdmissionController(max_active=1, max_queue=1, target_wait=0.1)
+        ctl.service_ewma = 0.01  # recent turns were quick: predicted waits stay under target
+
+        async def hold(thread, seconds):
+            async with ctl.admit(thread):
+                await asyncio.sleep(seconds)
+
+        async def main():
+            busy = asyncio.create_task(hold("a", 0.3))
+            await asyncio.sleep(0.01)
+            queued = asyncio.create_task(hold("b", 0))
+            await asyncio.sleep(0.01)
+            with self.assertRaises(AdmissionRejected) as cm:
+                await hold("c", 0)
+            self.assertEqual(cm.exception.status_code, 503)
+            # The queued turn gives up once it has waited past the target
+            with self.assertRaises(AdmissionRejected):
+                await queued
+            await busy
+
+            # A slow service history makes the predicted wait exceed the target
+            ctl.max_queue = 10
+            ctl.service_ewma = 10.0
+            busy = asyncio.create_task(hold("a", 0.05))
+            await asyncio.sleep(0.01)
+            with self.assertRaises(AdmissionRejected) as cm:
+                await hold("d", 0)
+            self.assertGreaterEqual(cm.exception.retry_after, 10)
+            await busy
+
+        asyncio.run(main())
+        self.assertEqual(ctl.rejected["queue_full"], 1)
+        self.assertEqual(ctl.rejected["wait_timeout"], 1)
+        self.assertEqual(ctl.rejected["overloaded"], 1)
+        self.assertEqual(ctl.active, 0)
+        self.assertEqual(ctl.queued, 0)
+        self.assertEqual(ctl._threads, {})
+
+    def test_release_is_idempotent(self):
+        ctl = AdmissionController(max_active=1, max_queue=4, target_wait=1)
+
+        async def main():
+            ticket = await ctl.acquire("s")
+            ticket.release()
+            ticket.release()
+            async with ctl.admit("s"):
+                self.assertEqual(ctl.active, 1)
+
+        asyncio.run(main())
+        self.assertEqual(ctl.active, 0)
+        print("✅ Admission control passed.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import threading
+from unittest.mock import patch
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import budget
+from budget import BudgetManager, SlidingWindow, get_tenant_id
+
+
+class TestBudgetManager(unittest.TestCase):
+
+    def test_reservations_stop_concurrent_overshoot(self):
+        print("\n🧪 Testing concurrent budget reservations...")
+        manager = BudgetManager(max_daily_tokens=1000)
+        granted = []
+        barrier = threading.Barrier(20)
+
+        def request():
+            barrier.wait()
+            reservation = manager.check_budget("t1", estimate=100)
+            if reservation:
+                granted.append(reservation)
+
+        threads = [threading.Thread(target=request) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(granted), 10)
+        for reservation in granted:
+            manager.update_cost({"token_usage": {"total_tokens": 100}}, reservation=reservation)
+        self.assertEqual(manager.used, 1000)
+        self.assertIsNone(manager.check_budget("t2", estimate=1))
+
+    def test_per_tenant_limits(self):
+        manager = BudgetManager(max_daily_tokens=0, tenant_daily=300)
+        r = manager.check_budget("alice", estimate=200)
+        r.commit(250)
+        self.assertIsNone(manager.check_budget("alice", estimate=100))
+        self.assertTrue(manager.check_budget("bob", estimate=100))
+        self.assertEqual(manager.tenant_usage("alice")["day"], 250)
+
+    def test_global_refusal_rolls_back_tenant_hold(self):
+        manager = BudgetManager(max_daily_tokens=100, tenant_daily=500)
+        manager.check_budget("alice", estimate=100)
+        self.assertIsNone(manager.check_budget("bob", estimate=50))  # tenant fits, wallet doesn't
+        self.assertEqual(manager.tenant_usage("bob")["reserved"], 0)
+        self.assertEqual(manager.stats()["rejected"], 1)
+
+    def test_shard_lock_not_held_during_wallet_check(self):
+        manager = BudgetManager(max_daily_tokens=1000)
+        shard_lock, _ = manager._shard("alice")
+        with manager._global_lock:
+            # Another request stuck on the wallet must not block this tenant's shard
+            waiting = threading.Thread(target=manager.check_budget, args=("alice", 10))
+            waiting.start()
+            waiting.join(0.2)
+            self.assertTrue(shard_lock.acquire(timeout=1))
+            shard_lock.release()
+        waiting.join()
+        self.assertEqual(manager.stats()["reserved"], 10)
+
+    def test_missing_metadata_is_estimated(self):
+        manager = BudgetManager()
+        manager.update_cost({}, reservation=manager.check_budget("t", 50), fallback_tokens=42)
+        self.assertEqual(manager.used, 42)
+        self.assertEqual(manager.stats()["estimated"], 1)
+
+    def test_released_and_expired_reservations_free_budget(self):
+        manager = BudgetManager(max_daily_tokens=100)
+        reservation = manager.check_budget("t", 100)
+        self.assertIsNone(manager.check_budget("t", 1))
+        reservation.release()
+        self.assertTrue(manager.check_budget("t", 100))  # leaked on purpose
+        with patch.object(budget.time, "time", return_value=budget.time.time() + budget.BUDGET_RESERVATION_TTL + 1):
+            self.assertTrue(manager.check_budget("t", 100))
+
+    def test_windows_slide(self):
+        window = SlidingWindow(60, 12)
+        window.add(10, now=1000.0)
+        window.add(5, now=1030.0)
+        self.assertEqual(window.total(1050.0), 15)
+        self.assertEqual(window.total(1066.0), 5)
+        self.assertEqual(window.total(1100.0), 0)
+
+    def test_tenant_resolution(self):
+        self.assertEqual(get_tenant_id({"configurable": {"thread_id": "t", "user_id": "u"}}), "u")
+        self.assertEqual(get_tenant_id({"configurable": {"thread_id": "t", "user_id": None}}), "t")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+import sys
+import os
+import asyncio
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from typing import Annotated
+from typing_extensions import TypedDict
+from langchain_core.messages import HumanMessage, AIMessage
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+
+from checkpointer import SQLiteCheckpointer
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def echo_graph(saver):
+    builder = StateGraph(State)
+    builder.add_node("echo", lambda s: {"messages": [AIMessage(content=f"echo: {s['messages'][-1].content}")]})
+    builder.add_edge(START, "echo")
+    builder.add_edge("echo", END)
+    return builder.compile(checkpointer=saver)
+
+
+class TestSQLiteCheckpointer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "checkpoints.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _saver(self, **kwargs):
+        saver = SQLiteCheckpointer(path=self.path, flush_ms=5, **kwargs)
+        self.addCleanup(saver.close)
+        return saver
+
+    def _say(self, graph, thread, text):
+        return graph.invoke({"messages": [HumanMessage(content=text)]}, {"configurable": {"thread_id": thread}})
+
+    def test_threads_survive_restart(self):
+        print("\n🧪 Testing durable SQLite checkpointer...")
+        saver = self._saver()
+        graph = echo_graph(saver)
+        self._say(graph, "t1", "hello")
+        self._say(graph, "t1", "again")
+        saver.close()
+
+        graph = echo_graph(self._saver())
+        result = self._say(graph, "t1", "still there?")
+        self.assertEqual(len(result["messages"]), 6)
+
+        mode = sqlite3.connect(self.path).execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_keeps_latest_checkpoints_only(self):
+        saver = self._saver(keep=2)
+        graph = echo_graph(saver)
+        for i in range(5):
+            self._say(graph, "t1", f"turn {i}")
+        saver.flush()
+        config = {"configurable": {"thread_id": "t1"}}
+        self.assertEqual(len(list(graph.get_state_history(config))), 2)
+        count = sqlite3.connect(self.path).execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+        self.assertEqual(count, 2)
+        self.assertEqual(len(graph.get_state(config).values["messages"]), 10)
+
+    def test_idle_threads_evicted_and_reloaded(self):
+        saver = self._saver(idle_ttl=0)
+        graph = echo_graph(saver)
+        self._say(graph, "t1", "hello")
+        self._say(graph, "t2", "hello")
+        saver.evict_idle()
+        self.assertEqual(saver.stats()["resident_threads"], 0)
+
+        result = self._say(graph, "t1", "back")
+        self.assertEqual(len(result["messages"]), 4)
+        self.assertEqual(saver.stats()["resident_threads"], 1)
+
+    def test_async_and_delete(self):
+        saver = self._saver()
+        graph = echo_graph(saver)
+        config = {"configurable": {"thread_id": "a1"}}
+
+        async def turn():
+            return await graph.ainvoke({"messages": [HumanMessage(content="hi")]}, config)
+
+        self.assertEqual(len(asyncio.run(turn())["messages"]), 2)
+        saver.delete_thread("a1")
+        self.assertEqual(len(asyncio.run(turn())["messages"]), 2)
+
+    def test_failed_batches_retry_then_degrade(self):
+        print("\n🧪 Testing checkpoint commit retries and degraded mode...")
+        saver = self._saver(retries=1, retry_ms=1, degraded_after=2)
+        graph = echo_graph(saver)
+        write = saver._write
+        failures = [sqlite3.OperationalError("disk I/O error")]
+
+        def flaky(batch):
+            if failures:
+                raise failures.pop()
+            return write(batch)
+
+        with patch.object(saver, "_write", side_effect=flaky):
+            self._say(graph, "t1", "hello")
+            saver.flush()
+        self.assertEqual(saver.stats()["retried_commits"], 1)
+        self.assertEqual(saver.stats()["failed_commits"], 0)
+        self.assertEqual(len(echo_graph(self._saver()).get_state({"configurable": {"thread_id": "t1"}})
+                             .values["messages"]), 2)  # the retry reached disk
+
+        with patch.object(saver, "_write", side_effect=sqlite3.OperationalError("disk full")):
+            self._say(graph, "t2", "one")
+            saver.flush()
+            self.assertFalse(saver.degraded)
+            self._say(graph, "t2", "two")
+            saver.flush()
+        stats = saver.stats()
+        self.assertTrue(stats["degraded"])
+        self.assertGreaterEqual(stats["failed_commits"], 2)
+        self.assertIn("disk full", stats["last_error"])
+
+        self._say(graph, "t3", "back")
+        saver.flush()
+        self.assertFalse(saver.degraded)  # one good batch clears it
+        print(f"✅ Retried once, degraded after {stats['failed_commits']} lost batches, recovered.")
+
+    def test_lost_batch_keeps_thread_in_ram(self):
+        saver = self._saver(retries=0, idle_ttl=0)
+        graph = echo_graph(saver)
+        with patch.object(saver, "_write", side_effect=sqlite3.OperationalError("disk I/O error")):
+            self._say(graph, "t1", "hello")
+            saver.flush()
+        saver._sweep()  # t1 is idle, but its turn exists only in RAM
+
+        state = graph.get_state({"configurable": {"thread_id": "t1"}})
+        self.assertEqual(len(state.values["messages"]), 2)
+        stats = saver.stats()
+        self.assertEqual(stats["resident_threads"], 1)
+        self.assertGreater(stats["failed_ops"], 0)
+        self.assertEqual(stats["pending_ops"], stats["failed_ops"])
+        self.assertEqual(stats["avg_batch"], 0.0)  # nothing counted as committed
+
+
+if __name__ == '__main__':
+    unittest.main()
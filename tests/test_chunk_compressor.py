@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from chunk_compressor import ChunkCompressor, overlap
+from context_window import count_tokens
+
+RESUME = " ".join(
+    f"Sentence {i}: the candidate delivered project {i} with Python, Docker and Kubernetes." for i in range(200)
+)
+
+
+def chunks(text, source="resume"):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=60)
+    return [Document(page_content=c, metadata={"doc_id": source}) for c in splitter.split_text(text)]
+
+
+class TestChunkCompressor(unittest.TestCase):
+
+    def test_overlap(self):
+        self.assertEqual(overlap("alpha beta gamma delta epsilon zeta eta theta iota kappa lambda", "gamma delta epsilon zeta eta theta iota kappa lambda mu nu"), 52)
+        self.assertEqual(overlap("alpha beta gamma delta epsilon zeta eta theta iota kappa lambda", "zeta eta theta iota kappa lambda mu nu xi omicron pi rho"), 0)
+
+    def test_merges_overlapping_neighbours(self):
+        print("\n🧪 Testing chunk merge + dedupe...")
+        parts = chunks(RESUME)
+        compressor = ChunkCompressor(budget=10_000)
+        # Retrieval order is by relevance, not position
+        hits = [parts[3], parts[2], parts[4]]
+        context = compressor.compress(hits)
+
+        self.assertEqual(context.count("\n\n"), 0)  # one merged passage
+        self.assertIn(parts[2].page_content, context)
+        self.assertIn(parts[4].page_content, context)
+        raw = sum(count_tokens(d.page_content) for d in hits)
+        self.assertLess(count_tokens(context), raw)
+        self.assertEqual(compressor.stats()["merged"], 2)
+
+    def test_drops_near_duplicates_from_other_uploads(self):
+        parts = chunks(RESUME)
+        copy = Document(page_content=parts[5].page_content.replace("Docker", "docker"), metadata={"doc_id": "copy"})
+        compressor = ChunkCompressor(budget=10_000)
+        context = compressor.compress([parts[5], copy, parts[20]])
+        self.assertEqual(context.split("\n\n"), [parts[5].page_content, parts[20].page_content])
+        self.assertEqual(compressor.stats()["duplicates"], 1)
+
+    def test_packs_by_relevance_within_budget(self):
+        parts = chunks(RESUME)
+        compressor = ChunkCompressor(budget=140)
+        context = compressor.compress([parts[30], parts[10], parts[20]])
+        self.assertLessEqual(count_tokens(context), 140)
+        self.assertTrue(context.startswith(parts[30].page_content))
+        self.assertNotIn(parts[20].page_content[:40], context)
+        self.assertGreaterEqual(compressor.stats()["truncated"], 1)
+        print("✅ Chunk compression passed.")
+
+
+if __name__ == '__main__':
+    unittest.main()
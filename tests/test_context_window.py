@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
+
+from context_window import ContextWindow
+
+
+def turn(i, words=10, tool_words=0):
+    messages = [HumanMessage(content=" ".join(["question"] * words), id=f"h{i}")]
+    if tool_words:
+        messages.append(AIMessage(content="", id=f"c{i}", tool_calls=[
+            {"name": "lookup_document", "args": {"query": "q"}, "id": f"call{i}"}]))
+        messages.append(ToolMessage(content=" ".join(["chunk"] * tool_words), tool_call_id=f"call{i}", id=f"t{i}"))
+    messages.append(AIMessage(content=" ".join(["answer"] * words), id=f"a{i}"))
+    return messages
+
+
+class TestContextWindow(unittest.TestCase):
+
+    def test_trims_by_tokens_not_messages(self):
+        print("\n🧪 Testing token-budget context window...")
+        window = ContextWindow(max_tokens=600, tool_headroom=100)
+        history = [SystemMessage(content="You are Vera.")]
+        for i in range(50):
+            history += turn(i, words=2)
+        trimmed = window.trim(history)
+
+        # Far more than the old ten messages fit, and never over budget
+        self.assertGreater(len(trimmed), 10)
+        self.assertLessEqual(window.last_prompt_tokens, window.budget)
+        self.assertIsInstance(trimmed[0], SystemMessage)
+        self.assertIsInstance(trimmed[1], HumanMessage)
+        self.assertEqual(trimmed[-1].id, "a49")
+
+    def test_tool_pairs_stay_together(self):
+        window = ContextWindow(max_tokens=400, tool_headroom=100)
+        history = turn(0, tool_words=200) + turn(1, tool_words=200) + [HumanMessage(content="and now?", id="h2")]
+        trimmed = window.trim(history)
+        ids = [m.id for m in trimmed]
+        # The big RAG turn no longer fits; what is kept starts on a human turn
+        self.assertEqual(ids[0], "h2")
+        for i, message in enumerate(trimmed):
+            if isinstance(message, ToolMessage):
+                self.assertTrue(trimmed[i - 1].tool_calls)
+
+    def test_current_turn_always_kept(self):
+        window = ContextWindow(max_tokens=100, tool_headroom=50)
+        history = turn(0) + turn(1, tool_words=500)
+        trimmed = window.trim(history)
+        self.assertEqual([m.id for m in trimmed], ["h1", "c1", "t1", "a1"])
+
+    def test_counts_are_cached_per_message(self):
+        window = ContextWindow()
+        history = turn(0) + turn(1)
+        window.trim(history)
+        misses = window.misses
+        window.trim(history + turn(2))
+        # Only the new turn is tokenized
+        self.assertEqual(window.misses - misses, 2)
+        self.assertGreater(window.hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
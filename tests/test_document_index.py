@@ -0,0 +1,130 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from langchain_community.vectorstores import FAISS
+
+import index_factory
+from document_index import DocumentIndex
+from index_factory import describe
+from tests.fakes import KeywordEmbeddings
+
+
+class TestDocumentIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.embeddings = KeywordEmbeddings()
+        self.index = DocumentIndex(self.embeddings)
+
+    def _store(self, *texts):
+        return FAISS.from_texts(list(texts), self.embeddings)
+
+    def _search(self, text, k=4):
+        return [doc.page_content for doc, _ in
+                self.index.search_by_vector(self.embeddings.embed_query(text), k=k)]
+
+    def test_add_appends_only_new_chunks(self):
+        print("\n🧪 Testing incremental document add...")
+        self.index.add_document("resume", self._store("python docker", "team lead"))
+        self.index.add_document("manual", self._store("install the printer driver"))
+
+        self.assertEqual(self.index.vectorstore.index.ntotal, 3)
+        self.assertEqual(self._search("printer driver", k=1), ["install the printer driver"])
+        self.assertEqual(self._search("python docker", k=1), ["python docker"])
+        # Same document twice is a no-op
+        version = self.index.version
+        self.assertFalse(self.index.add_document("resume", self._store("python docker", "team lead")))
+        self.assertEqual(self.index.version, version)
+
+    def test_remove_hides_results_then_compacts(self):
+        print("\n🧪 Testing document removal + compaction...")
+        self.index.add_document("a", self._store(*["alpha %d" % i for i in range(10)]))
+        self.index.add_document("b", self._store("beta one", "beta two"))
+
+        self.assertTrue(self.index.remove_document("b"))
+        # Tombstoned, not yet compacted (2/12 < 25%)
+        self.assertEqual(self.index.vectorstore.index.ntotal, 12)
+        self.assertNotIn("beta one", self._search("beta one"))
+
+        self.index.compact()
+        self.assertEqual(self.index.vectorstore.index.ntotal, 10)
+        self.assertEqual(self.index.dead_chunks, 0)
+        self.assertEqual([d["doc_id"] for d in self.index.documents()], ["a"])
+
+    def test_auto_compaction_and_readd(self):
+        self.index.add_document("a", self._store("alpha"))
+        self.index.add_document("b", self._store("beta"))
+        self.index.remove_document("b")  # 50% dead -> compacts immediately
+        self.assertEqual(self.index.vectorstore.index.ntotal, 1)
+
+        self.assertTrue(self.index.add_document("b", self._store("beta")))
+        self.assertEqual(self._search("beta", k=1), ["beta"])
+
+
+class TestIndexTypes(unittest.TestCase):
+
+    def setUp(self):
+        self.embeddings = KeywordEmbeddings()
+        self.index = DocumentIndex(self.embeddings)
+
+    def _add(self, doc_id, n):
+        texts = [f"{doc_id} chunk {i} topic{i % 37} word{i % 11}" for i in range(n)]
+        self.index.add_document(doc_id, FAISS.from_texts(texts, self.embeddings))
+        return texts
+
+    def _top(self, text):
+        return self.index.search_by_vector(self.embeddings.embed_query(text), k=1)[0][0].page_content
+
+    def test_describe_by_size_and_storage(self):
+        with patch.multiple(index_factory, ANN_MIN_CHUNKS=1000, IVF_MIN_CHUNKS=100000):
+            self.assertEqual(describe(10, 384), "Flat")
+            self.assertEqual(describe(5000, 384), "HNSW32")
+            self.assertEqual(describe(5000, 384, storage="fp16"), "HNSW32_SQfp16")
+            self.assertEqual(describe(200000, 384), "IVF2048,Flat")
+            self.assertEqual(describe(200000, 384, storage="pq"), "IVF2048,PQ48")
+            # Not enough vectors to train PQ codebooks yet: fp16 until there are
+            self.assertEqual(describe(500, 384, storage="pq"), "SQfp16")
+
+    def test_grows_from_flat_to_hnsw_to_ivf(self):
+        print("\n🧪 Testing index type selection by corpus size...")
+        with patch.multiple(index_factory, ANN_MIN_CHUNKS=150, IVF_MIN_CHUNKS=600):
+            self._add("small", 100)
+            self.assertEqual(self.index.description, "Flat")
+
+            self._add("manual", 200)
+            self.assertEqual(self.index.description, "HNSW32")
+            self.assertEqual(self._top("small chunk 7 topic7 word7"), "small chunk 7 topic7 word7")
+
+            # HNSW can't remove vectors: compaction rebuilds without them
+            self.index.remove_document("manual")
+            self.index.compact()
+            self.assertEqual(self.index.vectorstore.index.ntotal, 100)
+            self.assertEqual(self.index.description, "Flat")
+
+            self._add("kb", 800)
+            self.assertTrue(self.index.description.startswith("IVF"))
+            self.assertEqual(self._top("kb chunk 321 topic25 word2"), "kb chunk 321 topic25 word2")
+            self.index.remove_document("small")
+            self.index.compact()
+            self.assertEqual(self.index.vectorstore.index.ntotal, 800)
+            self.assertEqual(self._top("kb chunk 5 topic5 word5"), "kb chunk 5 topic5 word5")
+        self.assertGreaterEqual(self.index.index_info()["rebuilds"], 3)
+
+    def test_fp16_storage_halves_vector_memory(self):
+        self._add("a", 50)
+        full = self.index.nbytes() - self.index._text_bytes - self.index.lexical.nbytes()
+        with patch.object(index_factory, "INDEX_STORAGE", "fp16"):
+            half = DocumentIndex(self.embeddings)
+            half.add_document("a", FAISS.from_texts([f"a chunk {i} topic{i % 37} word{i % 11}" for i in range(50)],
+                                                    self.embeddings))
+        self.assertEqual(half.description, "SQfp16")
+        self.assertEqual(half.nbytes() - half._text_bytes - half.lexical.nbytes(), full // 2)
+        print("✅ Index types passed.")
+
+
+if __name__ == '__main__':
+    unittest.main()
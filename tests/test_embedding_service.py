@@ -0,0 +1,83 @@
+import unittest
+import threading
+import time
+import sys
+import os
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from langchain_core.embeddings import Embeddings
+
+from embedding_service import EmbeddingService
+
+
+class CountingEmbeddings(Embeddings):
+    """Fake model: vector = [len(text)], records the size of every forward pass."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(len(texts))
+        time.sleep(self.delay)
+        return [[float(len(t))] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class TestEmbeddingService(unittest.TestCase):
+
+    def test_concurrent_queries_share_forward_pass(self):
+        print("\n🧪 Testing micro-batching of concurrent queries...")
+        model = CountingEmbeddings(delay=0.01)
+        service = EmbeddingService(model=model, max_batch_size=64, max_wait_ms=50).start()
+
+        results = {}
+
+        def ask(i):
+            results[i] = service.embed_query("x" * i)
+
+        threads = [threading.Thread(target=ask, args=(i,)) for i in range(1, 21)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        service.stop()
+
+        # Every caller gets its own vector back...
+        self.assertEqual(results, {i: [float(i)] for i in range(1, 21)})
+        # ...but the model saw far fewer forward passes than calls
+        self.assertLess(len(model.calls), 20)
+        stats = service.stats()
+        self.assertEqual(stats["texts"], 20)
+        self.assertGreater(stats["avg_batch_size"], 1)
+
+    def test_documents_are_sliced_to_batch_size(self):
+        print("\n🧪 Testing document slicing...")
+        model = CountingEmbeddings()
+        service = EmbeddingService(model=model, max_batch_size=8, max_wait_ms=0).start()
+
+        texts = ["chunk %d" % i for i in range(30)]
+        vectors = service.embed_documents(texts)
+        service.stop()
+
+        self.assertEqual(vectors, [[float(len(t))] for t in texts])
+        self.assertTrue(all(size <= 8 for size in model.calls))
+        self.assertEqual(service.stats()["max_batch_seen"], 8)
+
+    def test_model_errors_reach_caller(self):
+        class Broken(CountingEmbeddings):
+            def embed_documents(self, texts):
+                raise RuntimeError("boom")
+
+        service = EmbeddingService(model=Broken(), max_wait_ms=0).start()
+        with self.assertRaises(RuntimeError):
+            service.embed_query("hello")
+        service.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import tempfile
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from langchain_community.vectorstores import FAISS
+
+from document_index import DocumentIndex
+from embedding_service import EmbeddingService, set_embedding_service
+from index_registry import registry
+from index_store import IndexStore, hash_file
+from rag_engine import process_document, lookup_document
+from tests.fakes import KeywordEmbeddings
+
+
+class TestIndexStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.embeddings = KeywordEmbeddings()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_is_memory_mapped(self):
+        print("\n🧪 Testing index store round trip...")
+        store = IndexStore(self.tmp.name, fingerprint={"model": "fake"})
+        original = FAISS.from_texts(["alpha beta", "gamma delta"], self.embeddings,
+                                    metadatas=[{"page": 0}, {"page": 1}])
+        store.save("abc123", original)
+
+        loaded = store.load("abc123", self.embeddings)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(loaded.index.ntotal, 2)
+        hit = loaded.similarity_search("gamma", k=1)[0]
+        self.assertEqual(hit.page_content, "gamma delta")
+        self.assertEqual(hit.metadata, {"page": 1})
+        self.assertEqual(store.stats()["hits"], 1)
+
+    def test_loaded_vectors_are_copied_and_counted(self):
+        print("\n🧪 Testing RAM accounting for a memory-mapped load...")
+        store = IndexStore(self.tmp.name, fingerprint={"model": "fake"})
+        store.save("abc123", FAISS.from_texts(["alpha beta", "gamma delta"], self.embeddings))
+        loaded = store.load("abc123", self.embeddings)
+
+        index = DocumentIndex(self.embeddings)
+        self.assertTrue(index.add_document("abc123", loaded))
+        del loaded  # the mmapped source can go: the vectors now live in the index
+        self.assertGreaterEqual(index.nbytes(), 2 * self.embeddings.size * 4)
+        self.assertEqual(index.search_by_vector(self.embeddings.embed_query("gamma"), k=1)[0][0].page_content,
+                         "gamma delta")
+        print("✅ The in-RAM copy is what the registry budget sees.")
+
+    def test_missing_or_stale_entries_are_misses(self):
+        IndexStore(self.tmp.name, fingerprint={"model": "old"}).save(
+            "abc123", FAISS.from_texts(["alpha"], self.embeddings))
+
+        store = IndexStore(self.tmp.name, fingerprint={"model": "new"})
+        self.assertIsNone(store.load("abc123", self.embeddings))
+        self.assertIsNone(store.load("nothere", self.embeddings))
+        self.assertEqual(store.stats()["misses"], 2)
+
+    def test_save_skips_current_and_swaps_stale_entries(self):
+        old = IndexStore(self.tmp.name, fingerprint={"model": "old"})
+        old.save("abc123", FAISS.from_texts(["alpha"], self.embeddings))
+        manifest = os.path.join(old._path("abc123"), "manifest.json")
+        written = os.stat(manifest).st_mtime_ns
+        old.save("abc123", FAISS.from_texts(["something else"], self.embeddings))
+        self.assertEqual(os.stat(manifest).st_mtime_ns, written)  # already stored: untouched
+
+        store = IndexStore(self.tmp.name, fingerprint={"model": "new"})
+        self.assertFalse(store.exists("abc123"))
+        store.save("abc123", FAISS.from_texts(["alpha", "beta"], self.embeddings))
+        self.assertTrue(store.exists("abc123"))
+        self.assertEqual(store.load("abc123", self.embeddings).index.ntotal, 2)
+        self.assertEqual(os.listdir(os.path.dirname(store._path("abc123"))), ["abc123"])  # no tmp/old leftovers
+
+    def test_concurrent_save_keeps_the_first_entry(self):
+        import faiss
+        worker_1 = IndexStore(self.tmp.name, fingerprint={"model": "fake"})
+        worker_2 = IndexStore(self.tmp.name, fingerprint={"model": "fake"})
+        write_index, raced = faiss.write_index, []
+
+        def write_while_other_worker_publishes(index, path):
+            if not raced:  # both missed exists(); worker 2 finishes first
+                raced.append(True)
+                worker_2.save("abc123", FAISS.from_texts(["alpha", "beta"], self.embeddings))
+            write_index(index, path)
+
+        with patch.object(faiss, "write_index", side_effect=write_while_other_worker_publishes):
+            worker_1.save("abc123", FAISS.from_texts(["alpha"], self.embeddings))
+        # Worker 2's entry was neither moved aside nor replaced
+        self.assertEqual(worker_1.load("abc123", self.embeddings).index.ntotal, 2)
+        self.assertEqual(os.listdir(os.path.dirname(worker_1._path("abc123"))), ["abc123"])
+
+    def test_hash_file_is_content_addressed(self):
+        a = os.path.join(self.tmp.name, "a.pdf")
+        b = os.path.join(self.tmp.name, "b.pdf")
+        for path in (a, b):
+            with open(path, "wb") as f:
+                f.write(b"same bytes")
+        self.assertEqual(hash_file(a), hash_file(b))
+
+
+class TestDuplicateUpload(unittest.TestCase):
+
+    def setUp(self):
+        set_embedding_service(EmbeddingService(model=KeywordEmbeddings(), max_wait_ms=0))
+        registry.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp.name, "resume.pdf")
+        with open(self.pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4 resume")
+        self.store = patch('rag_engine.index_store', IndexStore(os.path.join(self.tmp.name, "store")))
+        self.store.start()
+
+    def tearDown(self):
+        self.store.stop()
+        self.tmp.cleanup()
+        registry.clear()
+        set_embedding_service(None)
+
+    @patch('rag_engine.PyPDFLoader')
+    def test_reupload_skips_ingestion(self, MockLoader):
+        print("\n🧪 Testing duplicate upload cache hit...")
+        mock_doc = MagicMock()
+        mock_doc.page_content = "Candidate Name: Tien. Skills: Python, Docker, MLOps."
+        mock_doc.metadata = {"source": "resume.pdf"}
+        MockLoader.return_value.load.return_value = [mock_doc]
+
+        first = process_document(self.pdf_path, thread_id="alice")
+        second = process_document(self.pdf_path, thread_id="bob")
+
+        self.assertFalse(first.cache_hit)
+        self.assertTrue(second.cache_hit)
+        self.assertEqual(first.doc_id, second.doc_id)
+        self.assertEqual(MockLoader.call_count, 1)
+        bob = {"configurable": {"thread_id": "bob"}}
+        self.assertIn("Docker", lookup_document.invoke({"query": "skills"}, config=bob))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import time
+import tempfile
+import threading
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+os.environ.setdefault("NVIDIA_API_KEY", "nvapi-test")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-test")
+
+from fastapi.testclient import TestClient
+
+import api
+from embedding_service import EmbeddingService, set_embedding_service
+from index_registry import registry
+from index_store import IndexStore
+from ingestion import IngestionQueue, IngestionQueueFull
+from tests.fakes import KeywordEmbeddings
+
+
+def wait_for(job, timeout=10):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+class TestIngestionQueue(unittest.TestCase):
+
+    def setUp(self):
+        set_embedding_service(EmbeddingService(model=KeywordEmbeddings(), max_wait_ms=0))
+        registry.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = patch('rag_engine.index_store', IndexStore(os.path.join(self.tmp.name, "store")))
+        self.store.start()
+
+    def tearDown(self):
+        self.store.stop()
+        self.tmp.cleanup()
+        registry.clear()
+        set_embedding_service(None)
+
+    def _upload(self, name, data=b"%PDF-1.4 resume"):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    @patch('rag_engine.PyPDFLoader')
+    def test_job_reports_progress_and_result(self, MockLoader):
+        print("\n🧪 Testing background ingestion job...")
+        pages = []
+        for i in range(3):
+            page = MagicMock()
+            page.page_content = f"Page {i}: Candidate skills include Python and Docker."
+            page.metadata = {"source": "resume.pdf", "page": i}
+            pages.append(page)
+        MockLoader.return_value.load.return_value = pages
+
+        queue = IngestionQueue(workers=1, max_pending=4)
+        path = self._upload("resume.pdf")
+        job = wait_for(queue.submit(path, "resume.pdf", thread_id="alice"))
+        queue.shutdown()
+
+        status = job.to_dict()
+        self.assertEqual(status["status"], "done", status["error"])
+        self.assertEqual(status["pages_parsed"], 3)
+        self.assertEqual(status["chunks_embedded"], status["chunks_total"])
+        self.assertFalse(status["cache_hit"])
+        self.assertTrue(registry.has_documents("alice"))
+        # The raw upload is cleaned up once indexed
+        self.assertFalse(os.path.exists(path))
+
+    def test_queue_is_bounded(self):
+        release = threading.Event()
+
+        def slow_process(*args, **kwargs):
+            release.wait(5)
+            raise RuntimeError("not a pdf")
+
+        queue = IngestionQueue(workers=1, max_pending=2)
+        with patch('ingestion.process_document', side_effect=slow_process):
+            first = queue.submit(self._upload("a.pdf"), "a.pdf")
+            queue.submit(self._upload("b.pdf"), "b.pdf")
+            with self.assertRaises(IngestionQueueFull):
+                queue.submit(self._upload("c.pdf"), "c.pdf")
+            release.set()
+            wait_for(first)
+        queue.shutdown()
+
+        self.assertEqual(first.status, "failed")
+        self.assertIn("not a pdf", first.error)
+        self.assertEqual(queue.stats()["pending"], 0)
+
+    def test_rejected_upload_leaves_no_file(self):
+        print("\n🧪 Testing upload clean-up when the job isn't queued...")
+        uploads = os.path.join(self.tmp.name, "uploads")
+        os.makedirs(uploads)
+        client = TestClient(api.app)
+        for error, code in ((IngestionQueueFull("busy"), 503), (RuntimeError("disk trouble"), 500)):
+            with patch('api.UPLOAD_DIR', uploads), patch.object(api.ingestion_queue, 'submit', side_effect=error):
+                response = client.post("/upload", files={"file": ("resume.pdf", b"%PDF-1.4 resume")})
+            self.assertEqual(response.status_code, code)
+            self.assertEqual(os.listdir(uploads), [])
+        print("✅ Both the 503 and the 500 path delete the saved upload.")
+
+
+if __name__ == '__main__':
+    unittest.main()
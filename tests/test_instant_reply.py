@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+# The graph builds real clients; instant replies never call them
+os.environ.setdefault("NVIDIA_API_KEY", "nvapi-test")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-test")
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from agent import get_vera_graph, instant_reply_for
+from route_stats import route_stats
+
+
+class TestInstantReplyMatcher(unittest.TestCase):
+
+    def test_templates(self):
+        self.assertIsNotNone(instant_reply_for("Hello!", {}))
+        self.assertIsNotNone(instant_reply_for("Who are you?", {}))
+        reply, update = instant_reply_for("My name is tien nguyen", {})
+        self.assertEqual(update, {"name": "Tien Nguyen"})
+        reply, update = instant_reply_for("my email is tien@example.com", {})
+        self.assertEqual(update, {"email": "tien@example.com"})
+
+    def test_anything_more_goes_to_the_llm(self):
+        self.assertIsNone(instant_reply_for("hi, what did Jensen say at CES 2026?", {}))
+        self.assertIsNone(instant_reply_for("My name is Tien and I need help with Docker", {}))
+        self.assertIsNone(instant_reply_for("I am looking for robotics news", {}))
+        # Can't recall what we were never told
+        self.assertIsNone(instant_reply_for("What's my name?", {}))
+
+
+class TestInstantReplyGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = get_vera_graph(memory=MemorySaver())
+        self.config = {"configurable": {"thread_id": "instant-test"}}
+        route_stats.reset()
+
+    def _say(self, text):
+        result = self.graph.invoke({"messages": [HumanMessage(content=text)]}, config=self.config)
+        return result
+
+    def test_personal_facts_remembered_without_llm(self):
+        print("\n🧪 Testing zero-LLM instant replies...")
+        result = self._say("My name is Tien")
+        self.assertIn("Tien", result["messages"][-1].content)
+        self.assertEqual(result["user_profile"], {"name": "Tien"})
+
+        result = self._say("hey")
+        self.assertEqual(result["messages"][-1].content, "Hello, Tien! I'm Vera. How can I help you today?")
+
+        result = self._say("what's my name?")
+        self.assertEqual(result["messages"][-1].content, "Your name is Tien.")
+
+        stats = route_stats.stats()
+        self.assertEqual(stats["instant_reply"]["count"], 3)
+        self.assertGreater(stats["instant_reply"]["tokens_saved"], 0)
+        self.assertNotIn("agent", stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from langchain_community.vectorstores import FAISS
+
+from document_index import DocumentIndex
+from lexical_index import BM25Index, tokenize, is_keyword_query, fuse
+from rag_engine import retrieve, retrieval_paths
+from tests.fakes import KeywordEmbeddings
+
+
+class TestBM25Index(unittest.TestCase):
+
+    def test_tokenize_keeps_technical_terms(self):
+        self.assertEqual(tokenize("Skills: C++, C#, Node.js and tien@example.com."),
+                         ["skills", "c++", "c#", "node.js", "tien@example.com"])
+
+    def test_ranking_and_removal(self):
+        print("\n🧪 Testing BM25 inverted index...")
+        index = BM25Index()
+        index.add("a", "Python developer with Docker and Kubernetes experience")
+        index.add("b", "Team lead. Python, Python, Python everywhere")
+        index.add("c", "Printer driver installation manual")
+
+        self.assertEqual([cid for cid, _ in index.search("kubernetes")], ["a"])
+        self.assertEqual(index.search("python", k=1)[0][0], "b")  # higher tf
+        self.assertEqual(index.search("golang"), [])
+
+        index.remove(["a"])
+        self.assertEqual(index.search("kubernetes"), [])
+        self.assertEqual(len(index), 2)
+        self.assertNotIn("docker", index._postings)
+
+    def test_query_classification_and_fusion(self):
+        self.assertTrue(is_keyword_query("Kubernetes"))
+        self.assertTrue(is_keyword_query("Tien Nguyen"))
+        self.assertTrue(is_keyword_query('does it say "led a team of five" anywhere in the document'))
+        self.assertFalse(is_keyword_query("Summarize the candidate's experience with cloud infrastructure"))
+        self.assertEqual(fuse(["x", "y"], ["y", "z"])[0], "y")
+
+
+class TestHybridRetrieval(unittest.TestCase):
+
+    def setUp(self):
+        self.embeddings = KeywordEmbeddings()
+        self.index = DocumentIndex(self.embeddings)
+        texts = ["Tien Nguyen, ML engineer", "Built Kubernetes operators in Go",
+                 "Led a team of five engineers", "Hobbies: climbing and chess"]
+        self.index.add_document("resume", FAISS.from_texts(texts, self.embeddings))
+
+    def test_keyword_query_skips_embedder(self):
+        print("🧪 Testing keyword lookups without embeddings...")
+        calls = self.embeddings.calls
+        with patch('rag_engine.get_embedding_service', side_effect=AssertionError("embedded")):
+            docs = retrieve("Kubernetes", [self.index], mode="hybrid")
+        self.assertEqual(docs[0].page_content, "Built Kubernetes operators in Go")
+        self.assertEqual(self.embeddings.calls, calls)
+
+        hits = self.index.search_lexical('"team of five"')
+        self.assertEqual([d.page_content for d, _ in hits], ["Led a team of five engineers"])
+        self.assertEqual(self.index.search_lexical('"team of six"'), [])
+
+    def test_mixed_query_fuses_rankings(self):
+        before = retrieval_paths["hybrid"]
+        with patch('rag_engine.get_embedding_service', return_value=self.embeddings):
+            docs = retrieve("which orchestration work did the engineer do with kubernetes operators", [self.index])
+        self.assertEqual(docs[0].page_content, "Built Kubernetes operators in Go")
+        self.assertEqual(retrieval_paths["hybrid"], before + 1)
+
+    def test_removed_document_leaves_lexical_index(self):
+        self.index.remove_document("resume")
+        self.assertEqual(self.index.search_lexical("kubernetes"), [])
+        self.assertEqual(len(self.index.lexical), 0)
+        print("✅ Hybrid retrieval passed.")
+
+
+if __name__ == '__main__':
+    unittest.main()
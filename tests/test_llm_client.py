@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import asyncio
+import threading
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aiohttp import web
+
+from llm_client import InFlightLimiter, LLMConnectionPool
+
+
+class TestInFlightLimiter(unittest.TestCase):
+
+    def test_async_limit_and_slot_timeout(self):
+        print("\n🧪 Testing LLM in-flight limiter...")
+        limiter = InFlightLimiter(limit=3, slot_timeout=1)
+
+        async def call():
+            async with limiter.slot():
+                await asyncio.sleep(0.02)
+
+        async def main():
+            await asyncio.gather(*(call() for _ in range(12)))
+
+        asyncio.run(main())
+        self.assertEqual(limiter.stats()["peak"], 3)
+        self.assertEqual(limiter.stats()["in_flight"], 0)
+
+        async def hog():
+            async with limiter.slot():
+                await asyncio.sleep(0.2)
+
+        async def saturated():
+            limiter.slot_timeout = 0.05
+            hogs = [asyncio.create_task(hog()) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            with self.assertRaises(TimeoutError):
+                await call()
+            await asyncio.gather(*hogs)
+
+        asyncio.run(saturated())
+        self.assertEqual(limiter.rejected, 1)
+
+    def test_sync_slots(self):
+        limiter = InFlightLimiter(limit=2, slot_timeout=1)
+        barrier = threading.Barrier(4)
+
+        def call():
+            barrier.wait()
+            with limiter.sync_slot():
+                threading.Event().wait(0.02)
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(limiter.peak, 2)
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def test_connections_are_reused(self):
+        pool = LLMConnectionPool(size=4)
+        peers = set()
+
+        async def handler(request):
+            peers.add(request.transport.get_extra_info("peername"))
+            return web.json_response({"ok": True})
+
+        async def main():
+            app = web.Application()
+            app.router.add_post("/v1/chat/completions", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                for _ in range(5):
+                    # What langchain-nvidia does per request: new session, post, close
+                    session = pool.session()
+                    response = await session.post(f"http://127.0.0.1:{port}/v1/chat/completions", json={})
+                    await response.json()
+                    await session.close()
+            finally:
+                await pool.aclose()
+                await runner.cleanup()
+
+        asyncio.run(main())
+        self.assertEqual(len(peers), 1)
+        self.assertEqual(pool.sessions_created, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+os.environ.setdefault("NVIDIA_API_KEY", "nvapi-test")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-test")
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import MemorySaver
+
+from metrics import (MetricsRegistry, instrument_node, span, metrics, NODE_SECONDS, TOOL_SECONDS,
+                     ROUTE_DECISIONS, LLM_SECONDS)
+from agent import get_vera_graph
+from tests.fakes import ScriptedModel
+
+
+@tool("tavily_search")
+def offline_search(query: str):
+    """Web search stand-in under the real tool's name."""
+    return f"offline: {query}"
+
+
+class TestExposition(unittest.TestCase):
+
+    def test_histogram_and_counter_format(self):
+        print("\n🧪 Testing Prometheus text format...")
+        registry = MetricsRegistry(enabled=True)
+        latency = registry.histogram("vera_test_seconds", "Test latency", ["node"], buckets=(0.1, 1.0))
+        calls = registry.counter("vera_test_total", "Test calls", ["route"])
+        for value in (0.05, 0.5, 3.0):
+            latency.observe(value, "agent")
+        calls.inc('say "hi"')
+
+        text = registry.render()
+        self.assertIn("# TYPE vera_test_seconds histogram", text)
+        self.assertIn('vera_test_seconds_bucket{node="agent",le="0.1"} 1', text)
+        self.assertIn('vera_test_seconds_bucket{node="agent",le="1"} 2', text)
+        self.assertIn('vera_test_seconds_bucket{node="agent",le="+Inf"} 3', text)
+        self.assertIn('vera_test_seconds_sum{node="agent"} 3.55', text)
+        self.assertIn('vera_test_seconds_count{node="agent"} 3', text)
+        self.assertIn('vera_test_total{route="say \\"hi\\""} 1', text)
+        print("✅ Cumulative buckets, sum, count and escaped labels.")
+
+    def test_stats_become_gauges(self):
+        print("\n🧪 Testing stats() export at scrape time...")
+        registry = MetricsRegistry(enabled=True)
+        scrapes = []
+        registry.register_stats("cache", lambda: scrapes.append(1) or {"hits": 3, "hit_rate": 0.75,
+                                                                         "root": "data", "nested": {"ok": True}})
+        registry.register_stats("tools", lambda: {"lookup_document": {"calls": 2, "avg_ms": 1.5}}, label="tool")
+        self.assertEqual(scrapes, [])  # nothing runs until a scrape
+
+        text = registry.render()
+        self.assertEqual(scrapes, [1])
+        self.assertIn("vera_cache_hits 3", text)
+        self.assertIn("vera_cache_hit_rate 0.75", text)
+        self.assertIn("vera_cache_nested_ok 1", text)
+        self.assertNotIn("root", text)
+        self.assertIn('vera_tools_calls{tool="lookup_document"} 2', text)
+        print("✅ Numeric leaves exported, dynamic keys as labels.")
+
+    def test_disabled_costs_nothing(self):
+        print("\n🧪 Testing VERA_METRICS=0 ...")
+        registry = MetricsRegistry(enabled=False)
+        latency = registry.histogram("vera_off_seconds", "Off", ["node"])
+        latency.observe(1.0, "agent")
+        self.assertEqual(latency.count("agent"), 0)
+
+        def node(state):
+            return state
+        with patch.object(metrics, "enabled", False), patch('metrics.TRACING', "off"):
+            self.assertIs(instrument_node("agent", node), node)
+        self.assertIsNot(instrument_node("agent", node), node)
+        print("✅ Nodes left unwrapped, observations dropped.")
+
+    def test_log_spans(self):
+        print("\n🧪 Testing log trace spans...")
+        with patch('metrics.TRACING', "log"), patch('metrics._tracer_ready', False):
+            with self.assertLogs("vera_metrics", level="DEBUG") as logs:
+                with span("ingest.embed", chunks=12):
+                    pass
+        self.assertIn("ingest.embed", logs.output[0])
+        self.assertIn("chunks=12", logs.output[0])
+        print("✅ Span logged with duration and attributes.")
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_graph_turn_is_measured(self):
+        print("\n🧪 Testing per-node, tool and routing metrics on a turn...")
+        call = {"name": "tavily_search", "args": {"query": "gpu"}, "id": "call-1"}
+        llm = ScriptedModel(messages=iter([AIMessage(content="", tool_calls=[call]), AIMessage(content="Done.")]))
+        graph = get_vera_graph(memory=MemorySaver(), llm=llm, search_tool=offline_search)
+        graph.invoke({"messages": [HumanMessage(content="Latest GPU news?")]},
+                     {"configurable": {"thread_id": "metrics-test"}})
+
+        self.assertEqual(NODE_SECONDS.count("route_start"), 1)
+        self.assertEqual(NODE_SECONDS.count("agent"), 2)
+        self.assertEqual(NODE_SECONDS.count("tools"), 1)
+        self.assertEqual(LLM_SECONDS.count(), 2)
+        self.assertEqual(TOOL_SECONDS.count("tavily_search", "ok"), 1)
+        self.assertEqual(ROUTE_DECISIONS.value("agent"), 1)
+        print("✅ route_start, agent x2, tools, LLM and tool latency recorded.")
+
+    def test_metrics_endpoint(self):
+        print("\n🧪 Testing GET /metrics ...")
+        import api
+        NODE_SECONDS.observe(0.02, "instant_reply")
+        response = TestClient(api.app).get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn('vera_node_seconds_count{node="instant_reply"} 1', response.text)
+        self.assertIn("vera_budget_daily_limit", response.text)
+        self.assertIn("vera_retrieval_cache_results_hit_rate", response.text)
+        print("✅ Histograms and /stats gauges exported.")
+
+
+if __name__ == '__main__':
+    unittest.main()
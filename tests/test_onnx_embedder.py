@@ -0,0 +1,96 @@
+import unittest
+import tempfile
+import sys
+import os
+from unittest.mock import patch
+
+import numpy as np
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from onnx_embedder import OnnxEmbeddings, check_parity, model_dir, ONNX_COSINE_TOLERANCE
+from embedding_service import EmbeddingService
+
+WORDS = ("the a resume skills python rust engineer led team built data pipeline kafka spark "
+         "years of experience at company and with").split()
+TEXTS = [
+    "python engineer",
+    "led a data pipeline team with kafka and spark for years at the company " * 4,
+    "rust",
+    "the resume skills",
+    "built data pipeline with python and rust",
+]
+
+
+def tiny_model(path):
+    """A 2-layer BERT with a 30-word vocab: real export/quantization path, no download."""
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+    os.makedirs(path, exist_ok=True)
+    vocab = os.path.join(path, "vocab.txt")
+    with open(vocab, "w") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS))
+    BertTokenizerFast(vocab).save_pretrained(path)
+    config = BertConfig(vocab_size=5 + len(WORDS), hidden_size=64, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=128, max_position_embeddings=128)
+    BertModel(config).save_pretrained(path)
+    return path
+
+
+class TestOnnxEmbedder(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from langchain_huggingface import HuggingFaceEmbeddings
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.model = tiny_model(os.path.join(cls.tmp.name, "tiny"))
+        cls.reference = HuggingFaceEmbeddings(model_name=cls.model)
+        cls.fp32 = OnnxEmbeddings(cls.model, precision="fp32", path=os.path.join(cls.tmp.name, "fp32"))
+        cls.int8 = OnnxEmbeddings(cls.model, precision="int8", path=os.path.join(cls.tmp.name, "int8"))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_fp32_matches_pytorch(self):
+        print("\n🧪 Testing fp32 ONNX export against the PyTorch model...")
+        report = check_parity(self.fp32, self.reference, TEXTS, tolerance=0.9999)
+        self.assertTrue(report["ok"], report)
+        print(f"✅ Min cosine {report['min_cosine']}")
+
+    def test_int8_within_tolerance(self):
+        print("\n🧪 Testing int8 ONNX graph against the documented cosine tolerance...")
+        report = check_parity(self.int8, self.reference, TEXTS)
+        self.assertEqual(report["tolerance"], ONNX_COSINE_TOLERANCE)
+        self.assertTrue(report["ok"], report)
+        self.assertTrue(os.path.exists(os.path.join(self.int8.path, "model_int8.onnx")))
+        print(f"✅ Min cosine {report['min_cosine']} >= {ONNX_COSINE_TOLERANCE}")
+
+    def test_length_bucketed_batches_keep_order(self):
+        print("\n🧪 Testing token-budget batching returns vectors in input order...")
+        one_pass = self.fp32.encode(TEXTS)
+        small = OnnxEmbeddings(self.model, precision="fp32", path=self.fp32.path, batch_tokens=16)
+        np.testing.assert_allclose(small.encode(TEXTS), one_pass, atol=1e-5)
+        np.testing.assert_allclose(self.fp32.embed_query(TEXTS[2]), one_pass[2], atol=1e-5)
+        print("✅ Same vectors whether batched together or bucketed by length")
+
+    def test_service_selects_onnx_backend(self):
+        print("\n🧪 Testing VERA_EMBED_BACKEND=onnx in the embedding service...")
+        with patch('onnx_embedder.ONNX_DIR', self.tmp.name):
+            # Pre-exported graph under the configured dir is reused, not re-exported
+            path = model_dir(self.model, "int8")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.symlink(self.int8.path, path)
+            service = EmbeddingService(model_name=self.model, backend="onnx", max_wait_ms=0)
+            try:
+                vector = service.embed_query("python engineer")
+            finally:
+                service.stop()
+        self.assertIsInstance(service.model, OnnxEmbeddings)
+        self.assertEqual(service.stats()["backend"], "onnx")
+        np.testing.assert_allclose(vector, self.int8.embed_query("python engineer"), atol=1e-5)
+        print("✅ Service runs on the ONNX graph")
+
+
+if __name__ == '__main__':
+    unittest.main()
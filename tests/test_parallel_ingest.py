@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from embedding_service import EmbeddingService, set_embedding_service
+from parallel_ingest import shutdown_parse_pool, count_pages
+from rag_engine import build_vectorstore
+from benchmarks.synthetic_pdf import write_pdf
+from tests.fakes import KeywordEmbeddings
+
+
+class Progress:
+    def __init__(self):
+        self.fields = {}
+        self.updates = 0
+
+    def update(self, **fields):
+        self.fields.update(fields)
+        self.updates += 1
+
+
+class TestStreamingIngestion(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        set_embedding_service(EmbeddingService(model=KeywordEmbeddings(), max_wait_ms=0))
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.pdf_path = write_pdf(os.path.join(cls.tmp.name, "long.pdf"), pages=20)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_parse_pool()
+        cls.tmp.cleanup()
+        set_embedding_service(None)
+
+    def test_streaming_matches_serial(self):
+        print("\n🧪 Testing streaming ingestion against the serial path...")
+        serial = build_vectorstore(self.pdf_path, mode="serial")
+        progress = Progress()
+        streaming = build_vectorstore(self.pdf_path, mode="streaming", progress=progress)
+
+        def chunks(store):
+            # Index order, not a sorted set: streaming must add chunks in page order
+            return [
+                (doc.metadata["page"], doc.page_content)
+                for doc in (store.docstore.search(store.index_to_docstore_id[i]) for i in range(store.index.ntotal))
+            ]
+
+        self.assertEqual(chunks(serial), chunks(streaming))
+        self.assertEqual(progress.fields["pages_total"], 20)
+        self.assertEqual(progress.fields["pages_parsed"], 20)
+        self.assertEqual(progress.fields["chunks_embedded"], streaming.index.ntotal)
+        # Progress arrives as pages finish, not once at the end
+        self.assertGreater(progress.updates, 3)
+
+    def test_count_pages_tolerates_garbage(self):
+        junk = os.path.join(self.tmp.name, "junk.pdf")
+        with open(junk, "wb") as f:
+            f.write(b"not a pdf")
+        self.assertEqual(count_pages(junk), 0)
+        self.assertEqual(count_pages(self.pdf_path), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
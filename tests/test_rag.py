@@ -2,13 +2,28 @@ import unittest
 from unittest.mock import MagicMock, patch
 import sys
 import os
+import tempfile
 
 # Add src to path so we can import modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
 from rag_engine import process_document, lookup_document
+from index_store import IndexStore
 
 class TestRAGEngine(unittest.TestCase):
+
+    def setUp(self):
+        # Indexes are cached by file hash, so give each run a real file + empty store
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp.name, "dummy.pdf")
+        with open(self.pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4 dummy")
+        self.store = patch('rag_engine.index_store', IndexStore(os.path.join(self.tmp.name, "store")))
+        self.store.start()
+
+    def tearDown(self):
+        self.store.stop()
+        self.tmp.cleanup()
     
     @patch('rag_engine.PyPDFLoader')
     def test_rag_retrieval(self, MockLoader):
@@ -26,7 +41,7 @@ class TestRAGEngine(unittest.TestCase):
         
         # 2. ACTION: Process the "dummy" file
         print("   - Processing dummy document...")
-        success = process_document("dummy.pdf")
+        success = process_document(self.pdf_path)
         self.assertTrue(success)
         
         # 3. VERIFY: Query the engine
@@ -0,0 +1,140 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import tempfile
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from langchain_community.vectorstores import FAISS
+
+from embedding_service import EmbeddingService, set_embedding_service
+from index_registry import RetrieverRegistry, registry
+from index_store import IndexStore
+import rag_engine
+from rag_engine import process_document, lookup_document, is_document_uploaded, list_documents
+from tests.fakes import KeywordEmbeddings
+
+
+def make_store(text):
+    return FAISS.from_texts([text], KeywordEmbeddings())
+
+
+class TestRetrieverRegistry(unittest.TestCase):
+
+    def test_lru_eviction_under_ram_budget(self):
+        print("\n🧪 Testing LRU eviction...")
+        stores = {name: make_store(name * 50) for name in ("a", "b", "c")}
+        probe = RetrieverRegistry()
+        probe.add_document("a", stores["a"], thread_id="t1")
+        one = probe.stats()["ram_bytes"]
+        reg = RetrieverRegistry(max_bytes=int(one * 2.5))
+
+        reg.add_document("a", stores["a"], thread_id="t1")
+        reg.add_document("b", stores["b"], thread_id="t2")
+        reg.resolve("t1")  # touch "t1" so "t2" becomes least recently used
+        reg.add_document("c", stores["c"], thread_id="t3")
+
+        self.assertTrue(reg.has_documents("t1"))
+        self.assertFalse(reg.has_documents("t2"))
+        self.assertTrue(reg.has_documents("t3"))
+        self.assertEqual(reg.stats()["evictions"], 1)
+        self.assertLessEqual(reg.stats()["ram_bytes"], reg.max_bytes)
+
+    def test_threads_are_isolated_but_see_global(self):
+        reg = RetrieverRegistry()
+        reg.add_document("private", make_store("private"), thread_id="t1")
+        reg.add_document("shared", make_store("shared"))
+
+        self.assertEqual(len(reg.resolve("t1")), 2)
+        self.assertEqual(len(reg.resolve("t2")), 1)
+        self.assertTrue(reg.remove_document("private", thread_id="t1"))
+        self.assertEqual(len(reg.resolve("t1")), 1)
+
+
+class TestThreadScopedLookup(unittest.TestCase):
+
+    def setUp(self):
+        set_embedding_service(EmbeddingService(model=KeywordEmbeddings(), max_wait_ms=0))
+        registry.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp.name, "resume.pdf")
+        with open(self.pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4 resume")
+        self.store = patch('rag_engine.index_store', IndexStore(os.path.join(self.tmp.name, "store")))
+        self.store.start()
+
+    def tearDown(self):
+        self.store.stop()
+        self.tmp.cleanup()
+        registry.clear()
+        set_embedding_service(None)
+
+    @patch('rag_engine.PyPDFLoader')
+    def test_upload_is_visible_only_to_its_thread(self, MockLoader):
+        print("\n🧪 Testing per-thread document lookup...")
+        mock_doc = MagicMock()
+        mock_doc.page_content = "Candidate Name: Tien. Skills: Python, Docker, MLOps."
+        mock_doc.metadata = {"source": "resume.pdf"}
+        MockLoader.return_value.load.return_value = [mock_doc]
+
+        process_document(self.pdf_path, thread_id="alice")
+
+        alice = {"configurable": {"thread_id": "alice"}}
+        bob = {"configurable": {"thread_id": "bob"}}
+        self.assertTrue(is_document_uploaded("alice"))
+        self.assertFalse(is_document_uploaded("bob"))
+        self.assertIn("Docker", lookup_document.invoke({"query": "skills"}, config=alice))
+        self.assertIn("No document", lookup_document.invoke({"query": "skills"}, config=bob))
+
+    @patch('rag_engine.PyPDFLoader')
+    def test_evicted_thread_is_restored_on_lookup(self, MockLoader):
+        print("\n🧪 Testing lookup after the RAM budget evicted a thread...")
+        pages = {}
+        for name, text in (("alice.pdf", "Candidate Name: Tien. Skills: Python, Docker."),
+                           ("bob.pdf", "Invoice total: 42 EUR, due in March.")):
+            pages[name] = MagicMock(page_content=text, metadata={"source": name})
+            path = os.path.join(self.tmp.name, name)
+            with open(path, "wb") as f:
+                f.write(f"%PDF-1.4 {name}".encode())
+            pages[name].path = path
+
+        alice = {"configurable": {"thread_id": "alice"}}
+        with patch.object(registry, "max_bytes", 1):  # room for one thread at a time
+            MockLoader.return_value.load.return_value = [pages["alice.pdf"]]
+            process_document(pages["alice.pdf"].path, thread_id="alice", filename="alice.pdf")
+            MockLoader.return_value.load.return_value = [pages["bob.pdf"]]
+            process_document(pages["bob.pdf"].path, thread_id="bob", filename="bob.pdf")
+            self.assertEqual(registry.stats()["evicted_threads"], 1)
+
+            self.assertTrue(is_document_uploaded("alice"))
+            self.assertIn("Docker", lookup_document.invoke({"query": "skills"}, config=alice))
+            self.assertEqual([d["filename"] for d in registry.documents("alice")], ["alice.pdf"])
+            self.assertGreaterEqual(registry.stats()["restores"], 1)
+        print("✅ The evicted knowledge base came back from the index store.")
+
+    @patch('rag_engine.PyPDFLoader')
+    def test_documents_survive_a_restart(self, MockLoader):
+        print("\n🧪 Testing a resumed conversation after a restart...")
+        mock_doc = MagicMock()
+        mock_doc.page_content = "Candidate Name: Tien. Skills: Python, Docker, MLOps."
+        mock_doc.metadata = {"source": "resume.pdf"}
+        MockLoader.return_value.load.return_value = [mock_doc]
+        process_document(self.pdf_path, thread_id="alice", filename="resume.pdf")
+
+        # New process: empty registry, fresh store object over the same directory
+        registry.clear()
+        with patch('rag_engine.index_store', IndexStore(os.path.join(self.tmp.name, "store"))), \
+                patch.dict(rag_engine._synced, clear=True):
+            alice = {"configurable": {"thread_id": "alice"}}
+            self.assertTrue(is_document_uploaded("alice"))
+            self.assertFalse(is_document_uploaded("bob"))
+            self.assertIn("Docker", lookup_document.invoke({"query": "skills"}, config=alice))
+            self.assertEqual(list_documents("alice")[0]["filename"], "resume.pdf")
+            MockLoader.return_value.load.assert_called_once()  # not re-parsed
+        print("✅ The thread's documents came back without a re-upload.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import time
+import tempfile
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from cache import TTLCache, normalize_query
+from embedding_service import EmbeddingService, set_embedding_service
+from index_registry import registry
+from index_store import IndexStore
+from rag_engine import process_document, lookup_document, remove_document, query_vector_cache, result_cache
+from tests.fakes import KeywordEmbeddings
+
+
+def page(text):
+    doc = MagicMock()
+    doc.page_content = text
+    doc.metadata = {"source": "upload.pdf"}
+    return doc
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_lru_and_ttl(self):
+        cache = TTLCache(maxsize=2, ttl=0.05)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)  # evicts "b", the least recently used
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  What are the  SKILLS? "), "what are the skills")
+
+
+class TestRetrievalCache(unittest.TestCase):
+
+    def setUp(self):
+        self.model = KeywordEmbeddings()
+        set_embedding_service(EmbeddingService(model=self.model, max_wait_ms=0))
+        registry.clear()
+        query_vector_cache.invalidate()
+        result_cache.invalidate()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = patch('rag_engine.index_store', IndexStore(os.path.join(self.tmp.name, "store")))
+        self.store.start()
+        # These cover the embedding path; keyword queries would otherwise go to BM25
+        self.mode = patch('rag_engine.RETRIEVAL_MODE', "vector")
+        self.mode.start()
+        self.config = {"configurable": {"thread_id": "alice"}}
+
+    def tearDown(self):
+        self.mode.stop()
+        self.store.stop()
+        self.tmp.cleanup()
+        registry.clear()
+        set_embedding_service(None)
+
+    def _upload(self, name, text, MockLoader):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(name.encode())
+        MockLoader.return_value.load.return_value = [page(text)]
+        return process_document(path, thread_id="alice")
+
+    @patch('rag_engine.PyPDFLoader')
+    def test_repeat_query_skips_embedder(self, MockLoader):
+        print("\n🧪 Testing retrieval cache...")
+        self._upload("resume.pdf", "Skills: Python, Docker, MLOps.", MockLoader)
+
+        calls = self.model.calls
+        hits = result_cache.stats()["hits"]
+        first = lookup_document.invoke({"query": "What are the skills?"}, config=self.config)
+        second = lookup_document.invoke({"query": "what are the SKILLS"}, config=self.config)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.model.calls, calls + 1)
+        self.assertEqual(result_cache.stats()["hits"], hits + 1)
+
+    @patch('rag_engine.PyPDFLoader')
+    def test_index_change_invalidates_results(self, MockLoader):
+        resume = self._upload("resume.pdf", "Skills: Python, Docker, MLOps.", MockLoader)
+        before = lookup_document.invoke({"query": "kubernetes skills"}, config=self.config)
+        self.assertNotIn("Kubernetes", before)
+
+        hits = query_vector_cache.stats()["hits"]
+        self._upload("cv.pdf", "More skills: Kubernetes and Terraform.", MockLoader)
+        after = lookup_document.invoke({"query": "kubernetes skills"}, config=self.config)
+        self.assertIn("Kubernetes", after)
+        # The query vector itself is still reused
+        self.assertEqual(query_vector_cache.stats()["hits"], hits + 1)
+
+        remove_document(resume.doc_id, thread_id="alice")
+        self.assertNotIn("Docker", lookup_document.invoke({"query": "kubernetes skills"}, config=self.config))
+
+
+if __name__ == '__main__':
+    unittest.main()
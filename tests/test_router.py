@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from router import IntentRouter, INSTANT, FAST_DOC, AGENT
+
+
+class TestIntentRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.router = IntentRouter()
+
+    def test_signals_match_old_filters(self):
+        print("\n🧪 Testing compiled intent router...")
+        self.assertTrue(self.router.classify("hey there").chitchat)
+        self.assertFalse(self.router.classify("hey, what's new in robotics this week?").chitchat)
+        self.assertTrue(self.router.classify("I'm looking for robotics news").personal)
+        self.assertTrue(self.router.classify("Summarize the RESUME please").doc_keyword)
+
+        intent = self.router.classify("Hi, my name is Tien")
+        self.assertEqual((intent.template, intent.value), ("name", "Tien"))
+        self.assertTrue(intent.personal)
+
+    def test_name_template_rejects_non_names(self):
+        print("\n🧪 Testing name capture on look-alike phrases...")
+        for text in ("call me later", "Call me when you're done", "my name is not important",
+                     "call me back tomorrow", "call me if anything changes"):
+            intent = self.router.classify(text)
+            self.assertIsNone(intent.template, text)
+            self.assertIsNone(intent.value, text)
+            self.assertTrue(intent.personal, text)  # still personal-ish, so the agent sees it
+            self.assertEqual(self.router.route(text, has_doc=False), AGENT)
+        self.assertEqual(self.router.classify("call me Annie").value, "Annie")
+        print("✅ Adverbs and stopwords never become a name.")
+
+    def test_call_me_needs_a_capitalized_name(self):
+        print("\n🧪 Testing 'call me' with adjectives...")
+        for text in ("call me crazy", "Call me old-fashioned", "hey, call me picky", "call me Annie crazy"):
+            intent = self.router.classify(text)
+            self.assertIsNone(intent.value, text)
+            self.assertTrue(intent.personal, text)
+            self.assertEqual(self.router.route(text, has_doc=False), AGENT)
+        self.assertEqual(self.router.classify("hi, call me Mary Jane").value, "Mary Jane")
+        # "my name is" is unambiguous, so lowercase names still count there
+        self.assertEqual(self.router.classify("my name is tien").value, "tien")
+        print("✅ Only capitalized words after 'call me' become a name.")
+
+    def test_routes(self):
+        self.assertEqual(self.router.route("hello", has_doc=True), INSTANT)
+        self.assertEqual(self.router.route("what skills does the candidate have?", has_doc=True), FAST_DOC)
+        self.assertEqual(self.router.route("what skills does the candidate have?", has_doc=False), AGENT)
+        # Recall needs a remembered name
+        self.assertEqual(self.router.route("what's my name?", has_doc=False), AGENT)
+        self.assertEqual(self.router.route("what's my name?", has_doc=False, profile={"name": "Tien"}), INSTANT)
+
+    def test_classification_is_memoized(self):
+        self.router.classify("hello")
+        self.router.classify("hello")
+        self.assertEqual(self.router.classify.cache_info().hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import subprocess
+import threading
+import tempfile
+import asyncio
+import sqlite3
+import time
+import sys
+import os
+
+# Add src to path so we can import modules
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(SRC)
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import MemorySaver
+
+from agent import get_vera_graph
+
+from budget import SharedBudgetManager
+from checkpointer import SQLiteCheckpointer
+from embedding_service import EmbeddingService, set_embedding_service
+from index_registry import registry
+from index_store import IndexStore
+from ingestion import IngestJob
+from shared_state import SharedStore, DocumentCatalog, JobBoard
+import rag_engine
+from rag_engine import process_document, lookup_document, is_document_uploaded, list_documents, remove_document
+from tests.fakes import KeywordEmbeddings, ScriptedModel
+from tests.test_checkpointer import echo_graph
+
+# One "worker": reserve/commit 100 tokens until the shared wallet says no
+WORKER = """
+import sys
+sys.path.insert(0, {src!r})
+from budget import SharedBudgetManager
+from shared_state import SharedStore
+wallet = SharedBudgetManager(SharedStore({db!r}), max_daily_tokens=5000)
+granted = 0
+while True:
+    reservation = wallet.check_budget("tenant", estimate=100)
+    if reservation is None:
+        break
+    reservation.commit(100)
+    granted += 1
+print(granted)
+"""
+
+
+@tool("tavily_search")
+def offline_search(query: str):
+    """Web search stand-in under the real tool's name."""
+    return f"offline: {query}"
+
+
+class SharedTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "shared.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _store(self):
+        store = SharedStore(self.db)
+        self.addCleanup(store.close)
+        return store
+
+
+class TestSharedBudget(SharedTestCase):
+
+    def test_workers_draw_on_one_wallet(self):
+        print("\n🧪 Testing one token wallet across worker processes...")
+        procs = [subprocess.Popen([sys.executable, "-c", WORKER.format(src=SRC, db=self.db)],
+                                  stdout=subprocess.PIPE, text=True) for _ in range(3)]
+        granted = [int(p.communicate(timeout=120)[0].strip()) for p in procs]
+
+        self.assertEqual(sum(granted), 50)  # 5000 / 100: no overshoot across processes
+        wallet = SharedBudgetManager(self._store(), max_daily_tokens=5000)
+        self.assertEqual(wallet.used, 5000)
+        self.assertEqual(wallet.stats()["requests"], 50)
+        self.assertGreaterEqual(wallet.stats()["rejected"], 3)
+        print(f"✅ Grants per worker {granted}, total exactly the limit.")
+
+    def test_reservations_and_tenant_limits_are_shared(self):
+        print("\n🧪 Testing reservations seen by another worker...")
+        worker_1 = SharedBudgetManager(self._store(), max_daily_tokens=1000, tenant_daily=600)
+        worker_2 = SharedBudgetManager(self._store(), max_daily_tokens=1000, tenant_daily=600)
+
+        held = worker_1.check_budget("alice", estimate=500)
+        self.assertIsNotNone(held)
+        self.assertIsNone(worker_2.check_budget("alice", estimate=200))  # tenant: 500 held + 200 > 600
+        self.assertIsNotNone(worker_2.check_budget("bob", estimate=400))
+        self.assertIsNone(worker_2.check_budget("carol", estimate=200))  # global: 900 held + 200 > 1000
+
+        held.commit(300)
+        self.assertEqual(worker_2.tenant_usage("alice"), {"day": 300, "minute": 300, "reserved": 0})
+        self.assertEqual(worker_2.stats()["reserved"], 400)
+        worker_2.reset()
+        self.assertEqual(worker_1.used, 0)
+        print("✅ Holds, charges and resets visible to every worker.")
+
+    def test_locked_wallet_does_not_block_the_event_loop(self):
+        print("\n🧪 Testing a chat turn while another worker holds the wallet's write lock...")
+        wallet = SharedBudgetManager(self._store(), max_daily_tokens=100000)
+        llm = ScriptedModel(messages=iter([AIMessage(content="Answer.")]))
+        graph = get_vera_graph(memory=MemorySaver(), llm=llm, search_tool=offline_search)
+
+        other_worker = sqlite3.connect(self.db, isolation_level=None, check_same_thread=False)
+        self.addCleanup(other_worker.close)
+        other_worker.execute("BEGIN IMMEDIATE")
+        threading.Timer(0.5, other_worker.execute, ["COMMIT"]).start()
+
+        async def scenario():
+            gaps, stop = [], asyncio.Event()
+
+            async def ticker():
+                last = time.perf_counter()
+                while not stop.is_set():
+                    await asyncio.sleep(0.01)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+
+            ticking = asyncio.create_task(ticker())
+            result = await graph.ainvoke({"messages": [HumanMessage(content="Explain vector databases briefly")]},
+                                         {"configurable": {"thread_id": "locked"}})
+            stop.set()
+            await ticking
+            return result, max(gaps)
+
+        with patch('agent.global_budget', wallet):
+            started = time.perf_counter()
+            result, worst_gap = asyncio.run(scenario())
+        self.assertGreaterEqual(time.perf_counter() - started, 0.45)  # the turn did wait for the lock
+        self.assertEqual(result["messages"][-1].content, "Answer.")
+        self.assertLess(worst_gap, 0.2)
+        self.assertEqual(wallet.stats()["requests"], 1)
+        print(f"✅ Loop kept ticking (worst gap {worst_gap * 1000:.0f} ms) while the turn waited.")
+
+
+class TestSharedCheckpoints(SharedTestCase):
+
+    def _saver(self):
+        saver = SQLiteCheckpointer(path=self.db, flush_ms=5, shared=True)
+        self.addCleanup(saver.close)
+        return saver
+
+    def _say(self, graph, text):
+        return graph.invoke({"messages": [HumanMessage(content=text)]}, {"configurable": {"thread_id": "t1"}})
+
+    def test_turns_alternate_between_workers(self):
+        print("\n🧪 Testing one conversation served by two workers...")
+        worker_1, worker_2 = self._saver(), self._saver()
+        graph_1, graph_2 = echo_graph(worker_1), echo_graph(worker_2)
+
+        self.assertEqual(len(self._say(graph_1, "hello")["messages"]), 2)
+        self.assertEqual(len(self._say(graph_2, "from worker 2")["messages"]), 4)  # committed before return
+        result = self._say(graph_1, "back on worker 1")
+        self.assertEqual(len(result["messages"]), 6)  # stale RAM copy was reloaded
+        self.assertEqual(result["messages"][2].content, "from worker 2")
+        self.assertGreaterEqual(worker_1.stats()["stale_reloads"], 1)
+        self.assertEqual(worker_1.stats()["pending_ops"], 0)
+        print("✅ No lost turns when consecutive messages hit different workers.")
+
+
+class TestSharedDocuments(SharedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        set_embedding_service(EmbeddingService(model=KeywordEmbeddings(), max_wait_ms=0))
+        registry.clear()
+        self.pdf_path = os.path.join(self.tmp.name, "resume.pdf")
+        with open(self.pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4 resume")
+        self.patches = [
+            patch('rag_engine.index_store', IndexStore(os.path.join(self.tmp.name, "store"))),
+            patch('rag_engine.catalog', DocumentCatalog(self._store())),
+            patch.dict(rag_engine._synced, clear=True),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        registry.clear()
+        set_embedding_service(None)
+        super().tearDown()
+
+    def _other_worker(self):
+        """What a fresh worker process sees: empty RAM, same disk."""
+        registry.clear()
+        rag_engine._synced.clear()
+
+    @patch('rag_engine.PyPDFLoader')
+    def test_upload_on_one_worker_is_visible_on_another(self, MockLoader):
+        print("\n🧪 Testing an upload handled by another worker...")
+        mock_doc = MagicMock()
+        mock_doc.page_content = "Candidate Name: Tien. Skills: Python, Docker, MLOps."
+        mock_doc.metadata = {"source": "resume.pdf"}
+        MockLoader.return_value.load.return_value = [mock_doc]
+        result = process_document(self.pdf_path, thread_id="alice", filename="resume.pdf")
+
+        self._other_worker()
+        alice = {"configurable": {"thread_id": "alice"}}
+        self.assertFalse(is_document_uploaded("bob"))
+        self.assertTrue(is_document_uploaded("alice"))
+        self.assertIn("Docker", lookup_document.invoke({"query": "skills"}, config=alice))
+        self.assertEqual(list_documents("alice")[0]["filename"], "resume.pdf")
+
+        # Removed by the first worker: this one drops it on its next lookup
+        rag_engine.catalog.remove("alice", result.doc_id)
+        self.assertFalse(is_document_uploaded("alice"))
+        self.assertFalse(remove_document(result.doc_id, "alice"))
+        print("✅ Documents follow the shared catalog; vectors come from the index store.")
+
+
+class TestSharedJobs(SharedTestCase):
+
+    def test_job_status_from_any_worker(self):
+        print("\n🧪 Testing upload job status on a different worker...")
+        board = JobBoard(self._store())
+        job = IngestJob("resume.pdf", "alice", board=board)
+        job.publish()
+        job.update(status="running", pages_total=4)
+        job.update(status="done", doc_id="abc", finished_at=job.created_at + 1)
+
+        seen = JobBoard(self._store()).get(job.job_id)
+        self.assertEqual(seen["status"], "done")
+        self.assertEqual(seen["doc_id"], "abc")
+        self.assertEqual(seen["pages_total"], 4)
+        self.assertIsNone(board.get("unknown"))
+        print("✅ Status published on transitions and readable anywhere.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import sys
+import os
+import json
+import asyncio
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+# The graph builds real clients; these tests never call them
+os.environ.setdefault("NVIDIA_API_KEY", "nvapi-test")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-test")
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from agent import get_vera_graph
+from streaming import stream_turn, StreamStats
+
+
+class StreamingFakeModel(GenericFakeChatModel):
+    """Streams each canned answer word by word; tools are ignored."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+class SlowGraph:
+    """Stands in for a graph whose first node takes a while."""
+
+    async def astream(self, inputs, config, stream_mode=None):
+        await asyncio.sleep(0.15)
+        yield "messages", (AIMessage(content="late"), {"langgraph_node": "agent"})
+
+
+class ToolGraph:
+    """Emits the node updates of a turn that calls one tool."""
+
+    async def astream(self, inputs, config, stream_mode=None):
+        call = {"name": "tavily_search", "args": {"query": "gpu"}, "id": "call-1"}
+        yield "messages", (AIMessage(content="", tool_calls=[call]), {"langgraph_node": "agent"})
+        yield "updates", {"agent": {"messages": [AIMessage(content="", tool_calls=[call])]}}
+        yield "messages", (ToolMessage(content="results", tool_call_id="call-1"), {"langgraph_node": "tools"})
+        yield "updates", {"tools": {"messages": [ToolMessage(content="results", name="tavily_search",
+                                                             tool_call_id="call-1")]}}
+        yield "messages", (AIMessage(content="Done."), {"langgraph_node": "agent"})
+
+
+def parse(events):
+    parsed = []
+    for raw in events:
+        head, data = raw.strip().split("\n")
+        parsed.append((head[len("event: "):], json.loads(data[len("data: "):])))
+    return parsed
+
+
+class TestStreamTurn(unittest.TestCase):
+
+    def run_turn(self, graph, text, thread_id, **kwargs):
+        config = {"configurable": {"thread_id": thread_id}}
+
+        async def collect():
+            inputs = {"messages": [HumanMessage(content=text)]}
+            return [e async for e in stream_turn(graph, inputs, config, **kwargs)]
+
+        return parse(asyncio.run(collect()))
+
+    def test_typed_events_and_timing(self):
+        print("\n🧪 Testing typed SSE token stream...")
+        llm = StreamingFakeModel(messages=iter([AIMessage(content="GPUs are getting faster every year")]))
+        graph = get_vera_graph(memory=MemorySaver(), llm=llm)
+        stats = StreamStats()
+
+        events = self.run_turn(graph, "Explain the latest GPU inference trends", "stream-1", stats=stats)
+        kinds = [k for k, _ in events]
+        self.assertEqual(kinds[0], "thread")
+        self.assertEqual(events[0][1]["thread_id"], "stream-1")
+        self.assertEqual(kinds[-1], "done")
+        tokens = [d["token"] for k, d in events if k == "token"]
+        self.assertEqual("".join(tokens), "GPUs are getting faster every year")
+
+        done = events[-1][1]
+        self.assertEqual(done["tokens"], len(tokens))
+        self.assertGreater(len(tokens), 1)
+        self.assertIsNotNone(done["ttft_ms"])
+        summary = stats.stats()
+        self.assertEqual(summary["completed"], 1)
+        self.assertEqual(summary["tokens"], len(tokens))
+
+    def test_instant_reply_is_streamed(self):
+        graph = get_vera_graph(memory=MemorySaver(), llm=StreamingFakeModel(messages=iter([])))
+        events = self.run_turn(graph, "My name is Tien", "stream-2", stats=StreamStats())
+        tokens = "".join(d["token"] for k, d in events if k == "token")
+        self.assertIn("Tien", tokens)
+        self.assertEqual(events[-1][0], "done")
+
+    def test_tool_activity(self):
+        events = self.run_turn(ToolGraph(), "gpu news?", "stream-4", stats=StreamStats())
+        self.assertEqual([k for k, _ in events], ["thread", "tool_start", "tool_end", "token", "done"])
+        self.assertEqual(events[1][1]["name"], "tavily_search")
+        self.assertEqual(events[2][1], {"name": "tavily_search", "id": "call-1", "status": "success"})
+
+    def test_heartbeat_while_node_busy(self):
+        print("🧪 Testing stream heartbeats...")
+        stats = StreamStats()
+        events = self.run_turn(SlowGraph(), "hi", "stream-3", heartbeat=0.05, stats=stats)
+        kinds = [k for k, _ in events]
+        self.assertIn("heartbeat", kinds)
+        self.assertLess(kinds.index("heartbeat"), kinds.index("token"))
+        self.assertGreaterEqual(stats.stats()["ttft_ms_p50"], 100)
+        print("✅ Streaming passed.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import sys
+import os
+import time
+import asyncio
+from typing import Annotated
+from typing_extensions import TypedDict
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import tool
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import ToolNode
+from langgraph.checkpoint.memory import MemorySaver
+
+from agent import get_vera_graph
+from tool_runner import timed, tool_stats
+from tests.fakes import ScriptedModel
+
+
+@tool
+def slow_search(query: str):
+    """Web search stand-in that takes a while."""
+    time.sleep(0.3)
+    return f"web: {query}"
+
+
+@tool
+def doc_lookup(query: str, config: RunnableConfig):
+    """Document lookup stand-in that needs the thread from the config."""
+    time.sleep(0.3)
+    return f"doc[{config['configurable']['thread_id']}]: {query}"
+
+
+@tool
+def hung_search(query: str):
+    """Never answers in time."""
+    time.sleep(1.0)
+    return "too late"
+
+
+@tool("tavily_search")
+def offline_search(query: str):
+    """Web search stand-in under the real tool's name."""
+    return f"offline: {query}"
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def tool_graph(tools):
+    builder = StateGraph(State)
+    builder.add_node("tools", ToolNode(tools))
+    builder.add_edge(START, "tools")
+    builder.add_edge("tools", END)
+    return builder.compile()
+
+
+def calls(*names):
+    return AIMessage(content="", tool_calls=[
+        {"name": name, "args": {"query": "gpu"}, "id": f"call-{i}"} for i, name in enumerate(names)])
+
+
+class TestTimedTools(unittest.TestCase):
+
+    def setUp(self):
+        tool_stats.reset()
+        self.config = {"configurable": {"thread_id": "tools-test"}}
+
+    def test_calls_overlap_and_keep_config(self):
+        print("\n🧪 Testing concurrent tool calls...")
+        graph = tool_graph([timed(slow_search, pool_kind="web"), timed(doc_lookup, pool_kind="doc")])
+        inputs = {"messages": [calls("slow_search", "doc_lookup")]}
+
+        start = time.perf_counter()
+        result = asyncio.run(graph.ainvoke(inputs, self.config))
+        self.assertLess(time.perf_counter() - start, 0.55)  # max(tool), not sum
+        contents = sorted(m.content for m in result["messages"][1:])
+        self.assertEqual(contents, ["doc[tools-test]: gpu", "web: gpu"])
+
+        start = time.perf_counter()
+        result = graph.invoke(inputs, self.config)
+        self.assertLess(time.perf_counter() - start, 0.55)
+        self.assertEqual(tool_stats.stats()["doc_lookup"]["calls"], 2)
+
+    def test_timeout_does_not_hold_the_turn(self):
+        print("🧪 Testing per-tool timeouts...")
+        graph = tool_graph([timed(hung_search, timeout=0.1), timed(doc_lookup, pool_kind="doc")])
+        inputs = {"messages": [calls("hung_search", "doc_lookup")]}
+
+        for run in (lambda: asyncio.run(graph.ainvoke(inputs, self.config)),
+                    lambda: graph.invoke(inputs, self.config)):
+            start = time.perf_counter()
+            result = run()
+            self.assertLess(time.perf_counter() - start, 0.8)
+            by_name = {m.name: m for m in result["messages"][1:]}
+            self.assertEqual(by_name["hung_search"].status, "error")
+            self.assertIn("timed out", by_name["hung_search"].content)
+            self.assertEqual(by_name["doc_lookup"].content, "doc[tools-test]: gpu")
+
+        self.assertEqual(tool_stats.stats()["hung_search"]["timeouts"], 2)
+        print("✅ Tool runner passed.")
+
+    def test_graph_uses_injected_search_tool(self):
+        print("🧪 Testing an offline search backend in the agent graph...")
+        llm = ScriptedModel(messages=iter([calls("tavily_search"), AIMessage(content="Done.")]))
+        graph = get_vera_graph(memory=MemorySaver(), llm=llm, search_tool=offline_search)
+        result = graph.invoke({"messages": [HumanMessage(content="Latest GPU news?")]}, self.config)
+        self.assertEqual(result["messages"][-2].content, "offline: gpu")
+        self.assertEqual(result["messages"][-1].content, "Done.")
+        self.assertEqual(tool_stats.stats()["tavily_search"]["calls"], 1)
+        print("✅ No network needed.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import asyncio
+import subprocess
+import threading
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+# Add src to path so we can import modules
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.append(SRC)
+
+os.environ.setdefault("NVIDIA_API_KEY", "nvapi-test")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-test")
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from warmup import WarmUp
+from agent import get_vera_graph
+import api
+from tests.fakes import ScriptedModel
+
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "langchain_huggingface",
+                 "langchain_nvidia_ai_endpoints", "langchain_tavily", "langgraph.prebuilt", "nltk",
+                 "langchain_community.document_loaders", "faiss", "langchain_community.vectorstores"]
+
+
+class TestWarmUp(unittest.TestCase):
+
+    def test_steps_run_in_order_and_failures_are_isolated(self):
+        print("\n🧪 Testing warm-up steps and failure isolation...")
+        ran = []
+        warm = WarmUp()
+        warm.add("graph", lambda: ran.append("graph"))
+        warm.add("embedder", lambda: 1 / 0)
+        warm.add("ingestion", lambda: ran.append("ingestion"))
+        self.assertEqual(warm.stats()["status"], "idle")
+
+        warm.start(blocking=True)
+        report = warm.stats()
+        self.assertEqual(ran, ["graph", "ingestion"])
+        self.assertEqual(report["status"], "failed")
+        self.assertFalse(report["ready"])
+        self.assertIn("ZeroDivisionError", report["steps"]["embedder"]["error"])
+        self.assertTrue(warm.is_ready("graph"))
+        self.assertTrue(asyncio.run(warm.wait("graph")))
+        self.assertFalse(asyncio.run(warm.wait("embedder")))
+        print("✅ Later steps still ran; failure reported per step.")
+
+    def test_wait_follows_background_thread(self):
+        print("\n🧪 Testing wait() on a background warm-up...")
+        gate = threading.Event()
+        warm = WarmUp().add("graph", gate.wait)
+        self.assertFalse(asyncio.run(warm.wait("graph", timeout=0.1)))  # never started
+
+        warm.start()
+        self.assertFalse(asyncio.run(warm.wait("graph", timeout=0.1)))
+        self.assertEqual(warm.stats()["status"], "warming")
+        gate.set()
+        self.assertTrue(asyncio.run(warm.wait("graph", timeout=5)))
+        self.assertTrue(warm.ready)
+        self.assertIsNotNone(warm.stats()["seconds_to_ready"])
+        print("✅ Waiters time out while warming and resume once ready.")
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_api_import_skips_heavy_dependencies(self):
+        print("\n🧪 Testing that importing the API leaves heavy dependencies unloaded...")
+        probe = f"import sys; import api; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        out = subprocess.run([sys.executable, "-c", probe], cwd=SRC, capture_output=True, text=True, timeout=120,
+                             env={**os.environ, "HF_HUB_OFFLINE": "1"})
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertEqual(out.stdout.strip(), "")
+        print("✅ torch, transformers, FAISS, loaders and LLM/search clients load on first use.")
+
+
+class TestReadiness(unittest.TestCase):
+
+    def test_ready_endpoint_and_chat_wait_for_warm_up(self):
+        print("\n🧪 Testing /health, /ready and /chat during background warm-up...")
+        gate = threading.Event()
+        llm = ScriptedModel(messages=iter([AIMessage(content="Warm now.")]))
+
+        def build_graph():
+            gate.wait(5)
+            api.graph = get_vera_graph(memory=MemorySaver(), llm=llm)
+
+        warm = WarmUp().add("graph", build_graph).add("embedder", lambda: None)
+        with patch('api.warmup', warm), patch('api.graph', None), patch('api.memory', None):
+            with TestClient(api.app) as client:
+                health = client.get("/health")
+                self.assertEqual(health.status_code, 200)
+                self.assertEqual(health.json()["mode"], api.checkpoint_mode())
+                ready = client.get("/ready")
+                self.assertEqual(ready.status_code, 503)
+                self.assertEqual(ready.json()["status"], "warming")
+
+                threading.Timer(0.2, gate.set).start()
+                chat = client.post("/chat", json={"message": "Hello there, how are you?", "thread_id": "warm"})
+                self.assertEqual(chat.status_code, 200)
+                self.assertEqual(chat.json()["response"], "Warm now.")
+
+                self.assertTrue(asyncio.run(warm.wait("embedder", timeout=5)))
+                ready = client.get("/ready")
+                self.assertEqual(ready.status_code, 200)
+                self.assertEqual(set(ready.json()["steps"]), {"graph", "embedder"})
+        print("✅ Live at once, chat waited for the graph, ready after every step.")
+
+    def test_degraded_checkpointer_fails_readiness(self):
+        warm = WarmUp().add("graph", lambda: None)
+        warm.start(blocking=True)
+        memory = MagicMock(degraded=True, failed_commits=3, last_error="OperationalError: disk full")
+        with patch('api.warmup', warm), patch('api.memory', memory):
+            response = TestClient(api.app).get("/ready")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "degraded")
+        self.assertEqual(response.json()["checkpoints"]["failed_commits"], 3)
+
+    def test_chat_without_graph_is_503(self):
+        print("\n🧪 Testing /chat when warm-up can't build the graph...")
+        warm = WarmUp().add("graph", lambda: 1 / 0)
+        warm.start(blocking=True)
+        with patch('api.warmup', warm), patch('api.graph', None):
+            response = TestClient(api.app).post("/chat", json={"message": "hi", "thread_id": "cold"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "5")
+        print("✅ 503 + Retry-After instead of a crash.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import time
+import threading
+from typing import Optional
+
+# Add src to path so we can import modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel
+
+from cache import TTLCache, SingleFlight
+from web_search import CachedSearchTool
+
+
+class SearchInput(BaseModel):
+    query: str
+    topic: Optional[str] = None
+
+
+class FakeSearch(BaseTool):
+    """Local stand-in for Tavily: counts upstream calls, optionally slow."""
+
+    name: str = "tavily_search"
+    description: str = "Search the web."
+    args_schema: type = SearchInput
+    max_results: int = 1
+    delay: float = 0.0
+    calls: int = 0
+    fail: bool = False
+
+    def _run(self, query: str, topic: Optional[str] = None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            return {"error": "upstream down"}
+        return {"query": query, "results": [{"content": f"news about {query}"}]}
+
+
+class TestCachedSearchTool(unittest.TestCase):
+
+    def _wrap(self, inner, ttl=60):
+        return CachedSearchTool(inner, cache=TTLCache(16, ttl), flights=SingleFlight())
+
+    def test_repeated_queries_hit_cache(self):
+        print("\n🧪 Testing web search cache...")
+        inner = FakeSearch()
+        tool = self._wrap(inner)
+
+        first = tool.invoke({"query": "CES 2026 robots"})
+        second = tool.invoke({"query": "  ces 2026 ROBOTS? "})
+        self.assertEqual(first, second)
+        self.assertEqual(inner.calls, 1)
+        # Different search parameters are a different cache entry
+        tool.invoke({"query": "CES 2026 robots", "topic": "news"})
+        self.assertEqual(inner.calls, 2)
+        # Schema is unchanged, so LLM tool binding still works
+        self.assertEqual(tool.name, "tavily_search")
+        self.assertEqual(tool.args, inner.args)
+
+    def test_concurrent_identical_searches_coalesce(self):
+        print("\n🧪 Testing in-flight request coalescing...")
+        inner = FakeSearch(delay=0.2)
+        tool = self._wrap(inner)
+        results = []
+
+        def search():
+            results.append(tool.invoke({"query": "trending topic"}))
+
+        threads = [threading.Thread(target=search) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(len(results), 10)
+        self.assertGreaterEqual(tool.flights.coalesced, 1)
+
+    def test_errors_and_expiry_are_not_cached(self):
+        inner = FakeSearch(fail=True)
+        tool = self._wrap(inner, ttl=0.05)
+        tool.invoke({"query": "x"})
+        tool.invoke({"query": "x"})
+        self.assertEqual(inner.calls, 2)
+
+        inner.fail = False
+        tool.invoke({"query": "y"})
+        time.sleep(0.06)
+        tool.invoke({"query": "y"})
+        self.assertEqual(inner.calls, 4)
+
+    def test_cache_key_includes_tool_settings(self):
+        cache, flights = TTLCache(16, 60), SingleFlight()
+        one = FakeSearch(max_results=1)
+        five = FakeSearch(max_results=5)
+        CachedSearchTool(one, cache=cache, flights=flights).invoke({"query": "q"})
+        CachedSearchTool(five, cache=cache, flights=flights).invoke({"query": "q"})
+        self.assertEqual((one.calls, five.calls), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
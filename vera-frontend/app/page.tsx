@@ -41,6 +41,8 @@ export default function Home() {
     const file = e.target.files[0];
     const formData = new FormData();
     formData.append("file", file);
+    // Scope the document to this conversation
+    formData.append("thread_id", threadId);
 
     setUploadStatus("Uploading...");
 
@@ -51,14 +53,33 @@ export default function Home() {
         body: formData,
       });
 
-      if (res.ok) {
-        setUploadStatus("✅ Document Uploaded: " + file.name);
-        setMessages((prev) => [
-            ...prev,
-            { role: "ai", content: `I have read ${file.name}. You can now ask me questions about it.` }
-        ]);
-      } else {
+      if (!res.ok) {
         setUploadStatus("❌ Upload Failed");
+        return;
+      }
+
+      // Ingestion runs in the background: poll the job until it finishes
+      const { job_id } = await res.json();
+      while (true) {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        const statusRes = await fetch(`http://192.168.20.166:8000/upload/${job_id}`);
+        const job = await statusRes.json();
+
+        if (job.status === "done") {
+          setUploadStatus("✅ Document Uploaded: " + file.name);
+          setMessages((prev) => [
+              ...prev,
+              { role: "ai", content: `I have read ${file.name}. You can now ask me questions about it.` }
+          ]);
+          break;
+        }
+        if (job.status === "failed" || !statusRes.ok) {
+          setUploadStatus("❌ Upload Failed");
+          break;
+        }
+        setUploadStatus(
+          `Processing... ${job.pages_parsed} pages parsed, ${job.chunks_embedded}/${job.chunks_total} chunks embedded`
+        );
       }
     } catch (error) {
       console.error(error);